@@ -6,23 +6,31 @@ import logging
 import re
 import time
 from ipaddress import IPv4Interface
+from typing import Optional
 
 from pyats.topology import Device
-from connectors.ssh_connector import SSHConnector  # Assuming connector is in the same directory
+from connectors.ssh_connector import SSHConnector, CLI_ERROR_PATTERN  # Assuming connector is in the same directory
 
 # from netutils.ip import wildcardmask_to_netmask, netmask_to_wildcardmask # Not used here, but good for reference
 
 logger = logging.getLogger(__name__)
 
+# Lines pushed per write in batch mode; keeps the device input buffer from overflowing
+BATCH_CHUNK_SIZE = 50
+
 
 class SSHConfigurator:
     """
     Manages device configuration over an SSH connection.
     """
 
-    def __init__(self, device: Device, connector: SSHConnector):
+    def __init__(self, device: Device, connector: SSHConnector, batch: Optional[bool] = None):
         self.device = device
         self.connector = connector
+        # Batch mode pushes the whole config block at once instead of waiting for a prompt per line.
+        # Enabled per device with `custom.batch_config: true` unless overridden here.
+        self.batch_mode = self.device.custom.get('batch_config', False) if batch is None else batch
+        self._pending: Optional[list[tuple[str, str]]] = None  # (command, expected_prompt_mode) while batching
         # if not self.connector.is_connected():
         #     raise ConnectionError(f"SSH connector for {device.name} is not connected.")
 
@@ -63,6 +71,11 @@ class SSHConfigurator:
                              current_prompt_mode: str = 'config', timeout: float = 10.0,
                              delay_after_send: float = 0.5) -> str:
         """Helper to send a configuration command and verify the prompt."""
+        if self._pending is not None:
+            # Batch mode: only record the line, it is pushed and checked by flush_batch()
+            self._pending.append((command, expected_prompt_mode))
+            return ""
+
         # current_prompt = self._get_prompt(current_prompt_mode) # Not directly used if execute_command_and_wait_for_prompt handles it
         expected_prompt_regex = self._get_prompt(expected_prompt_mode)
 
@@ -79,9 +92,65 @@ class SSHConfigurator:
         if "% Invalid input" in output or "% Ambiguous command" in output:
             logger.error(f"Command error on {self.device.name} for '{command}': {output}")
             raise ValueError(f"Configuration command failed on {self.device.name}: {command} - {output}")
-        logger.debug(f"Output from {self.device.name} for '{command}':\n{output}")
+        logger.debug("Output from %s for '%s':\n%s", self.device.name, command, output)
         return output
 
+    def begin_batch(self):
+        """Starts recording configuration commands instead of sending them one by one."""
+        self._pending = []
+
+    def flush_batch(self, chunk_size: int = BATCH_CHUNK_SIZE, timeout: float = 30.0):
+        """
+        Pushes the recorded commands in chunks of `chunk_size` lines and checks the echoed
+        transcript once. Raises ValueError listing every failed line.
+        """
+        pending, self._pending = self._pending or [], None
+        errors: list[tuple[str, str]] = []
+        for offset in range(0, len(pending), chunk_size):
+            chunk = pending[offset:offset + chunk_size]
+            lines = [command for command, _ in chunk]
+            final_prompt = self._get_prompt(chunk[-1][1])
+            transcript = self.connector.execute_block_and_wait_for_prompt(
+                lines,
+                prompt_regex=final_prompt,
+                end_marker=f'! batch {offset // chunk_size + 1} end',
+                timeout=timeout,
+            )
+            errors.extend(self._map_batch_errors(lines, transcript))
+
+        logger.info(f"Pushed {len(pending)} configuration lines to {self.device.name} in batch mode")
+        if errors:
+            for command, error in errors:
+                logger.error(f"Command error on {self.device.name} for '{command}': {error}")
+            failed = "; ".join(f"'{command}': {error}" for command, error in errors)
+            raise ValueError(f"Configuration commands failed on {self.device.name}: {failed}")
+
+    @staticmethod
+    def _map_batch_errors(lines: list[str], transcript: str) -> list[tuple[str, str]]:
+        """
+        Maps each CLI error in the transcript to the line whose echo precedes it.
+        """
+        echo_positions = []
+        position = 0
+        for line in lines:
+            found = transcript.find(line, position)
+            if found == -1:
+                echo_positions.append(position)
+                continue
+            echo_positions.append(found)
+            position = found + len(line)
+
+        errors = []
+        for match in CLI_ERROR_PATTERN.finditer(transcript):
+            source = None
+            for line, echoed_at in zip(lines, echo_positions):
+                if echoed_at > match.start():
+                    break
+                source = line
+            message = transcript[match.start():].splitlines()[0]
+            errors.append((source or lines[0], message))
+        return errors
+
     def enter_enable_mode(self, enable_password:[str]= None):
         """Enters enable mode if not already there."""
         # Send a newline to get current prompt
@@ -385,6 +454,9 @@ class SSHConfigurator:
         try:
             self.enter_config_mode()  # Enters enable, then config mode
 
+            if self.batch_mode:
+                self.begin_batch()
+
             self.configure_hostname()  # Sets hostname, updates internal prompt base
             self.configure_interfaces()
 
@@ -403,6 +475,9 @@ class SSHConfigurator:
             # Example: self.configure_vty_lines()
             # Example: self.configure_logging()
 
+            if self.batch_mode:
+                self.flush_batch()
+
             self.exit_config_mode()  # Back to enable mode
             self.save_config()
 
@@ -5,6 +5,9 @@ import logging
 import re
 import socket
 import time
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
 import paramiko
@@ -14,6 +17,69 @@ from pyats.topology import Device
 
 logger = logging.getLogger(__name__)
 
+# Common IOS error indicators, matched in one pass
+CLI_ERROR_PATTERN = re.compile(r'% (?:Incomplete command|Ambiguous command|Invalid input detected)')
+# Bytes of already-scanned output kept in the window so a prompt or error split across reads still matches
+MATCH_OVERLAP = 1024
+# PromptMatchStats kept per connector; older entries are dropped so long sessions stay bounded
+MATCH_STATS_HISTORY = 256
+
+
+@lru_cache(maxsize=64)
+def compile_prompt(prompt_regex: str) -> re.Pattern:
+    """Compiles a prompt regex once per pattern string."""
+    return re.compile(prompt_regex, re.MULTILINE)
+
+
+@dataclass
+class PromptMatchStats:
+    """Timing of one execute_command_and_wait_for_prompt call."""
+    command: str
+    bytes_read: int = 0
+    scan_time: float = 0.0  # time spent inside the prompt/error regexes
+    match_latency: float = 0.0  # time from sending the command to the prompt match
+    matched: bool = False
+
+
+class PromptStreamMatcher:
+    """
+    Looks for a prompt and CLI errors in streamed output.
+    Only the newly received data plus a bounded overlap window is scanned on each feed,
+    so the matching cost stays linear in the output size.
+    """
+
+    def __init__(self, prompt_regex: str, overlap: int = MATCH_OVERLAP):
+        self.prompt = compile_prompt(prompt_regex)
+        self.overlap = overlap
+        self.size = 0
+        self.scan_time = 0.0
+        self._chunks: list[str] = []
+        self._window = ""
+
+    def feed(self, data: str) -> Optional[str]:
+        """
+        Adds data to the output and scans it.
+        Returns 'prompt' when the prompt matched, 'error' on a CLI error, None otherwise.
+        """
+        if not data:
+            return None
+        self._chunks.append(data)
+        self.size += len(data)
+        start = time.perf_counter()
+        self._window = self._window[-self.overlap:] + data
+        try:
+            if self.prompt.search(self._window):
+                return 'prompt'
+            if CLI_ERROR_PATTERN.search(self._window):
+                return 'error'
+            return None
+        finally:
+            self.scan_time += time.perf_counter() - start
+
+    @property
+    def output(self) -> str:
+        return "".join(self._chunks)
+
 
 class SSHConnector:
     """
@@ -27,6 +93,7 @@ class SSHConnector:
         self._ssh.set_missing_host_key_policy(AutoAddPolicy())
         self._shell: Optional[paramiko.Channel] = None  # Type hint for shell
         self.connection_details = None
+        self.match_stats: deque[PromptMatchStats] = deque(maxlen=MATCH_STATS_HISTORY)  # Latest commands only
 
     def connect(self, **kwargs):
         """
@@ -115,7 +182,7 @@ class SSHConnector:
         """Sends a command string to the shell."""
         if not self._shell or self._shell.closed:
             raise ConnectionError(f"SSH shell for {self.device.name} is not active.")
-        logger.debug(f"Sending to {self.device.name}: {cmd.strip()}")
+        logger.debug("Sending to %s: %s", self.device.name, cmd.strip())
         payload = cmd.encode(encoding)
         if add_newline:
             payload += b'\n'
@@ -134,7 +201,7 @@ class SSHConnector:
             # logger.warning(f"Attempted to read from a closed or non-existent shell for {self.device.name}.")
             return ""
 
-        output_buffer = b""
+        output_buffer = bytearray()  # grows in place, decoded once at the end
         start_time = time.monotonic()
 
         # Initial read attempt
@@ -144,7 +211,7 @@ class SSHConnector:
                 if data:
                     output_buffer += data
             except (socket.timeout, ChannelException) as e:  # Paramiko raises ChannelException on timeout for recv
-                logger.debug(f"Socket/Channel timeout during initial read on {self.device.name}: {e}")
+                logger.debug("Socket/Channel timeout during initial read on %s: %s", self.device.name, e)
                 # This is okay, it means no data was immediately ready within shell's own timeout
             except Exception as e:
                 logger.error(f"Error during initial read from {self.device.name}: {e}")
@@ -160,7 +227,7 @@ class SSHConnector:
                         break
                     output_buffer += data
                 except (socket.timeout, ChannelException) as e:
-                    logger.debug(f"Socket/Channel timeout during polling read on {self.device.name}: {e}")
+                    logger.debug("Socket/Channel timeout during polling read on %s: %s", self.device.name, e)
                     break  # No more data within this poll cycle's timeout
                 except Exception as e:
                     logger.error(f"Error during polling read from {self.device.name}: {e}")
@@ -183,36 +250,82 @@ class SSHConnector:
             raise ConnectionError(f"SSH shell for {self.device.name} is not active.")
 
         logger.info(f"Executing on {self.device.name} (waiting for '{prompt_regex}'): {command}")
+        sent_at = time.monotonic()
         self.send_command(command)
 
         # Optional delay after sending command, before starting to read
         if initial_delay > 0:
             time.sleep(initial_delay)
 
-        output = ""
+        matcher = PromptStreamMatcher(prompt_regex)
+        stats = PromptMatchStats(command=command)
+        self.match_stats.append(stats)
         start_time = time.monotonic()
 
         while time.monotonic() - start_time < timeout:
-            output += self.read(max_wait_time=0.2)  # Read small chunks frequently
-            if re.search(prompt_regex, output, re.MULTILINE):  # re.MULTILINE for prompts at start of new lines
-                logger.debug(f"Prompt '{prompt_regex}' found on {self.device.name}.")
+            result = matcher.feed(self.read(max_wait_time=0.2))  # Read small chunks frequently
+            stats.bytes_read, stats.scan_time = matcher.size, matcher.scan_time
+            if result == 'prompt':
+                stats.matched = True
+                stats.match_latency = time.monotonic() - sent_at
+                logger.debug("Prompt '%s' found on %s after %.3fs (%d chars, %.2f ms matching).", prompt_regex,
+                             self.device.name, stats.match_latency, stats.bytes_read, stats.scan_time * 1000)
                 # Remove command from output if it was echoed and prompt is at end
                 # This is a common behavior.
                 command_echo_pattern = re.escape(command.strip()) + r'.*?\n'
-                output_cleaned = re.sub(command_echo_pattern, '', output, count=1)
+                output_cleaned = re.sub(command_echo_pattern, '', matcher.output, count=1)
                 return output_cleaned
 
             # Check for common error indicators
-            if "% Incomplete command" in output or "% Ambiguous command" in output or "% Invalid input detected" in output:
+            if result == 'error':
+                output = matcher.output
                 logger.error(f"Command error detected for '{command}' on {self.device.name}:\n{output}")
                 raise ValueError(f"Command error on {self.device.name}: {output}")
 
             time.sleep(attempt_interval)  # Wait before next read attempt
 
+        output = matcher.output
         logger.error(
             f"Timeout waiting for prompt '{prompt_regex}' after command '{command}' on {self.device.name}. Full output:\n{output}")
         raise TimeoutError(f"Timeout waiting for prompt '{prompt_regex}' on {self.device.name}. Output: {output}")
 
+    def execute_block_and_wait_for_prompt(self, lines: list[str], prompt_regex: str, end_marker: str,
+                                          timeout: float = 30.0) -> str:
+        """
+        Sends several command lines in one write and reads the whole echoed transcript.
+        `end_marker` is sent as the last line; reading stops once its echo is followed by the prompt.
+        Errors are not checked here, the caller parses the transcript.
+        """
+        if not self._shell or self._shell.closed:
+            raise ConnectionError(f"SSH shell for {self.device.name} is not active.")
+
+        logger.info(f"Pushing {len(lines)} lines to {self.device.name} (waiting for '{prompt_regex}')")
+        self.send_command("\n".join([*lines, end_marker]))
+
+        prompt = compile_prompt(prompt_regex)
+        chunks: list[str] = []
+        tail = ""
+        marker_seen = False
+        start_time = time.monotonic()
+        while time.monotonic() - start_time < timeout:
+            data = self.read(max_wait_time=0.2)
+            if not data:
+                continue
+            chunks.append(data)
+            tail = tail[-MATCH_OVERLAP:] + data
+            if not marker_seen:
+                marker_at = tail.find(end_marker)
+                if marker_at == -1:
+                    continue
+                marker_seen = True
+                tail = tail[marker_at + len(end_marker):]
+            if prompt.search(tail):
+                return "".join(chunks)
+
+        output = "".join(chunks)
+        logger.error(f"Timeout waiting for end of config block on {self.device.name}. Output:\n{output}")
+        raise TimeoutError(f"Timeout waiting for prompt '{prompt_regex}' on {self.device.name}. Output: {output}")
+
     def is_connected(self) -> bool:
         """
         Checks if the SSH transport is active and shell is not closed.
@@ -39,7 +39,7 @@ class TelnetConfigurator:
         if index == -1:  # No prompt matched
             raise TimeoutError(
                 f"Expected prompt {prompt} not found for command '{command}' on {self.device.name}. Output: {output}")
-        logger.debug(f"Output from {self.device.name} for '{command}':\n{output}")
+        logger.debug("Output from %s for '%s':\n%s", self.device.name, command, output)
         return output
 
     def contains(self, patterns: list[str]) -> bool:
@@ -205,7 +205,7 @@ class TelnetConfigurator:
                 if '>' in output_after_setup or '#' in output_after_setup:  # Common FTD/ASA prompts
                     logger.info(f"FTD setup completed for {self.device.name}.")
                     return
-                logger.debug(f"FTD setup still in progress... Read: {output_after_setup[:100]}")
+                logger.debug("FTD setup still in progress... Read: %.100s", output_after_setup)
 
             logger.error(f"FTD setup timed out for {self.device.name}.")
         elif 'Login incorrect' in out and not (
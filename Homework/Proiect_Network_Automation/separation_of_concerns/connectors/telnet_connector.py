@@ -57,7 +57,7 @@ class TelnetConnector:
         """
         if not self._conn:
             raise ConnectionError("Telnet connection is not established.")
-        logger.debug(f"Writing to {self.device.name}: {command.strip()}")
+        logger.debug("Writing to %s: %s", self.device.name, command.strip())
         payload = command.encode(encoding)
         if add_newline:
             payload += b'\n'
@@ -69,7 +69,7 @@ class TelnetConnector:
         """
         if not self._conn:
             raise ConnectionError("Telnet connection is not established.")
-        logger.debug(f"Writing raw to {self.device.name}: {command.strip()}")
+        logger.debug("Writing raw to %s: %s", self.device.name, command.strip())
         self._conn.write(command.encode(encoding))
         return self.read(encoding)
 
@@ -0,0 +1,61 @@
+import unittest
+from unittest.mock import MagicMock
+
+from connectors.ssh_configurator import SSHConfigurator
+
+
+class TestBatchConfigurator(unittest.TestCase):
+
+    def setUp(self):
+        self.device = MagicMock()
+        self.device.name = 'IOU1'
+        self.device.custom = {'hostname': 'R1'}
+        self.connector = MagicMock()
+        self.configurator = SSHConfigurator(self.device, self.connector, batch=True)
+
+    def test_commands_are_pushed_in_one_write(self):
+        self.connector.execute_block_and_wait_for_prompt.return_value = 'R1(config)#'
+        self.configurator.begin_batch()
+        self.configurator._execute_cfg_command('interface Ethernet0/1', expected_prompt_mode='config-if')
+        self.configurator._execute_cfg_command('no shutdown', expected_prompt_mode='config-if')
+        self.configurator._execute_cfg_command('exit', expected_prompt_mode='config')
+        self.configurator.flush_batch()
+
+        self.connector.execute_command_and_wait_for_prompt.assert_not_called()
+        args, kwargs = self.connector.execute_block_and_wait_for_prompt.call_args
+        self.assertEqual(['interface Ethernet0/1', 'no shutdown', 'exit'], args[0])
+        self.assertEqual(r'R1\(config\)#\s*$', kwargs['prompt_regex'])
+
+    def test_errors_mapped_to_source_line(self):
+        lines = ['interface Ethernet0/1', 'ip adress 10.0.0.1 255.0.0.0', 'no shutdown', 'exit']
+        transcript = (
+            "R1(config)#interface Ethernet0/1\r\n"
+            "R1(config-if)#ip adress 10.0.0.1 255.0.0.0\r\n"
+            "                  ^\r\n"
+            "% Invalid input detected at '^' marker.\r\n"
+            "R1(config-if)#no shutdown\r\n"
+            "R1(config-if)#exit\r\n"
+            "R1(config)#! batch 1 end\r\n"
+            "R1(config)#"
+        )
+        errors = SSHConfigurator._map_batch_errors(lines, transcript)
+        self.assertEqual([('ip adress 10.0.0.1 255.0.0.0', "% Invalid input detected at '^' marker.")], errors)
+
+    def test_flush_raises_on_errors(self):
+        self.connector.execute_block_and_wait_for_prompt.return_value = (
+            "R1(config)#router rip\r\nR1(config-router)#netwrk 10.0.0.0\r\n% Ambiguous command:  \"netwrk\"\r\n"
+            "R1(config-router)#! batch 1 end\r\nR1(config-router)#"
+        )
+        self.configurator.begin_batch()
+        self.configurator._execute_cfg_command('router rip', expected_prompt_mode='config-router')
+        self.configurator._execute_cfg_command('netwrk 10.0.0.0', expected_prompt_mode='config-router')
+        with self.assertRaisesRegex(ValueError, 'netwrk'):
+            self.configurator.flush_batch()
+
+    def test_line_mode_is_default(self):
+        configurator = SSHConfigurator(self.device, self.connector)
+        self.assertFalse(configurator.batch_mode)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from connectors.ssh_connector import MATCH_STATS_HISTORY, PromptStreamMatcher, SSHConnector
+
+
+class TestPromptStreamMatcher(unittest.TestCase):
+
+    def test_prompt_split_across_reads(self):
+        matcher = PromptStreamMatcher(r'R1\(config\)#\s*$', overlap=64)
+        self.assertIsNone(matcher.feed('interface Gi1\r\nR1(con'))
+        self.assertEqual('prompt', matcher.feed('fig)#'))
+        self.assertEqual('interface Gi1\r\nR1(config)#', matcher.output)
+
+    def test_error_detected(self):
+        matcher = PromptStreamMatcher(r'R1#\s*$')
+        self.assertEqual('error', matcher.feed("% Invalid input detected at '^' marker.\r\n"))
+
+    def test_window_stays_bounded(self):
+        matcher = PromptStreamMatcher(r'R1#\s*$', overlap=128)
+        for _ in range(1000):
+            self.assertIsNone(matcher.feed('x' * 1000 + '\r\n'))
+        self.assertLessEqual(len(matcher._window), 128 + 1002)
+        self.assertEqual('prompt', matcher.feed('R1#'))
+        self.assertEqual(1000 * 1002 + 3, matcher.size)
+
+
+class TestMatchStats(unittest.TestCase):
+
+    def test_history_is_bounded(self):
+        connector = SSHConnector(MagicMock())
+        connector._shell = MagicMock(closed=False)
+        with patch.object(connector, 'read', return_value='R1#'):
+            for index in range(MATCH_STATS_HISTORY + 10):
+                connector.execute_command_and_wait_for_prompt(f'show {index}', r'R1#', initial_delay=0)
+        self.assertEqual(MATCH_STATS_HISTORY, len(connector.match_stats))
+        self.assertEqual(f'show {MATCH_STATS_HISTORY + 9}', connector.match_stats[-1].command)
+        self.assertTrue(connector.match_stats[0].matched)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,343 @@
+"""
+End-to-end bring-up of a simulated topology with the main.py flow: Telnet connect and bootstrap,
+SSH connect and configuration (with its save) through the SSH transport pool as main.py does,
+then an interface and ping check from every router.
+Devices are benchmarks.fake_ios fakes on localhost, so runs are repeatable without the lab.
+
+For every phase (connect, telnet_bootstrap, ssh_config, save, verify_ping) it reports the time the
+devices spent in it, commands sent and commands per second, bytes read and time spent in time.sleep;
+for every scheduler stage the wall clock time, and percentiles of the per-command latency. Results are written as JSON to diff across commits.
+
+Run from NA_Project_2025:
+python -m benchmarks.bench_bringup [--devices 20] [--workers 8] [--latency 0.02] [--jitter 0.01]
+                                   [--output bringup.json] [--compare previous.json]
+"""
+import argparse
+import io
+import json
+import logging
+import platform
+import subprocess
+import threading
+import time
+from contextlib import ExitStack, contextmanager, redirect_stdout
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+from unittest.mock import patch
+
+from benchmarks.fake_ios import FakeLab
+from connectors import instrumentation
+from connectors.instrumentation import HistogramSink
+from connectors.recording import CLIENT_TO_DEVICE, DEVICE_TO_CLIENT
+from connectors.ssh_connector import SSHConnector
+from connectors.ssh_pool import POOL
+from connectors.telnet_connector import TelnetConnector
+from scripts.bootstrap_scheduler import BootstrapScheduler
+from scripts.ping_helper import test_pings
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+PHASES = ['connect', 'telnet_bootstrap', 'ssh_config', 'save', 'verify_ping']
+# modules whose time.sleep calls are charged to the running phase
+SLEEPING_MODULES = ['connectors.telnet_connector', 'connectors.ssh_connector', 'scripts.ping_helper']
+PING_TARGETS = 4
+
+
+@dataclass
+class PhaseStats:
+    device_seconds: float = 0.0
+    commands: int = 0
+    bytes_read: int = 0
+    sleep_seconds: float = 0.0
+
+    @property
+    def commands_per_second(self) -> float:
+        return self.commands / self.device_seconds if self.device_seconds else 0.0
+
+
+class PhaseMeter:
+    """
+    Charges time, traffic and sleeps to the innermost phase running on the current thread.
+    Also stands in for a SessionRecorder, so the connectors' recording hook feeds it the traffic.
+    """
+
+    def __init__(self):
+        self.stats = {name: PhaseStats() for name in PHASES}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self) -> list[list]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def phase(self, name: str):
+        stack = self._stack()
+        if stack:
+            self._charge_time(stack[-1])
+        stack.append([name, time.monotonic()])
+        try:
+            yield
+        finally:
+            self._charge_time(stack.pop())
+            if stack:
+                stack[-1][1] = time.monotonic()
+
+    def _charge_time(self, frame: list):
+        name, since = frame
+        now = time.monotonic()
+        with self._lock:
+            self.stats[name].device_seconds += now - since
+        frame[1] = now
+
+    def _current(self) -> Optional[PhaseStats]:
+        stack = self._stack()
+        return self.stats[stack[-1][0]] if stack else None
+
+    def event(self, direction: str, data: bytes):
+        stats = self._current()
+        if stats is None:
+            return
+        with self._lock:
+            if direction == DEVICE_TO_CLIENT:
+                stats.bytes_read += len(data)
+            elif direction == CLIENT_TO_DEVICE:
+                stats.commands += data.count(b'\n')
+
+    def close(self):
+        pass
+
+    def sleep(self, seconds: float):
+        stats = self._current()
+        if stats is not None:
+            with self._lock:
+                stats.sleep_seconds += seconds
+        time.sleep(seconds)
+
+
+class _MeteredTime:
+    """
+    The time module as seen by a metered connector: sleep goes through the meter
+    """
+
+    def __init__(self, meter: PhaseMeter):
+        self.sleep = meter.sleep
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+def _in_phase(meter: PhaseMeter, method, name: str):
+    def wrapper(self, *args, **kwargs):
+        with meter.phase(name):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def metered(meter: PhaseMeter):
+    """
+    Hooks the meter into the connectors for the duration of a run
+    """
+    with ExitStack() as stack:
+        for module in SLEEPING_MODULES:
+            stack.enter_context(patch(f'{module}.time', _MeteredTime(meter)))
+        for module in ('connectors.telnet_connector', 'connectors.ssh_connector'):
+            stack.enter_context(patch(f'{module}.open_recorder', lambda *args: meter))
+        for cls in (TelnetConnector, SSHConnector):
+            stack.enter_context(patch.object(cls, 'connect', _in_phase(meter, cls.connect, 'connect')))
+            stack.enter_context(patch.object(cls, 'save_config', _in_phase(meter, cls.save_config, 'save')))
+        yield
+
+
+def fake_testbed(telnet: FakeLab, ssh: FakeLab):
+    """
+    One IOS router per fake device: Telnet and SSH point at the two labs, one addressed interface each
+    """
+    from pyats.topology import loader
+
+    devices, topology = {}, {}
+    for index, name in enumerate(telnet.devices, start=1):
+        credentials = {'login': {'username': 'admin', 'password': 'admin'}}
+        devices[name] = {
+            'os': 'ios', 'type': 'router', 'platform': 'iosv',
+            'credentials': {'default': {'username': 'admin', 'password': 'admin', 'enable_password': 'admin'}},
+            'connections': {
+                'telnet': {'protocol': 'telnet', 'ip': telnet.devices[name].address[0],
+                           'port': telnet.devices[name].address[1]},
+                'ssh': {'protocol': 'ssh', 'ip': ssh.devices[name].address[0], 'port': ssh.devices[name].address[1],
+                        'credentials': credentials},
+            },
+            'custom': {'hostname': name},
+        }
+        topology[name] = {'interfaces': {'Ethernet0/1': {
+            'type': 'ethernet', 'ipv4': f'10.{index // 250}.{index % 250}.1/24',
+        }}}
+    return loader.load({'testbed': {'name': 'fake_lab'}, 'devices': devices, 'topology': topology})
+
+
+def bring_up(testbed, scheduler: BootstrapScheduler, meter: PhaseMeter):
+    """
+    The phases of main.py, plus the ping check of real_ping_tester, on every device
+    """
+    telnet_objects: dict[str, TelnetConnector] = {}
+    ssh_objects: dict[str, SSHConnector] = {}
+    names = list(testbed.devices)
+
+    def telnet_connect(dev):
+        connector = TelnetConnector(dev)
+        connector.connect(connection=dev.connections.telnet)
+        telnet_objects[dev.name] = connector
+
+    def telnet_bootstrap(dev):
+        with meter.phase('telnet_bootstrap'):
+            telnet_objects[dev.name].do_initial_config()
+            telnet_objects[dev.name].disconnect()
+
+    def ssh_connect(dev):
+        connector = SSHConnector(dev)
+        connector.connect(connection=dev.connections.ssh)
+        ssh_objects[dev.name] = connector
+
+    def ssh_config(dev):
+        with meter.phase('ssh_config'):
+            ssh_objects[dev.name].configure()
+
+    def verify_ping(dev):
+        connector = ssh_objects[dev.name]
+        position = names.index(dev.name)
+        targets = [testbed.devices[names[(position + offset) % len(names)]].interfaces['Ethernet0/1'].ipv4.ip.compressed
+                   for offset in range(1, min(PING_TARGETS, len(names) - 1) + 1)]
+        with meter.phase('verify_ping'):
+            down = connector.wait_for_interfaces()
+            if down:
+                raise RuntimeError(f'{dev.name} interfaces not up with their address: {down}')
+            # pooled connectors ping every target at once, each on its own exec channel
+            ok, _ = test_pings(targets, lambda command, prompt: connector._send_cmd(command, prompts=prompt or None),
+                               connector.read, dev.name, dev.os,
+                               exec_many=connector.execute_show if connector._pooled else None)
+        connector.disconnect()
+        if not ok:
+            raise RuntimeError(f'{dev.name} could not reach {targets}')
+
+    stages = [
+        ('telnet_connect', telnet_connect, ()),
+        ('telnet', telnet_bootstrap, ('telnet_connect',)),
+        ('ssh_connect', ssh_connect, ('telnet',)),
+        ('ssh', ssh_config, ('ssh_connect',)),
+        ('verify_ping', verify_ping, ('ssh',)),
+    ]
+    for stage, job, depends_on in stages:
+        jobs = {name: (lambda dev=testbed.devices[name], job=job: job(dev)) for name in names}
+        scheduler.run_phase(stage, jobs, depends_on=depends_on)
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(devices: int = 20, workers: int = 8, latency: float = 0.02, jitter: float = 0.01, seed: int = 1) -> dict:
+    """
+    Brings up `devices` fake routers and returns the results document
+    """
+    meter = PhaseMeter()
+    latency_sink = HistogramSink()
+    scheduler = BootstrapScheduler(max_workers=workers)
+    with FakeLab(devices, 'telnet', latency, jitter, seed=seed) as telnet, \
+            FakeLab(devices, 'ssh', latency, jitter, seed=seed) as ssh:
+        testbed = fake_testbed(telnet, ssh)
+        start = time.monotonic()
+        instrumentation.add_sink(latency_sink)
+        try:
+            with metered(meter):
+                bring_up(testbed, scheduler, meter)
+        finally:
+            instrumentation.remove_sink(latency_sink)
+            # pooled transports point at the fake devices, which stop here
+            POOL.close_all()
+        total = time.monotonic() - start
+
+    failures = {f'{stage}/{name}': result.error for stage, results in scheduler.results.items()
+                for name, result in results.items() if not result.ok}
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'config': {'devices': devices, 'workers': workers, 'latency': latency, 'jitter': jitter, 'seed': seed},
+        'wall_seconds': round(total, 4),
+        'stages': {stage: round(seconds, 4) for stage, seconds in scheduler.wall_clock.items()},
+        'phases': {
+            name: {**{key: round(value, 4) if isinstance(value, float) else value
+                      for key, value in asdict(stats).items()},
+                   'per_device_seconds': round(stats.device_seconds / devices, 4),
+                   'commands_per_second': round(stats.commands_per_second, 2)}
+            for name, stats in meter.stats.items()
+        },
+        # upper bounds of power-of-two buckets, from the connectors' per-command events
+        'command_latency': {f'p{q}': latency_sink.percentile(q) for q in (50, 90, 99)},
+        'failures': failures,
+    }
+
+
+def compare(current: dict, previous: dict) -> list[str]:
+    """
+    One line per phase and stage with the relative change from a previous results file
+    """
+    def change(new, old):
+        return f'{(new - old) / old * 100:+6.1f}%' if old else '     -'
+
+    lines = [f"wall {current['wall_seconds']:8.3f}s  {change(current['wall_seconds'], previous['wall_seconds'])}"]
+    if current['config'] != previous['config']:
+        lines.insert(0, f"different settings, was {previous['config']} (revision {previous['revision']})")
+    for stage, seconds in current['stages'].items():
+        old = previous['stages'].get(stage, 0)
+        lines.append(f'stage {stage:<16} {seconds:8.3f}s  {change(seconds, old)}')
+    for name, stats in current['phases'].items():
+        old = previous['phases'].get(name, {})
+        lines.append(f"phase {name:<16} {stats['per_device_seconds']:8.3f}s/device  "
+                     f"{change(stats['per_device_seconds'], old.get('per_device_seconds', 0))}  "
+                     f"sleep {change(stats['sleep_seconds'], old.get('sleep_seconds', 0))}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--devices', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--compare', help='results JSON of an earlier run to compare against')
+    args = parser.parse_args()
+    # the connectors log every command and ping_helper prints each ping, keep only the results
+    logging.disable(logging.INFO)
+    with redirect_stdout(io.StringIO()):
+        results = run(args.devices, args.workers, args.latency, args.jitter, args.seed)
+    print(f"{args.devices} devices, {args.workers} workers: {results['wall_seconds']:.2f}s")
+    for stage, seconds in results['stages'].items():
+        print(f'    stage {stage:<16} {seconds:8.3f}s')
+    for name, stats in results['phases'].items():
+        print(f"    phase {name:<16} {stats['per_device_seconds']:7.3f}s/device  {stats['commands']:6d} cmds "
+              f"{stats['commands_per_second']:8.1f} cmd/s  {stats['bytes_read']:9d} B  "
+              f"sleep {stats['sleep_seconds']:7.2f}s")
+    print('    command latency ' + ', '.join(f'{q} <= {seconds * 1000:.0f} ms'
+                                               for q, seconds in results['command_latency'].items() if seconds))
+    for key, error in results['failures'].items():
+        print(f'    FAILED {key}: {error}')
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            print('\n'.join(compare(results, json.load(file))))
+
+
+if __name__ == '__main__':
+    main()
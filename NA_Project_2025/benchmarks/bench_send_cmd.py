@@ -0,0 +1,66 @@
+"""
+Per-command latency of SSHConnector._send_cmd before and after the prompt-driven read loop
+
+Run from NA_Project_2025: python -m benchmarks.bench_send_cmd
+"""
+import logging
+import statistics
+import time
+from unittest.mock import MagicMock
+
+from benchmarks.fake_ios import FakeIOSShell
+from connectors.ssh_connector import SSHConnector
+
+COMMANDS = [
+    ('configure terminal', [r'\(config\)#']),
+    ('interface Ethernet0/1', [r'\(config-if\)#']),
+    ('ip address 192.168.101.1 255.255.255.0', [r'\(config-if\)#']),
+    ('no shutdown', [r'\(config-if\)#']),
+    ('exit', [r'\(config\)#']),
+    ('router rip', [r'\(config-router\)#']),
+    ('version 2', [r'\(config-router\)#']),
+    ('exit', [r'\(config\)#']),
+    ('end', [r'#']),
+]
+
+
+def legacy_send_cmd(shell: FakeIOSShell, cmd: str, delay: float = 0.5, timeout: float = 0) -> str:
+    """The sleep-based loop _send_cmd used before"""
+    shell.send(f'{cmd}\n')
+    time.sleep(delay + timeout)
+    output = ""
+    while shell.recv_ready():
+        output += shell.recv(65535).decode(errors='ignore')
+        time.sleep(0.2)
+    return output
+
+
+def measure(send, rounds: int) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        for cmd, prompts in COMMANDS:
+            start = time.perf_counter()
+            send(cmd, prompts)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main(latency: float = 0.02, rounds: int = 2):
+    logging.getLogger('connectors.ssh_connector').setLevel(logging.WARNING)
+
+    shell = FakeIOSShell(hostname='R1', latency=latency)
+    before = measure(lambda cmd, prompts: legacy_send_cmd(shell, cmd), rounds)
+
+    connector = SSHConnector(MagicMock())
+    connector._shell = FakeIOSShell(hostname='R1', latency=latency)
+    after = measure(lambda cmd, prompts: connector._send_cmd(cmd, prompts=prompts), rounds)
+
+    print(f"fake IOS shell, device latency {latency * 1000:.0f} ms, {len(before)} commands")
+    for name, samples in (('sleep loop', before), ('prompt-driven', after)):
+        print(f"{name:>14}: mean {statistics.mean(samples) * 1000:7.1f} ms  "
+              f"max {max(samples) * 1000:7.1f} ms  total {sum(samples):6.2f} s")
+    print(f"speedup x{statistics.mean(before) / statistics.mean(after):.1f}")
+
+
+if __name__ == '__main__':
+    main()
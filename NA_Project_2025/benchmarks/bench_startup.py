@@ -0,0 +1,73 @@
+"""
+Cold-start import cost of the project entry points, measured with python -X importtime
+in a fresh interpreter per run.
+
+Run from NA_Project_2025: python -m benchmarks.bench_startup [--repeat 5] [--top 8]
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+ENTRY_POINTS = ['main', 'real_ping_tester', 'ftd_connection']
+# top-level packages reported separately, the ones a Telnet-only run should not need
+WATCHED = ['pyats', 'paramiko', 'bravado', 'requests', 'urllib3']
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def import_profile(module: str) -> tuple[int, dict[str, int]]:
+    """
+    Imports module in a new interpreter and returns (total us, cumulative us per top-level package)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_DIR, capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(f'import {module} failed:\n{result.stderr[-2000:]}')
+    lines = [IMPORTTIME_LINE.match(line) for line in result.stderr.splitlines()]
+    packages: dict[str, int] = {}
+    total = 0
+    parents: list[tuple[int, str]] = []
+    # -X importtime prints children before their parent, so walk it backwards to see each parent first
+    for match in reversed([line for line in lines if line]):
+        _, cumulative, indent, name = match.groups()
+        depth, top = len(indent), name.split('.')[0]
+        while parents and parents[-1][0] >= depth:
+            parents.pop()
+        if not parents:
+            total += int(cumulative)
+        # a package is charged where it is first entered from another package
+        if not parents or parents[-1][1] != top:
+            packages[top] = packages.get(top, 0) + int(cumulative)
+        parents.append((depth, top))
+    packages.pop(module, None)
+    return total, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=8)
+    parser.add_argument('modules', nargs='*', default=ENTRY_POINTS)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        runs = [import_profile(module) for _ in range(args.repeat)]
+        totals = [total for total, _ in runs]
+        # the fastest run has the least noise from the rest of the machine
+        _, packages = min(runs, key=lambda run: run[0])
+        print(f"{module}: median {statistics.median(totals) / 1000:7.1f} ms, "
+              f"best {min(totals) / 1000:7.1f} ms over {args.repeat} runs")
+        watched = ', '.join(f"{name} {packages[name] / 1000:.0f} ms" if name in packages else f"{name} -"
+                            for name in WATCHED)
+        print(f"    watched: {watched}")
+        for name, cost in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {name:<28} {cost / 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Local Telnet and SSH servers that hand every client connection to a console session object,
+so connectors can be run against recordings or emulated devices instead of the lab
+"""
+import logging
+import socketserver
+import threading
+from typing import Callable, Optional, Protocol
+
+import paramiko
+
+logger = logging.getLogger(__name__)
+
+ACCEPT_TIMEOUT = 10
+# Offered like the lab IOS images: no 4096-bit group or group exchange, so clients settle on group14.
+# That is also several times cheaper per handshake, which matters with hundreds of fake devices.
+SERVER_DISABLED_KEX = [
+    'diffie-hellman-group16-sha512',
+    'diffie-hellman-group-exchange-sha256',
+    'diffie-hellman-group-exchange-sha1',
+]
+
+
+class ConsoleSession(Protocol):
+    def serve(self, stream) -> None:
+        """Talks to one client over a socket or paramiko channel until either side is done"""
+
+
+# Over SSH, sessions that also define exec(command) -> str answer exec channels,
+# like the show commands of the SSH pool
+
+
+class ShellServer(paramiko.ServerInterface):
+    """
+    Lets any user in with any password and grants pty + shell sessions, and exec sessions when
+    exec_allowed. Several channels may be opened on one transport, as the SSH pool does.
+    """
+
+    def __init__(self, exec_allowed: bool = False):
+        self.exec_allowed = exec_allowed
+        # channel id -> None for a shell, the command for an exec request
+        self._requests: dict[int, Optional[str]] = {}
+        self._requested = threading.Condition()
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        self._request(channel, None)
+        return True
+
+    def check_channel_exec_request(self, channel, command):
+        if not self.exec_allowed:
+            return False
+        self._request(channel, command.decode(errors='ignore'))
+        return True
+
+    def _request(self, channel, command: Optional[str]):
+        with self._requested:
+            self._requests[channel.get_id()] = command
+            self._requested.notify_all()
+
+    def wait_request(self, channel, timeout: float) -> tuple[bool, Optional[str]]:
+        """
+        (True, None) once the channel asked for a shell, (True, command) for an exec, (False, None) on timeout
+        """
+        with self._requested:
+            if not self._requested.wait_for(lambda: channel.get_id() in self._requests, timeout):
+                return False, None
+            return True, self._requests.pop(channel.get_id())
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            self.server.console.handle(self.request)
+        except (OSError, EOFError) as e:
+            logger.debug(f'Client {self.client_address} dropped: {e}')
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ConsoleServer:
+    """
+    Listens on host:port (port 0 picks a free one) and serves each client from a new session
+    returned by session_factory, in its own thread
+    """
+
+    def __init__(self, session_factory: Callable[[], ConsoleSession], host: str = '127.0.0.1', port: int = 0):
+        self.session_factory = session_factory
+        self._server = _Server((host, port), _Handler, bind_and_activate=True)
+        self._server.console = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self._server.server_address[:2]
+
+    def start(self) -> tuple[str, int]:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.address
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def handle(self, conn):
+        raise NotImplementedError
+
+
+class TelnetConsoleServer(ConsoleServer):
+    """
+    Raw TCP: the session sees the socket directly, option negotiation included
+    """
+
+    def handle(self, conn):
+        self.session_factory().serve(conn)
+
+
+class SSHConsoleServer(ConsoleServer):
+    """
+    SSH server accepting any password. One session serves each client transport: every shell channel
+    the client opens on it, and its exec channels when the session has exec().
+    """
+
+    _host_key = None
+    _key_lock = threading.Lock()
+
+    def start(self) -> tuple[str, int]:
+        # made before the first client, not while its key exchange is waiting
+        self.host_key()
+        return super().start()
+
+    def handle(self, conn):
+        transport = paramiko.Transport(conn, disabled_algorithms={'kex': SERVER_DISABLED_KEX})
+        transport.add_server_key(self.host_key())
+        session = self.session_factory()
+        server = ShellServer(exec_allowed=hasattr(session, 'exec'))
+        try:
+            transport.start_server(server=server)
+            channel = transport.accept(ACCEPT_TIMEOUT)
+            # a pooled client keeps the transport open and opens more channels as it goes
+            while channel is not None:
+                threading.Thread(target=self._serve_channel, args=(server, session, channel), daemon=True).start()
+                channel = None
+                while channel is None and transport.is_active():
+                    channel = transport.accept(1)
+        finally:
+            transport.close()
+
+    @staticmethod
+    def _serve_channel(server: ShellServer, session, channel):
+        try:
+            requested, command = server.wait_request(channel, ACCEPT_TIMEOUT)
+            if not requested:
+                return
+            if command is None:
+                session.serve(channel)
+            else:
+                channel.sendall(session.exec(command).encode())
+                channel.send_exit_status(0)
+        except (OSError, EOFError) as e:
+            logger.debug(f'Channel {channel.get_id()} dropped: {e}')
+        finally:
+            channel.close()
+
+    @classmethod
+    def host_key(cls):
+        """
+        One throwaway key per process, generating it is the slowest part of starting a server
+        """
+        with cls._key_lock:
+            if cls._host_key is None:
+                cls._host_key = paramiko.RSAKey.generate(2048)
+            return cls._host_key
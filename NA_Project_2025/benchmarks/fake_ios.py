@@ -0,0 +1,343 @@
+"""
+Local stand-in for an IOS CLI, used to measure connectors without the lab.
+
+As a fake lab of Telnet or SSH devices on localhost, run from NA_Project_2025:
+python -m benchmarks.fake_ios [--devices 100] [--protocol ssh] [--latency 0.02] [--jitter 0.01] [--testbed fake.yaml]
+"""
+import argparse
+import copy
+import random
+import re
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import yaml
+
+from benchmarks.console_server import ConsoleServer, SSHConsoleServer, TelnetConsoleServer
+
+MODE_PROMPTS = {
+    'exec': '>',
+    'enable': '#',
+    'config': '(config)#',
+    'config-if': '(config-if)#',
+    'config-router': '(config-router)#',
+    'config-line': '(config-line)#',
+    'dhcp-config': '(dhcp-config)#',
+}
+
+SUBMODES = [
+    (r'^interface\s+\S+', 'config-if'),
+    (r'^router\s+(rip|ospf)', 'config-router'),
+    (r'^line\s+', 'config-line'),
+    (r'^ip dhcp pool\s+\S+', 'dhcp-config'),
+]
+PING_REPLY = (
+    'Type escape sequence to abort.\r\n'
+    'Sending 5, 100-byte ICMP Echos to {target}, timeout is 2 seconds:\r\n'
+    '!!!!!\r\n'
+    'Success rate is 100 percent (5/5), round-trip min/avg/max = 1/1/2 ms\r\n'
+)
+# \r\n, \r\0 (Telnet NVT), \n, or a lone \r unless it may be the first half of \r\n
+LINE_END = re.compile(rb'\r\n|\r\x00|\n|\r(?!\Z)')
+
+
+class IOSModeEmulator:
+    """
+    Tracks the CLI mode of a fake IOS device and answers commands with echo + prompt
+    """
+
+    def __init__(self, hostname: str = 'Router', mode: str = 'enable'):
+        # device state, shared with every terminal() of this device
+        self._device = {'hostname': hostname}
+        self.mode = mode
+        self.running_config: list[str] = []
+        # interface -> [address, status], for show ip interface brief
+        self.interfaces: dict[str, list[str]] = {}
+        self._interface: Optional[str] = None
+
+    @property
+    def hostname(self) -> str:
+        return self._device['hostname']
+
+    @hostname.setter
+    def hostname(self, hostname: str):
+        self._device['hostname'] = hostname
+
+    def terminal(self, mode: str) -> 'IOSModeEmulator':
+        """
+        Another CLI session on the same device, like a second vty: its own mode, the same config
+        """
+        session = copy.copy(self)
+        session.mode = mode
+        session._interface = None
+        return session
+
+    @property
+    def prompt(self) -> str:
+        return f'{self.hostname}{MODE_PROMPTS[self.mode]}'
+
+    def handle(self, command: str) -> str:
+        """Returns what the device prints for one command line, including the next prompt"""
+        command = command.strip()
+        body = self._apply(command)
+        return f'{command}\r\n{body}{self.prompt}'
+
+    def exec(self, command: str) -> str:
+        """Output of a command on an SSH exec channel: privileged exec mode, no echo and no prompt"""
+        mode, self.mode = self.mode, 'enable'
+        try:
+            return self._apply(command.strip())
+        finally:
+            self.mode = mode
+
+    def _apply(self, command: str) -> str:
+        if not command or command.startswith('!'):
+            return ''
+        if command in ('en', 'enable'):
+            self.mode = 'enable'
+            return ''
+        if command in ('end',):
+            self.mode = 'enable'
+            return ''
+        if command in ('conf t', 'configure terminal') and self.mode == 'enable':
+            self.mode = 'config'
+            return 'Enter configuration commands, one per line.  End with CNTL/Z.\r\n'
+        if command in ('write', 'write memory'):
+            return 'Building configuration...\r\n[OK]\r\n'
+        if command == 'exit':
+            self.mode = 'config' if self.mode not in ('config', 'enable', 'exec') else 'enable'
+            return ''
+        if command.startswith('ping ') and self.mode in ('exec', 'enable'):
+            return PING_REPLY.format(target=command.split()[1])
+        if command.removeprefix('do ') == 'show ip interface brief':
+            return self._interface_brief()
+        if command.startswith('do ') or command.startswith('show '):
+            return '\r\n'.join(self.running_config) + '\r\n'
+        if self.mode == 'enable' or self.mode == 'exec':
+            return "% Invalid input detected at '^' marker.\r\n"
+        if command.startswith('hostname '):
+            self.hostname = command.split(maxsplit=1)[1]
+        if self.mode == 'config-if':
+            self._interface_command(command)
+        for pattern, submode in SUBMODES:
+            if re.match(pattern, command):
+                self.mode = submode
+                break
+        if self.mode == 'config-if' and command.startswith('interface '):
+            self._interface = command.split(maxsplit=1)[1]
+            self.interfaces.setdefault(self._interface, ['unassigned', 'administratively down'])
+        self.running_config.append(command)
+        return ''
+
+    def _interface_command(self, command: str):
+        state = self.interfaces[self._interface]
+        if command.startswith('ip address '):
+            words = command.split()
+            state[0] = words[2] if len(words) > 3 else 'unassigned'
+        elif command == 'no shutdown':
+            state[1] = 'up'
+        elif command == 'shutdown':
+            state[1] = 'administratively down'
+
+    def _interface_brief(self) -> str:
+        lines = ['Interface              IP-Address      OK? Method Status                Protocol']
+        for name, (address, status) in self.interfaces.items():
+            method = 'unset' if address == 'unassigned' else 'manual'
+            protocol = 'up' if status == 'up' else 'down'
+            lines.append(f'{name:<22} {address:<15} YES {method:<6} {status:<21} {protocol}')
+        return '\r\n'.join(lines) + '\r\n'
+
+
+class FakeIOSShell:
+    """
+    Minimal paramiko.Channel look-alike backed by an IOSModeEmulator.
+    Every command is answered after `latency` seconds from a background timer.
+    """
+
+    def __init__(self, hostname: str = 'Router', latency: float = 0.01, chunk_size: int = 4096):
+        self.emulator = IOSModeEmulator(hostname)
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.closed = False
+        self._timeout: Optional[float] = None
+        self._buffer = bytearray()
+        self._cond = threading.Condition()
+
+    def send(self, data) -> int:
+        if isinstance(data, str):
+            data = data.encode()
+        lines = [line.rstrip('\r') for line in data.decode(errors='ignore').split('\n')]
+        # The last line has no newline yet; like a real CLI, only complete lines are answered
+        timer = threading.Timer(self.latency, self._respond, [lines[:-1] or ['']])
+        timer.daemon = True
+        timer.start()
+        return len(data)
+
+    sendall = send
+
+    def _respond(self, lines: list[str]):
+        with self._cond:
+            for line in lines:
+                self._buffer += self.emulator.handle(line).encode()
+            self._cond.notify_all()
+
+    def settimeout(self, timeout: Optional[float]):
+        self._timeout = timeout
+
+    def recv_ready(self) -> bool:
+        with self._cond:
+            return bool(self._buffer)
+
+    def recv(self, nbytes: int) -> bytes:
+        with self._cond:
+            deadline = None if self._timeout is None else time.monotonic() + self._timeout
+            while not self._buffer:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise socket.timeout()
+                self._cond.wait(remaining)
+            size = min(nbytes, self.chunk_size, len(self._buffer))
+            chunk = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            return chunk
+
+    def close(self):
+        self.closed = True
+
+
+def split_lines(pending: bytes) -> tuple[list[str], bytes]:
+    """
+    Returns the complete lines in pending and what is left of the line still being typed
+    """
+    lines, start = [], 0
+    for match in LINE_END.finditer(pending):
+        lines.append(pending[start:match.start()].decode(errors='ignore'))
+        start = match.end()
+    return lines, pending[start:]
+
+
+class EmulatedIOSSession:
+    """
+    Console of one fake IOS device for the console servers. Every complete line is answered by the
+    emulator after latency plus a random 0..jitter seconds, like a device busy for a moment.
+    """
+
+    def __init__(self, hostname: str = 'Router', mode: str = 'exec', latency: float = 0.0, jitter: float = 0.0,
+                 rng: Optional[random.Random] = None):
+        self.emulator = IOSModeEmulator(hostname, mode)
+        self.mode = mode
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+        # shell and exec channels of one SSH client share the device
+        self._lock = threading.Lock()
+
+    def _delay(self):
+        with self._lock:
+            delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+
+    def serve(self, stream):
+        # every shell channel of an SSH client is its own CLI session on the device
+        terminal = self.emulator.terminal(self.mode)
+        with self._lock:
+            stream.sendall(f'\r\n{terminal.prompt}'.encode())
+        pending = b''
+        while data := stream.recv(4096):
+            lines, pending = split_lines(pending + data)
+            for line in lines:
+                self._delay()
+                with self._lock:
+                    answer = terminal.handle(line)
+                stream.sendall(answer.encode())
+
+    def exec(self, command: str) -> str:
+        self._delay()
+        with self._lock:
+            return self.emulator.exec(command)
+
+
+class FakeLab:
+    """
+    `count` fake IOS devices named R1..Rn, each listening on its own localhost port.
+    Every client connection gets a fresh device in `mode`, shared by all channels of an SSH connection;
+    with a seed the jitter is reproducible.
+    """
+
+    def __init__(self, count: int, protocol: str = 'telnet', latency: float = 0.0, jitter: float = 0.0,
+                 mode: str = 'exec', seed: Optional[int] = None, host: str = '127.0.0.1'):
+        self.protocol = protocol
+        server_class = SSHConsoleServer if protocol == 'ssh' else TelnetConsoleServer
+        rng = random.Random(seed)
+        self.devices: dict[str, ConsoleServer] = {}
+        for index in range(1, count + 1):
+            name = f'R{index}'
+            device_rng = random.Random(rng.random())
+            self.devices[name] = server_class(
+                lambda name=name, device_rng=device_rng: EmulatedIOSSession(name, mode, latency, jitter, device_rng),
+                host,
+            )
+
+    def start(self) -> dict[str, tuple[str, int]]:
+        return {name: server.start() for name, server in self.devices.items()}
+
+    def stop(self):
+        # each shutdown waits for its server's next poll, so they are done side by side
+        with ThreadPoolExecutor(max_workers=min(len(self.devices), 64) or 1) as pool:
+            list(pool.map(ConsoleServer.stop, self.devices.values()))
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def testbed(self) -> dict:
+        """
+        pyATS testbed pointing at the fake devices
+        """
+        devices = {}
+        for name, server in self.devices.items():
+            host, port = server.address
+            devices[name] = {
+                'os': 'ios', 'type': 'router',
+                'credentials': {'default': {'username': 'admin', 'password': 'admin'}},
+                'connections': {self.protocol: {
+                    'protocol': self.protocol, 'ip': host, 'port': port,
+                    'credentials': {'login': {'username': 'admin', 'password': 'admin'}},
+                }},
+                'custom': {'hostname': name},
+            }
+        return {'testbed': {'name': 'fake_lab'}, 'devices': devices}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--devices', type=int, default=10)
+    parser.add_argument('--protocol', choices=['telnet', 'ssh'], default='telnet')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds before each answer')
+    parser.add_argument('--jitter', type=float, default=0.0, help='up to this many seconds added at random')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--testbed', help='write a pyATS testbed for the fake devices to this file')
+    args = parser.parse_args()
+
+    with FakeLab(args.devices, args.protocol, args.latency, args.jitter, seed=args.seed) as lab:
+        if args.testbed:
+            with open(args.testbed, 'w', encoding='utf-8') as file:
+                yaml.safe_dump(lab.testbed(), file, sort_keys=False)
+        first, last = lab.devices['R1'].address, lab.devices[f'R{args.devices}'].address
+        print(f'{args.devices} fake {args.protocol} devices on {first[0]}:{first[1]}..{last[1]}, Ctrl+C to stop')
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Serves recorded console sessions (connectors/recording.py) back from a local Telnet or SSH server,
+with the original timing or accelerated, so connectors and bootstrap runs can be replayed offline.
+
+Point the testbed connection at the printed address, then
+run from NA_Project_2025: python -m benchmarks.replay recordings/R1-telnet-....jsonl [--speed 10] [--port 2323]
+"""
+import argparse
+import logging
+import socket
+import time
+
+from benchmarks.console_server import ConsoleServer, SSHConsoleServer, TelnetConsoleServer
+from connectors.recording import CLIENT_TO_DEVICE, SessionRecording
+
+logger = logging.getLogger(__name__)
+
+# How long a replay waits for the client to send what the recording says comes next
+INPUT_WAIT = 10.0
+
+
+class ReplaySession:
+    """
+    Plays one recording to one client. Device output is sent at its recorded offset, divided by
+    speed (0 sends it as soon as possible); before each recorded client write the replay waits for
+    the client to have sent as many bytes, so a slower or faster client stays in step. Output
+    delays count from the client's write, which keeps the device's own response time.
+    """
+
+    def __init__(self, recording: SessionRecording, speed: float = 1.0, input_wait: float = INPUT_WAIT):
+        self.recording = recording
+        self.speed = speed
+        self.input_wait = input_wait
+
+    def serve(self, stream):
+        expected = received = 0
+        recorded_anchor, real_anchor = 0.0, time.monotonic()
+        for offset, direction, data in self.recording.events:
+            if direction == CLIENT_TO_DEVICE:
+                expected += len(data)
+                received = self._wait_for_input(stream, received, expected)
+                if received is None:
+                    return
+                recorded_anchor, real_anchor = offset, time.monotonic()
+                continue
+            if self.speed:
+                delay = (offset - recorded_anchor) / self.speed - (time.monotonic() - real_anchor)
+                if delay > 0:
+                    time.sleep(delay)
+            stream.sendall(data)
+        # the recording is over, hold the session until the client closes it
+        self._wait_for_input(stream, received, float('inf'))
+
+    def _wait_for_input(self, stream, received: int, expected: float):
+        """
+        Reads client bytes until `expected` were received in total; None once the client is gone
+        """
+        deadline = time.monotonic() + self.input_wait
+        while received < expected:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if expected != float('inf'):
+                    logger.warning(f'Replay of {self.recording.device}: client sent {received} of '
+                                   f'{expected} bytes, continuing')
+                return received
+            stream.settimeout(remaining)
+            try:
+                chunk = stream.recv(4096)
+            except socket.timeout:
+                continue
+            if not chunk:
+                return None
+            received += len(chunk)
+        return received
+
+
+def replay_server(recording: SessionRecording, speed: float = 1.0, host: str = '127.0.0.1',
+                  port: int = 0) -> ConsoleServer:
+    """
+    Server matching the recording's protocol; every client gets the whole recording from the start
+    """
+    server_class = SSHConsoleServer if recording.protocol == 'ssh' else TelnetConsoleServer
+    return server_class(lambda: ReplaySession(recording, speed), host, port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('recording')
+    parser.add_argument('--speed', type=float, default=1.0, help='1 keeps the recorded timing, 0 removes all delays')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    recording = SessionRecording.load(args.recording)
+    with replay_server(recording, args.speed, args.host, args.port) as server:
+        host, port = server.address
+        print(f'Replaying {recording.device} ({recording.protocol}, {recording.duration:.1f}s recorded) '
+              f'on {host}:{port}, Ctrl+C to stop')
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
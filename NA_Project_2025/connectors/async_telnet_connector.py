@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import re
+from typing import Optional
+
+from pyats.datastructures import AttrDict
+from pyats.topology import Device
+
+from connectors import instrumentation, transcript
+from scripts.show_cache import SHOW_CACHE, changes_config
+
+logger = logging.getLogger(__name__)
+
+# Telnet protocol bytes (RFC 854)
+IAC, DONT, DO, WONT, WILL, SB, SE = 255, 254, 253, 252, 251, 250, 240
+
+
+class AsyncTelnetConnector:
+    """
+    Telnet connector built on asyncio streams instead of telnetlib.
+
+    Has the same connect/read/write/execute/is_connected/disconnect surface as TelnetConnector,
+    but the I/O methods are coroutines, so one event loop can drive every console port at once:
+
+        await asyncio.gather(*(conn.execute('show version', prompt=[r'\\w+#']) for conn in connectors))
+
+    Option negotiation is refused like telnetlib does by default (DO -> WONT, WILL -> DONT).
+    """
+
+    def __init__(self, device: Device):
+        self.device = device
+        self.connection: Optional[AttrDict] = None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._buffer = bytearray()  # received data with telnet commands stripped
+        self._iac = bytearray()  # telnet command split across two reads
+
+    async def connect(self, **kwargs):
+        """
+        Connects to the device using Telnet
+        """
+        self.connection = kwargs['connection']
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.connection.ip.compressed, self.connection.port),
+            timeout=kwargs.get('timeout', 10),
+        )
+
+    async def _fill(self, timeout: Optional[float]) -> bool:
+        """
+        Waits for the next chunk from the socket; returns False on timeout
+        """
+        try:
+            data = await asyncio.wait_for(self._reader.read(4096), timeout)
+        except asyncio.TimeoutError:
+            return False
+        if not data:
+            raise EOFError(f"Telnet connection to {self.device.name} closed")
+        self._buffer += self._process_telnet(data)
+        return True
+
+    def _process_telnet(self, data: bytes) -> bytes:
+        """
+        Strips telnet commands from the stream and answers option negotiation
+        """
+        data = bytes(self._iac) + data
+        self._iac.clear()
+        out = bytearray()
+        replies = bytearray()
+        i = 0
+        while i < len(data):
+            byte = data[i]
+            if byte != IAC:
+                out.append(byte)
+                i += 1
+                continue
+            if i + 1 >= len(data):
+                self._iac += data[i:]
+                break
+            cmd = data[i + 1]
+            if cmd == IAC:
+                out.append(IAC)
+                i += 2
+            elif cmd in (DO, DONT, WILL, WONT):
+                if i + 2 >= len(data):
+                    self._iac += data[i:]
+                    break
+                option = data[i + 2]
+                if cmd == DO:
+                    replies += bytes([IAC, WONT, option])
+                elif cmd == WILL:
+                    replies += bytes([IAC, DONT, option])
+                i += 3
+            elif cmd == SB:
+                end = data.find(bytes([IAC, SE]), i + 2)
+                if end == -1:
+                    self._iac += data[i:]
+                    break
+                i = end + 2
+            else:
+                i += 2
+        if replies and self._writer:
+            self._writer.write(bytes(replies))
+        return bytes(out)
+
+    async def read(self, timeout: float = 0.1) -> str:
+        """
+        Returns what the device sent so far, waiting at most `timeout` for new data
+        """
+        while await self._fill(timeout):
+            pass
+        out = self._buffer.decode(errors='ignore')
+        self._buffer.clear()
+        return out
+
+    async def write(self, command: str) -> None:
+        """
+        Sends command followed by newline
+        """
+        if changes_config(command):
+            SHOW_CACHE.invalidate(self.device.name)
+        await self.write_raw(command + '\n')
+
+    async def write_raw(self, command: str) -> None:
+        """
+        Writes a command without newline
+        """
+        self._writer.write(command.encode().replace(bytes([IAC]), bytes([IAC, IAC])))
+        await self._writer.drain()
+
+    async def expect(self, patterns: list[str], timeout: Optional[float] = None) -> tuple[int, Optional[re.Match], str]:
+        """
+        Reads until one of the regexes matches, like telnetlib.Telnet.expect.
+        Returns (index of pattern, match object, text read); index is -1 on timeout.
+        """
+        regexes = [re.compile(p.encode()) for p in patterns]
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            for index, regex in enumerate(regexes):
+                match = regex.search(self._buffer)
+                if match:
+                    text = bytes(self._buffer[:match.end()])
+                    del self._buffer[:match.end()]
+                    return index, match, text.decode(errors='ignore')
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                break
+            if not await self._fill(remaining):
+                break
+        text = self._buffer.decode(errors='ignore')
+        self._buffer.clear()
+        return -1, None, text
+
+    async def execute(self, command: str, **kwargs) -> str:
+        """
+        Sends a command and waits for one of the prompt patterns.
+        Unlike TelnetConnector.execute, `timeout` bounds the wait instead of sleeping before it.
+        """
+        if not self._writer:
+            raise RuntimeError('Connection is not established')
+        timer = instrumentation.start(self.device.name, 'telnet', command)
+        await self.write(command)
+        index, _, text = await self.expect(kwargs['prompt'], timeout=kwargs.get('timeout', 30))
+        if timer:
+            timer.bytes_read += len(text)
+            timer.finish(' | '.join(kwargs['prompt']), index != -1)
+        transcript.record(self.device.name, 'telnet', command, text)
+        if index == -1:
+            raise TimeoutError(f"Expected prompt {kwargs['prompt']} not found for '{command}' on {self.device.name}")
+        return text
+
+    def is_connected(self) -> bool:
+        """
+        Returns the current status of Telnet connection
+        """
+        return self._writer is not None and not self._writer.is_closing() and not self._reader.at_eof()
+
+    async def disconnect(self):
+        """
+        Closes the connection
+        """
+        if self._writer:
+            self._writer.close()
+            await self._writer.wait_closed()
@@ -0,0 +1,108 @@
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Only the end of the transcript is kept in timeout errors
+ERROR_TAIL = 512
+
+
+@dataclass
+class Statement:
+    """
+    One prompt of a dialog and how to answer it. `answer` may be a callable taking the match;
+    None only records the prompt. An `end` statement finishes the dialog once answered.
+    """
+    pattern: str
+    answer: Union[str, Callable[[re.Match], str], None] = None
+    newline: bool = True  # --More-- and [confirm] react to a single key
+    end: bool = False
+    name: str = ''
+
+
+@dataclass
+class DialogResult:
+    completed: bool
+    last: Optional[str] = None
+    answered: list[str] = field(default_factory=list)
+    transcript: str = ''
+    elapsed: float = 0.0
+
+
+class Dialog:
+    """
+    Table of prompt regexes and their answers, compiled once into a single alternation so the
+    prompt that appears first in the stream wins. The stream is consumed as it arrives: each chunk
+    is searched right away and answered without waiting for the device to go quiet.
+    """
+
+    def __init__(self, statements: list[Statement]):
+        self.statements = statements
+        self._regex = re.compile('|'.join(f'(?P<s{index}>{statement.pattern})'
+                                          for index, statement in enumerate(statements)))
+
+    def match(self, buffer: str) -> Optional[tuple[Statement, re.Match]]:
+        """
+        Returns the earliest prompt in buffer and its match
+        """
+        match = self._regex.search(buffer)
+        if match is None:
+            return None
+        for index, statement in enumerate(self.statements):
+            if match.group(f's{index}') is not None:
+                return statement, match
+        return None
+
+    def run(self, read: Callable[[float], str], write: Callable[[str], None], timeout: float = 60,
+            buffer: str = '') -> DialogResult:
+        """
+        Answers prompts until an end statement matches. read(timeout) returns whatever arrived
+        within timeout ('' when nothing did); write sends the answer as is.
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        result = DialogResult(False)
+        transcript = [buffer]
+        while True:
+            while found := self.match(buffer):
+                statement, match = found
+                buffer = buffer[match.end():]
+                result.last = statement.name or statement.pattern
+                result.answered.append(result.last)
+                if statement.answer is not None:
+                    answer = statement.answer(match) if callable(statement.answer) else statement.answer
+                    write(answer + ('\n' if statement.newline else ''))
+                if statement.end:
+                    result.completed = True
+                    result.transcript = ''.join(transcript)
+                    result.elapsed = time.monotonic() - start
+                    return result
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                transcript = ''.join(transcript)
+                raise TimeoutError(f'Dialog timed out after {result.answered[-3:]}, last output:\n'
+                                   f'{transcript[-ERROR_TAIL:]}')
+            chunk = read(remaining)
+            buffer += chunk
+            transcript.append(chunk)
+
+
+def end_prompt(pattern: str, name: str = 'prompt') -> Statement:
+    return Statement(pattern, end=True, name=name)
+
+
+# IOS `write memory`: older images ask before overwriting, [confirm] takes a single Enter
+IOS_SAVE_DIALOG = Dialog([
+    Statement(r'Continue\? \[no\]:', 'yes', name='continue'),
+    Statement(r'\[confirm\]', '', name='confirm'),
+    end_prompt(r'\w+#\s*$'),
+])
+
+# IOS `crypto key generate rsa`: asks before replacing existing keys
+IOS_CRYPTO_KEY_DIALOG = Dialog([
+    Statement(r'replace them\? \[yes/no\]:', 'yes', name='replace keys'),
+    end_prompt(r'\(config\)#\s*$'),
+])
@@ -0,0 +1,176 @@
+"""
+Per-command timing events from the connectors. Nothing is measured unless a sink is installed:
+connectors ask start() for a timer and get None while there are no sinks.
+
+    sink = HistogramSink()
+    add_sink(sink)
+    ...
+    print(sink.summary())
+"""
+import bisect
+import json
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Optional, Protocol
+
+# Replaced as a whole, never modified, so emitting does not need the lock
+_sinks: tuple = ()
+_lock = threading.Lock()
+
+
+@dataclass
+class CommandEvent:
+    """
+    One command on one device. Times are seconds after the command was sent; first_byte is None
+    when the transport does not expose it, prompt_match is None when no prompt matched.
+    """
+    device: str
+    protocol: str
+    command: str
+    prompt: str
+    sent_at: float  # epoch seconds
+    first_byte: Optional[float]
+    prompt_match: Optional[float]
+    elapsed: float
+    bytes_read: int
+    sleep: float
+
+
+class Sink(Protocol):
+    def emit(self, event: CommandEvent) -> None:
+        ...
+
+
+def add_sink(sink: Sink):
+    global _sinks
+    with _lock:
+        _sinks = _sinks + (sink,)
+
+
+def remove_sink(sink: Sink):
+    global _sinks
+    with _lock:
+        _sinks = tuple(s for s in _sinks if s is not sink)
+
+
+def start(device: str, protocol: str, command: str) -> Optional['CommandTimer']:
+    """
+    Timer for a command that is about to be sent, or None when instrumentation is off
+    """
+    if not _sinks:
+        return None
+    return CommandTimer(device, protocol, command)
+
+
+class CommandTimer:
+    __slots__ = ('device', 'protocol', 'command', 'sent_at', '_sent', '_first', 'bytes_read', 'sleep')
+
+    def __init__(self, device: str, protocol: str, command: str):
+        self.device = device
+        self.protocol = protocol
+        self.command = command
+        self.sent_at = time.time()
+        self._sent = time.monotonic()
+        self._first: Optional[float] = None
+        self.bytes_read = 0
+        self.sleep = 0.0
+
+    def received(self, size: int):
+        if self._first is None and size:
+            self._first = time.monotonic()
+        self.bytes_read += size
+
+    def slept(self, seconds: float):
+        self.sleep += seconds
+
+    def finish(self, prompt: str, matched: bool):
+        elapsed = time.monotonic() - self._sent
+        event = CommandEvent(
+            self.device, self.protocol, self.command, prompt, self.sent_at,
+            None if self._first is None else self._first - self._sent,
+            elapsed if matched else None, elapsed, self.bytes_read, self.sleep,
+        )
+        for sink in _sinks:
+            sink.emit(event)
+
+
+class HistogramSink:
+    """
+    In-memory latency histograms per (device, protocol), with power-of-two buckets from 1 ms to ~65 s.
+    Commands without a prompt match are counted as timeouts.
+    """
+
+    BOUNDS = [0.001 * 2 ** i for i in range(17)]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: dict[tuple[str, str], list[int]] = {}
+        self.timeouts: dict[tuple[str, str], int] = {}
+        self.bytes_read: dict[tuple[str, str], int] = {}
+        self.sleep: dict[tuple[str, str], float] = {}
+
+    def emit(self, event: CommandEvent):
+        key = (event.device, event.protocol)
+        with self._lock:
+            counts = self.counts.setdefault(key, [0] * (len(self.BOUNDS) + 1))
+            if event.prompt_match is None:
+                self.timeouts[key] = self.timeouts.get(key, 0) + 1
+            else:
+                counts[bisect.bisect_left(self.BOUNDS, event.prompt_match)] += 1
+            self.bytes_read[key] = self.bytes_read.get(key, 0) + event.bytes_read
+            self.sleep[key] = self.sleep.get(key, 0.0) + event.sleep
+
+    def percentile(self, q: float, key: Optional[tuple[str, str]] = None) -> Optional[float]:
+        """
+        Upper bound of the bucket holding the q-th percentile (0-100), over all keys by default
+        """
+        with self._lock:
+            rows = [self.counts[key]] if key else list(self.counts.values())
+            merged = [sum(column) for column in zip(*rows)] if rows else []
+        total = sum(merged)
+        if not total:
+            return None
+        rank = q / 100 * total
+        seen = 0
+        for index, count in enumerate(merged):
+            seen += count
+            if seen >= rank and count:
+                return self.BOUNDS[index] if index < len(self.BOUNDS) else float('inf')
+        return float('inf')
+
+    def summary(self) -> dict:
+        with self._lock:
+            keys = list(self.counts)
+        return {
+            f'{device}/{protocol}': {
+                'commands': sum(self.counts[(device, protocol)]) + self.timeouts.get((device, protocol), 0),
+                'timeouts': self.timeouts.get((device, protocol), 0),
+                'p50': self.percentile(50, (device, protocol)),
+                'p90': self.percentile(90, (device, protocol)),
+                'p99': self.percentile(99, (device, protocol)),
+                'bytes_read': self.bytes_read.get((device, protocol), 0),
+                'sleep': round(self.sleep.get((device, protocol), 0.0), 3),
+            }
+            for device, protocol in keys
+        }
+
+
+class JsonlSink:
+    """
+    Appends every event as one JSON line
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def emit(self, event: CommandEvent):
+        line = json.dumps(asdict(event)) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
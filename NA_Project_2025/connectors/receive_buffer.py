@@ -0,0 +1,57 @@
+import socket
+
+# Starting capacity; the buffer doubles whenever a read would not fit
+INITIAL_CAPACITY = 1 << 16
+
+
+class ReceiveBuffer:
+    """
+    Output of one command, received into a single growing bytearray instead of re-building a str
+    or bytes object per chunk. Prompt checks look at tail(), the whole text is decoded once by text(),
+    so a long `show tech` costs time and memory linear in its size.
+    """
+    __slots__ = ('_data', '_size')
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self._data = bytearray(capacity)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, nbytes: int):
+        needed = self._size + nbytes
+        if needed > len(self._data):
+            self._data.extend(bytes(max(needed, 2 * len(self._data)) - len(self._data)))
+
+    def fill(self, stream, nbytes: int = 65535) -> int:
+        """
+        One read from stream appended to the buffer, 0 once the peer closed.
+        Plain sockets read straight into the buffer; paramiko channels and wrappers such as
+        RecordingStream only have recv(), their chunk is copied in once.
+        """
+        self._reserve(nbytes)
+        with memoryview(self._data) as view:
+            free = view[self._size:self._size + nbytes]
+            if isinstance(stream, socket.socket):
+                received = stream.recv_into(free, nbytes)
+            else:
+                chunk = stream.recv(nbytes)
+                received = len(chunk)
+                free[:received] = chunk
+            free.release()
+        self._size += received
+        return received
+
+    def tail(self, nbytes: int) -> str:
+        """
+        The last nbytes decoded; a character cut at either end is dropped
+        """
+        return self._data[max(0, self._size - nbytes):self._size].decode(errors='ignore')
+
+    def getvalue(self) -> bytes:
+        return bytes(self._data[:self._size])
+
+    def text(self, encoding: str = 'utf-8', errors: str = 'ignore') -> str:
+        with memoryview(self._data) as view, view[:self._size] as received:
+            return str(received, encoding, errors)
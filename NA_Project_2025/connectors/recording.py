@@ -0,0 +1,136 @@
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from pyats.datastructures import AttrDict
+
+logger = logging.getLogger(__name__)
+
+# Records every session of the run when set, without touching the testbed
+RECORD_ENV = 'NA_RECORD_DIR'
+DEVICE_TO_CLIENT, CLIENT_TO_DEVICE = 'out', 'in'
+
+_sessions = itertools.count(1)
+
+
+def _header(protocol: str, device: str) -> str:
+    return json.dumps({'protocol': protocol, 'device': device}) + '\n'
+
+
+def _event(offset: float, direction: str, data: bytes) -> str:
+    # latin-1 maps every byte to one code point, so the stream survives JSON unchanged
+    return json.dumps({'t': offset, 'dir': direction, 'data': data.decode('latin-1')}) + '\n'
+
+
+@dataclass
+class SessionRecording:
+    """
+    Timestamped byte stream of one console session. Stored as JSON lines: a header, then one event
+    per read or write with its offset in seconds from the start of the session.
+    """
+    protocol: str
+    device: str = ''
+    events: list[tuple[float, str, bytes]] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return self.events[-1][0] if self.events else 0.0
+
+    def output(self) -> bytes:
+        return b''.join(data for _, direction, data in self.events if direction == DEVICE_TO_CLIENT)
+
+    @classmethod
+    def load(cls, path: str) -> 'SessionRecording':
+        with open(path, encoding='utf-8') as file:
+            header = json.loads(file.readline())
+            recording = cls(header['protocol'], header.get('device', ''))
+            for line in file:
+                event = json.loads(line)
+                recording.events.append((event['t'], event['dir'], event['data'].encode('latin-1')))
+        return recording
+
+    def save(self, path: str):
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(_header(self.protocol, self.device))
+            for offset, direction, data in self.events:
+                file.write(_event(offset, direction, data))
+
+
+class SessionRecorder:
+    """
+    Appends events to a recording file as they happen, so a crashed run still leaves its transcript
+    """
+
+    def __init__(self, path: Path, protocol: str, device: str):
+        self.path = path
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, 'w', encoding='utf-8')
+        self._file.write(_header(protocol, device))
+
+    def event(self, direction: str, data: bytes):
+        if not data:
+            return
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(_event(round(time.monotonic() - self._start, 6), direction, data))
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                logger.info(f'Session recorded to {self.path}')
+
+
+class RecordingStream:
+    """
+    Wraps a socket or paramiko channel and records what goes through recv and send;
+    everything else is passed to the wrapped stream.
+    """
+
+    def __init__(self, stream, recorder: SessionRecorder):
+        self._stream = stream
+        self.recorder = recorder
+
+    def recv(self, nbytes: int) -> bytes:
+        data = self._stream.recv(nbytes)
+        self.recorder.event(DEVICE_TO_CLIENT, data)
+        return data
+
+    def send(self, data) -> int:
+        data = data.encode() if isinstance(data, str) else data
+        sent = self._stream.send(data)
+        self.recorder.event(CLIENT_TO_DEVICE, data[:sent])
+        return sent
+
+    def sendall(self, data):
+        data = data.encode() if isinstance(data, str) else data
+        self._stream.sendall(data)
+        self.recorder.event(CLIENT_TO_DEVICE, data)
+
+    def close(self):
+        self.recorder.close()
+        self._stream.close()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def open_recorder(connection: AttrDict, device: str, protocol: str) -> Optional[SessionRecorder]:
+    """
+    Starts a recording when the connection sets `record: <dir>` or NA_RECORD_DIR is set
+    """
+    directory = connection.get('record') or os.environ.get(RECORD_ENV)
+    if not directory:
+        return None
+    name = f'{device}-{protocol}-{time.strftime("%Y%m%d-%H%M%S")}-{next(_sessions)}.jsonl'
+    return SessionRecorder(Path(directory) / name, protocol, device)
@@ -1,15 +1,32 @@
 import ipaddress
 import logging
 import re
+import socket
 import time
 from ipaddress import IPv4Address, IPv4Interface
 
-from paramiko import SSHClient, AutoAddPolicy, Transport
 from pyats.topology import Device
 
+from connectors import instrumentation, transcript
+from connectors.receive_buffer import ReceiveBuffer
+from connectors.recording import CLIENT_TO_DEVICE, DEVICE_TO_CLIENT, RecordingStream, open_recorder
+from connectors.ssh_pool import POOL, DISABLED_KEX, PooledTransport
+from connectors.transcript import Truncated
+from scripts.show_cache import SHOW_CACHE, changes_config
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Prompts that end the output of a command when the caller does not expect a specific one
+END_PROMPTS = [r'[>#]', r'\[confirm\]', r'\[no\]:']
+# Only the end of the buffer is searched for the prompt
+PROMPT_TAIL = 256
+# A pooled shell left in (config...)# mode by an earlier connector, e.g. after a failed configure()
+CONFIG_PROMPT = re.compile(r'\(config[^)]*\)#\s*$')
+# Interfaces take a few seconds to come up after `no shutdown`; wait_for_interfaces polls this long
+INTERFACES_TIMEOUT = 60
+INTERFACES_INTERVAL = 2
+
 # Transport._preferred_kex = (
 # #     'diffie-hellman-group14-sha1',
 # #     'diffie-hellman-group-exchange-sha1',
@@ -24,14 +41,49 @@ class SSHConnector:
     """
     def __init__(self, device: Device):
         self.device = device
-        self._ssh = SSHClient()
-
-        # Automatically accept new/unknown SSH host keys (prevents yes/no prompt)
-        self._ssh.set_missing_host_key_policy(AutoAddPolicy())
+        self._ssh = None
         self._shell = None
+        self._pooled: PooledTransport = None
+        self._pooled_shell = None
+        self._recording: RecordingStream = None
+        self.command_timeout = 10
 
     def connect(self, **kwargs):
+        """
+        Opens the shell. Unless the connection sets `pool: false`, the device's transport is shared
+        through the SSH pool, so later phases reconnect without a new key exchange. The shell is this
+        connector's alone until disconnect() hands it back to the pool for the next connector.
+        """
         conn = kwargs['connection']
+        self.command_timeout = conn.get('command_timeout', self.command_timeout)
+        if conn.get('pool', True):
+            self._pooled = POOL.get(conn, lease=True)
+            try:
+                self._pooled_shell = self._pooled.shell()
+                self._shell = self._record(conn, self._pooled_shell)
+                # a new shell still has to print its banner, a reused one may hold unread output:
+                # an empty line brings both to a fresh prompt
+                self._shell.send('\n')
+                output, _ = self._read_until_prompt([re.compile(fr'(?:{p})\s*$') for p in END_PROMPTS],
+                                                    time.monotonic() + self.command_timeout)
+                if CONFIG_PROMPT.search(output):
+                    # hand the shell out in privileged exec mode, like a fresh login after `enable`
+                    self._send_cmd('end', prompts=[r'#'])
+            except Exception:
+                # a shell in an unknown state is not handed to anyone else
+                if self._pooled_shell is not None:
+                    self._pooled_shell.close()
+                # give the lease back, or the transport could never be evicted
+                self.disconnect()
+                raise
+            return
+
+        # paramiko takes ~80 ms to import, only pay for it when an SSH connection is actually opened
+        from paramiko import SSHClient, AutoAddPolicy
+
+        self._ssh = SSHClient()
+        # Automatically accept new/unknown SSH host keys (prevents yes/no prompt)
+        self._ssh.set_missing_host_key_policy(AutoAddPolicy())
         self._ssh.connect(
             hostname=conn.ip.compressed,
             port=conn.port or 22,
@@ -39,45 +91,140 @@ class SSHConnector:
             password=conn.credentials.login.password.plaintext,
             look_for_keys = False,
             allow_agent = False,
-            disabled_algorithms = {
-                "kex": [
-                    "curve25519-sha256",
-                    "curve25519-sha256@libssh.org",
-                    "ecdh-sha2-nistp256",
-                    "ecdh-sha2-nistp384",
-                    "ecdh-sha2-nistp521",
-                ]
-            }
+            disabled_algorithms = {"kex": DISABLED_KEX}
         )
-        self._shell = self._ssh.invoke_shell()
+        self._shell = self._record(conn, self._ssh.invoke_shell())
         self._shell.recv(65535)  # Clear banner or leftover output
 
-    def _send_cmd(self, cmd: str, prompts: list[str] = None, delay: float = 0.5, timeout: float = 0) -> str:
-        logger.info(f"Sending command: {cmd}")
-        self._shell.send(f'{cmd}\n')
-        time.sleep(delay + timeout)
+    def _record(self, conn, shell):
+        """
+        Wraps the shell in a recorder when the connection or NA_RECORD_DIR asks for it
+        """
+        recorder = open_recorder(conn, self.device.name, 'ssh')
+        if not recorder:
+            return shell
+        self._recording = RecordingStream(shell, recorder)
+        return self._recording
 
-        output = ""
-        while self._shell.recv_ready():
-            output += self._shell.recv(65535).decode(errors='ignore')
-            time.sleep(0.2)
+    def _send_cmd(self, cmd: str, prompts: list[str] = None, timeout: float = 0) -> str:
+        """
+        Sends a command and reads until one of the prompts ends the output.
+        `timeout` is added to the per-command deadline for slow commands (e.g. write).
+        """
+        logger.info('Sending command: %s', cmd)
+        if self._pooled:
+            self._pooled.last_used = time.monotonic()
+        if changes_config(cmd):
+            SHOW_CACHE.invalidate(self.device.name)
+        timer = instrumentation.start(self.device.name, 'ssh', cmd)
+        self._shell.send(f'{cmd}\n')
+        patterns = [re.compile(fr'(?:{p})\s*$') for p in (prompts or END_PROMPTS)]
+        output, matched = self._read_until_prompt(patterns, time.monotonic() + self.command_timeout + timeout, timer)
+        if timer:
+            timer.finish(' | '.join(prompts or END_PROMPTS), matched)
 
-        logger.info(f"Output:\n{output}")
+        logger.info('Output:\n%s', Truncated(output))
+        transcript.record(self.device.name, 'ssh', cmd, output)
 
         if "% Incomplete command" in output:
             raise RuntimeError(f"Incomplete command detected for '{cmd}':\n{output}")
 
-        if prompts:
-            if not any(re.search(p, output) for p in prompts):
-                raise RuntimeError(f"Expected prompt(s) {prompts} not found in output:\n{output}")
+        if prompts and not matched:
+            raise RuntimeError(f"Expected prompt(s) {prompts} not found in output:\n{output}")
 
         return output
 
+    def _read_until_prompt(self, patterns: list[re.Pattern], deadline: float,
+                           timer: instrumentation.CommandTimer = None) -> tuple[str, bool]:
+        """
+        Blocks on the channel until a prompt matches the tail of the output or the deadline passes
+        """
+        buffer = ReceiveBuffer()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return buffer.text(), False
+            self._shell.settimeout(remaining)
+            try:
+                received = buffer.fill(self._shell)
+            except socket.timeout:
+                return buffer.text(), False
+            if not received:
+                return buffer.text(), False
+            if timer:
+                timer.received(received)
+            tail = buffer.tail(PROMPT_TAIL)
+            if any(p.search(tail) for p in patterns):
+                return buffer.text(), True
+
     def is_connected(self) -> bool:
-        return not self._shell.closed
+        return self._shell is not None and not self._shell.closed
 
     def disconnect(self):
-        self._ssh.close()
+        """
+        Closes the session; a pooled shell and transport stay open for the next connector
+        """
+        if self._recording:
+            self._recording.recorder.close()
+            self._recording = None
+        if self._pooled:
+            if self._pooled_shell is not None:
+                self._pooled.release_shell(self._pooled_shell)
+            POOL.release(self._pooled)
+            self._pooled = self._pooled_shell = self._shell = None
+            return
+        if self._ssh:
+            self._ssh.close()
+
+    def execute_show(self, commands: list[str], timeout: float = 30) -> dict[str, str]:
+        """
+        Runs show commands in parallel on exec channels of the pooled transport, outside the shell
+        """
+        if not self._pooled:
+            return {command: self._send_cmd(command) for command in commands}
+        outputs = self._pooled.exec_many(commands, timeout)
+        if self._recording:
+            # exec channels bypass the shell, their traffic still belongs in the session transcript
+            for command, output in outputs.items():
+                self._recording.recorder.event(CLIENT_TO_DEVICE, f'{command}\n'.encode())
+                self._recording.recorder.event(DEVICE_TO_CLIENT, output.encode())
+        return outputs
+
+    def show(self, command: str, ttl: float = None) -> list:
+        """
+        Parsed records of a show command, served from the show cache until ttl expires
+        or a config command is sent to this device
+        """
+        return SHOW_CACHE.get(self.device.name, command, lambda cmd: self.execute_show([cmd])[cmd], ttl)
+
+    def verify_interfaces(self, ttl: float = None) -> list[str]:
+        """
+        Names of testbed interfaces that are not up/up, or not on their testbed address, in `show ip interface brief`
+        """
+        records = {record.interface: record for record in self.show('show ip interface brief', ttl)}
+        problems = []
+        for intf in self.device.interfaces.values():
+            record = records.get(intf.name)
+            expected = intf.ipv4.ip.compressed if intf.ipv4 else None
+            if record is None or not record.is_up or (expected and record.ip_address != expected):
+                problems.append(intf.name)
+        return problems
+
+    def wait_for_interfaces(self, timeout: float = INTERFACES_TIMEOUT,
+                            interval: float = INTERFACES_INTERVAL) -> list[str]:
+        """
+        Polls verify_interfaces() until every interface is up or timeout passes; returns the last problems.
+        A read with interfaces still down is dropped from the show cache, so every retry asks the device.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            problems = self.verify_interfaces()
+            if not problems:
+                return []
+            SHOW_CACHE.invalidate(self.device.name, 'show ip interface brief')
+            if time.monotonic() >= deadline:
+                return problems
+            time.sleep(interval)
 
     def read(self) -> str:
         return self._shell.recv(65535).decode() if self._shell.recv_ready() else ''
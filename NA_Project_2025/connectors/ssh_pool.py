@@ -0,0 +1,186 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from pyats.datastructures import AttrDict
+
+logger = logging.getLogger(__name__)
+
+# Key exchanges the lab IOS images fail to negotiate
+DISABLED_KEX = [
+    "curve25519-sha256",
+    "curve25519-sha256@libssh.org",
+    "ecdh-sha2-nistp256",
+    "ecdh-sha2-nistp384",
+    "ecdh-sha2-nistp521",
+]
+IDLE_TIMEOUT = 300
+MAX_EXEC_CHANNELS = 4  # IOS allows few concurrent sessions per vty
+KEEPALIVE_INTERVAL = 30
+
+
+class PooledTransport:
+    """
+    One authenticated SSH transport to a device: exec channels for show commands and interactive
+    shells. Each shell belongs to one connector at a time; a released shell is kept open and handed
+    to the next connector, so later phases reuse it without opening a channel.
+    """
+
+    def __init__(self, key: tuple, connection: AttrDict, max_channels: int = MAX_EXEC_CHANNELS):
+        from paramiko import SSHClient, AutoAddPolicy
+
+        self.key = key
+        self._client = SSHClient()
+        self._client.set_missing_host_key_policy(AutoAddPolicy())
+        self._client.connect(
+            hostname=connection.ip.compressed,
+            port=connection.port or 22,
+            username=connection.credentials.login.username,
+            password=connection.credentials.login.password.plaintext,
+            look_for_keys=False,
+            allow_agent=False,
+            disabled_algorithms={"kex": DISABLED_KEX},
+        )
+        self.transport = self._client.get_transport()
+        self.transport.set_keepalive(KEEPALIVE_INTERVAL)
+        self._channels = threading.BoundedSemaphore(max_channels)
+        self._max_channels = max_channels
+        # shells released by connectors, ready to be handed out again
+        self._free_shells = []
+        self._shells_lock = threading.Lock()
+        self.last_used = time.monotonic()
+        # connectors currently holding the transport, changed under the pool lock
+        self.leases = 0
+
+    def is_healthy(self) -> bool:
+        """
+        Transport still up and answering; send_ignore fails fast on a half-closed socket
+        """
+        if not self.transport.is_active() or not self.transport.is_authenticated():
+            return False
+        try:
+            self.transport.send_ignore()
+        except (EOFError, OSError) as e:
+            logger.info(f"SSH transport {self.key} failed health check: {e}")
+            return False
+        return True
+
+    def shell(self):
+        """
+        An interactive shell for one connector only: a released one that is still open, or a new channel
+        """
+        self.last_used = time.monotonic()
+        with self._shells_lock:
+            while self._free_shells:
+                shell = self._free_shells.pop()
+                if not shell.closed:
+                    return shell
+        channel = self.transport.open_session()
+        channel.get_pty()
+        channel.invoke_shell()
+        return channel
+
+    def release_shell(self, shell):
+        """
+        Gives a shell back after its connector is done with it
+        """
+        self.last_used = time.monotonic()
+        if shell.closed:
+            return
+        with self._shells_lock:
+            self._free_shells.append(shell)
+
+    def exec(self, command: str, timeout: float = 30) -> str:
+        """
+        Runs one command on its own exec channel; up to max_channels run at the same time
+        """
+        with self._channels:
+            self.last_used = time.monotonic()
+            channel = self.transport.open_session(timeout=timeout)
+            try:
+                channel.settimeout(timeout)
+                channel.exec_command(command)
+                chunks = []
+                while chunk := channel.recv(65535):
+                    chunks.append(chunk)
+                return b''.join(chunks).decode(errors='ignore')
+            finally:
+                channel.close()
+                self.last_used = time.monotonic()
+
+    def exec_many(self, commands: list[str], timeout: float = 30) -> dict[str, str]:
+        with ThreadPoolExecutor(max_workers=min(self._max_channels, len(commands)) or 1) as pool:
+            return dict(zip(commands, pool.map(lambda command: self.exec(command, timeout), commands)))
+
+    def close(self):
+        # closing the transport closes its channels; closing the shells first would leave the
+        # device's answers to that unread and the socket would be reset
+        with self._shells_lock:
+            self._free_shells.clear()
+        self._client.close()
+
+
+class SSHTransportPool:
+    """
+    Process-wide map of device -> PooledTransport. Transports are health checked when handed out,
+    replaced when dead and closed once unused for idle_timeout seconds; a leased transport is never idle.
+    """
+
+    def __init__(self, idle_timeout: float = IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._transports: dict[tuple, PooledTransport] = {}
+        # guards the maps only; connecting and health checks hold the device's own lock,
+        # so devices connect side by side while two connectors of one device share a transport
+        self._lock = threading.Lock()
+        self._device_locks: dict[tuple, threading.Lock] = {}
+
+    def get(self, connection: AttrDict, lease: bool = False) -> PooledTransport:
+        """
+        The device's transport, connected on first use. With lease=True it is not evicted until release()
+        """
+        key = (connection.ip.compressed, connection.port or 22, connection.credentials.login.username)
+        self.evict_idle()
+        with self._lock:
+            device_lock = self._device_locks.setdefault(key, threading.Lock())
+        with device_lock:
+            with self._lock:
+                pooled = self._transports.get(key)
+            if pooled is not None and not pooled.is_healthy():
+                with self._lock:
+                    self._transports.pop(key, None)
+                pooled.close()
+                pooled = None
+            if pooled is None:
+                logger.info(f"Opening pooled SSH transport to {key[0]}:{key[1]}")
+                pooled = PooledTransport(key, connection, connection.get('max_channels', MAX_EXEC_CHANNELS))
+            with self._lock:
+                self._transports[key] = pooled
+                pooled.last_used = time.monotonic()
+                if lease:
+                    pooled.leases += 1
+            return pooled
+
+    def release(self, pooled: PooledTransport):
+        with self._lock:
+            pooled.leases = max(0, pooled.leases - 1)
+            pooled.last_used = time.monotonic()
+
+    def evict_idle(self, now: Optional[float] = None):
+        now = now or time.monotonic()
+        with self._lock:
+            for key, pooled in list(self._transports.items()):
+                if not pooled.leases and now - pooled.last_used > self.idle_timeout:
+                    logger.info(f"Closing idle SSH transport to {key[0]}:{key[1]}")
+                    pooled.close()
+                    del self._transports[key]
+
+    def close_all(self):
+        with self._lock:
+            for pooled in self._transports.values():
+                pooled.close()
+            self._transports.clear()
+
+
+POOL = SSHTransportPool()
@@ -1,13 +1,41 @@
 import json
-from typing import Optional
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional
 
 import requests
 import urllib3
-from bravado.client import SwaggerClient
-from bravado.requests_client import RequestsClient
+from requests.adapters import HTTPAdapter
+from requests.auth import AuthBase
 from pyats.datastructures import AttrDict
 from pyats.topology import Device
 
+if TYPE_CHECKING:
+    # bravado pulls in jsonschema and takes seconds to import, see __build_client
+    from bravado.client import SwaggerClient
+
+logger = logging.getLogger(__name__)
+
+SPEC_ENDPOINT = '/apispec/ngfw.json'
+VERSION_ENDPOINT = '/api/fdm/latest/operational/systeminfo/default'
+TOKEN_ENDPOINT = '/api/fdm/latest/fdm/token'
+# refresh this many seconds before the access token expires
+TOKEN_REFRESH_MARGIN = 60
+DEPLOY_TIMEOUT = 600
+DEPLOY_DONE_STATES = ('FINISHED', 'DEPLOYED')
+DEPLOY_FAILED_STATES = ('FAILED', 'DEPLOY_FAILED', 'CANCELLED')
+# Override with `spec_cache: <dir>` in the testbed connection block
+SPEC_CACHE_DIR = Path.home() / '.cache' / 'na_project' / 'swagger'
+
+# Process-wide: (base url, username, spec version) -> SwaggerClient, so reconnects skip parsing the spec again.
+# The client's session authenticates as that user, so another user or port gets a client of its own.
+_CLIENTS: dict[tuple[str, str, str], 'SwaggerClient'] = {}
+_CLIENTS_LOCK = threading.Lock()
+
 
 class SwaggerConnector:
     """
@@ -23,45 +51,126 @@ class SwaggerConnector:
         self.device = device
         self.connection: Optional[AttrDict] = None
         self.api_endpoints: list[str] = []
-        self.client: Optional[SwaggerClient] = None
+        self.client: Optional['SwaggerClient'] = None
         urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
     def connect(self, **kwargs):
         self.connection = kwargs['connection']
-        endpoint = '/apispec/ngfw.json'
         self._url = f'https://{self.connection.ip.compressed}:{self.connection.port}'
-        self.__login(
+        self._auth = TokenManager.for_device(
+            self._url,
             self.connection.credentials.login.username,
-            self.connection.credentials.login.password.plaintext
+            self.connection.credentials.login.password.plaintext,
         )
-        self._headers.update({'Authorization': f'{self.token_type} {self.access_token}'})
+        self._auth.ensure_valid()
+        self._session = requests.Session()
+        self._session.headers.update(self._headers)
+        self._session.auth = self._auth
+
+        cache = SpecCache(Path(self.connection.get('spec_cache', SPEC_CACHE_DIR)), self.connection.ip.compressed)
+        spec = self.__load_spec(cache)
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(self.__client_key(cache))
+            if client is None:
+                client = self.__build_client(spec)
+                # every request of the client asks the user's shared manager for a current token
+                client.swagger_spec.http_client.session.auth = self._auth
+                _CLIENTS[self.__client_key(cache)] = client
+        self.client = client
+
+    def __client_key(self, cache: 'SpecCache') -> tuple[str, str, str]:
+        return self._url, self.connection.credentials.login.username, cache.version
+
+    @property
+    def access_token(self) -> Optional[str]:
+        return self._auth.access_token if self._auth else None
+
+    @property
+    def refresh_token(self) -> Optional[str]:
+        return self._auth.refresh_token if self._auth else None
+
+    @property
+    def token_type(self) -> Optional[str]:
+        return self._auth.token_type if self._auth else None
+
+    def __load_spec(self, cache: 'SpecCache') -> Optional[dict]:
+        """
+        Returns the spec dict, or None when the cached copy is still valid and a client for it is already built.
+        The cached copy is validated with If-None-Match when the FDM sent an ETag, otherwise by probing
+        the software version.
+        """
+        if cache.etag:
+            response = self._session.get(
+                self._url + SPEC_ENDPOINT, headers={'If-None-Match': cache.etag}, verify=False
+            )
+            if response.status_code == 304:
+                logger.info(f"Swagger spec for {self.device.name} unchanged (ETag {cache.etag})")
+                return self.__cached_spec(cache)
+            return self.__store_spec(cache, response)
+
+        software_version = self.__software_version()
+        if cache.version and software_version and cache.software_version == software_version:
+            logger.info(f"Swagger spec for {self.device.name} unchanged (FDM {software_version})")
+            return self.__cached_spec(cache)
+        return self.__store_spec(cache, self._session.get(self._url + SPEC_ENDPOINT, verify=False), software_version)
+
+    def __cached_spec(self, cache: 'SpecCache') -> Optional[dict]:
+        with _CLIENTS_LOCK:
+            if self.__client_key(cache) in _CLIENTS:
+                return None
+        return cache.load()
+
+    def __store_spec(self, cache: 'SpecCache', response: requests.Response,
+                     software_version: Optional[str] = None) -> dict:
+        response.raise_for_status()
+        spec = response.json()
+        cache.save(spec, response.headers.get('ETag'), software_version)
+        logger.info(f"Downloaded Swagger spec {cache.version} for {self.device.name}")
+        return spec
+
+    def __software_version(self) -> Optional[str]:
+        try:
+            response = self._session.get(self._url + VERSION_ENDPOINT, verify=False)
+            return response.json().get('softwareVersion')
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"FDM version probe failed on {self.device.name}: {e}")
+            return None
+
+    def __build_client(self, spec: dict) -> 'SwaggerClient':
+        from bravado.client import SwaggerClient
+        from bravado.requests_client import RequestsClient
+
         https_client = RequestsClient()
         https_client.session.verify = False
         https_client.ssl_verify = False
-        https_client.session.headers = self._headers
-        swagger_client = SwaggerClient.from_url(
-            self._url + endpoint,
+        https_client.session.headers.update(self._headers)
+        return SwaggerClient.from_spec(
+            spec,
+            origin_url=self._url + SPEC_ENDPOINT,
             http_client=https_client,
-            request_headers=self._headers,
             config={'validate_certificate': False, 'validate_responses': False},
         )
-        self.client = swagger_client
-
-    def __login(self, username: Optional[str] = None, password: Optional[str] = None):
-        endspoint = '/api/fdm/latest/fdm/token'
-        response = requests.post(
-            self._url + endspoint,
-            verify=False,
-            data=json.dumps({'username': username, 'password': password, 'grant_type': 'password'}),
-            headers=self._headers
-        )
-        self.access_token = response.json()['access_token']
-        self.token_type = response.json()['token_type']
-        self.refresh_token = response.json()['refresh_token']
 
+    def deploy(self, **kwargs) -> 'DeploymentReport':
+        """
+        Starts a deployment of the pending changes and waits for it, see wait_for_deployment
+        """
+        deployment = self.client.Deployment.addDeployment().result()
+        return self.wait_for_deployment(deployment.id, **kwargs)
+
+    def wait_for_deployment(self, deployment_id: str, timeout: float = DEPLOY_TIMEOUT,
+                            initial_delay: float = 1.0, max_delay: float = 15.0,
+                            on_progress: Optional[Callable[[str, str], None]] = None) -> 'DeploymentReport':
+        """
+        Waits for a deployment of this device, see wait_for_deployment at module level
+        """
+        return wait_for_deployment(self.client, self.device.name, deployment_id, timeout,
+                                   initial_delay, max_delay, on_progress)
 
     def disconnect(self):
-        pass
+        if self._session:
+            self._session.close()
+            self._session = None
 
     def execute(self, command, **kwargs):
         pass
@@ -71,3 +180,203 @@ class SwaggerConnector:
 
     def is_connected(self):
         pass
+
+
+@dataclass
+class DeploymentReport:
+    """
+    Outcome of one FDM deployment: final state, poll count and (status message, seconds) per phase
+    """
+    deployment_id: str
+    state: Optional[str] = None
+    elapsed: float = 0.0
+    polls: int = 0
+    phases: list[tuple[str, float]] = field(default_factory=list)
+
+    def __str__(self):
+        phases = ', '.join(f'{message} {seconds:.1f}s' for message, seconds in self.phases)
+        return f"{self.state} after {self.elapsed:.1f}s and {self.polls} polls [{phases}]"
+
+
+def wait_for_deployment(client: 'SwaggerClient', device_name: str, deployment_id: str,
+                        timeout: float = DEPLOY_TIMEOUT, initial_delay: float = 1.0, max_delay: float = 15.0,
+                        on_progress: Optional[Callable[[str, str], None]] = None) -> DeploymentReport:
+    """
+    Polls getDeployment with exponential backoff and jitter until the deployment ends or timeout passes.
+    Every new deploymentStatusMessages entry is passed to on_progress(taskState, statusMessage) and
+    closes the previous phase in the returned report. The delay drops back to initial_delay whenever
+    the deployment makes progress, so short phases are not overslept.
+    Raises RuntimeError when the deployment fails and TimeoutError when it does not end in time.
+    """
+    report = DeploymentReport(deployment_id)
+    start = time.monotonic()
+    deadline = start + timeout
+    phase_start = start
+    delay = initial_delay
+    seen = 0
+    while True:
+        status = client.Deployment.getDeployment(objId=deployment_id).result()
+        report.polls += 1
+        now = time.monotonic()
+        messages = status['deploymentStatusMessages'] or []
+        for message in messages[seen:]:
+            task_state, text = message.taskState, message.statusMessage
+            if report.phases:
+                report.phases[-1] = (report.phases[-1][0], now - phase_start)
+            report.phases.append((text, 0.0))
+            phase_start = now
+            logger.info(f"Deployment {deployment_id} on {device_name}: {task_state} {text}")
+            if on_progress:
+                on_progress(task_state, text)
+        if len(messages) > seen:
+            seen = len(messages)
+            delay = initial_delay
+        # the deployment object has an overall state, older FDM versions only report it per message
+        last_task = messages[-1].taskState if messages else None
+        report.state = getattr(status, 'state', None) or last_task
+        states = {report.state, last_task}
+        report.elapsed = now - start
+        if states & set(DEPLOY_DONE_STATES):
+            if report.phases:
+                report.phases[-1] = (report.phases[-1][0], now - phase_start)
+            return report
+        if states & set(DEPLOY_FAILED_STATES):
+            raise RuntimeError(f"Deployment {deployment_id} on {device_name} failed: {report}")
+        if now >= deadline:
+            raise TimeoutError(f"Deployment {deployment_id} on {device_name} not done after {timeout}s: {report}")
+        time.sleep(min(random.uniform(delay / 2, delay), deadline - now))
+        delay = min(delay * 2, max_delay)
+
+
+class TokenManager(AuthBase):
+    """
+    OAuth tokens of one FDM, shared by every SwaggerConnector that logs in to it with the same user.
+
+    Used as the requests auth of the connector sessions: each request gets the current access token,
+    which is refreshed with the refresh token shortly before it expires instead of logging in again.
+    FDM throttles password logins, so a full login only happens when there is no usable refresh token.
+    """
+    _managers: dict[tuple[str, str], 'TokenManager'] = {}
+    _managers_lock = threading.Lock()
+
+    def __init__(self, url: str, username: str, password: str, refresh_margin: float = TOKEN_REFRESH_MARGIN):
+        self.url = url
+        self.username = username
+        self.password = password
+        self.refresh_margin = refresh_margin
+        self.access_token: Optional[str] = None
+        self.refresh_token: Optional[str] = None
+        self.token_type: Optional[str] = None
+        self.expires_at = 0.0
+        self.refresh_expires_at = 0.0
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session.headers.update({'Content-Type': 'application/json', 'Accept': 'application/json'})
+
+    @classmethod
+    def for_device(cls, url: str, username: str, password: str) -> 'TokenManager':
+        with cls._managers_lock:
+            manager = cls._managers.get((url, username))
+            if manager is None:
+                manager = cls(url, username, password)
+                cls._managers[(url, username)] = manager
+            manager.password = password
+            return manager
+
+    def ensure_valid(self) -> str:
+        """
+        Returns the Authorization header value, refreshing or logging in first when needed
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.access_token and now < self.expires_at - self.refresh_margin:
+                pass
+            elif self.refresh_token and now < self.refresh_expires_at:
+                try:
+                    self.__request_token({'grant_type': 'refresh_token', 'refresh_token': self.refresh_token})
+                except requests.RequestException as e:
+                    logger.warning(f"Token refresh on {self.url} failed, logging in again: {e}")
+                    self.__login()
+            else:
+                self.__login()
+            return f'{self.token_type} {self.access_token}'
+
+    def invalidate(self):
+        """
+        Forgets the access token, e.g. after the FDM answered 401
+        """
+        with self._lock:
+            self.expires_at = 0.0
+
+    def __login(self):
+        self.__request_token({'grant_type': 'password', 'username': self.username, 'password': self.password})
+
+    def __request_token(self, body: dict):
+        response = self.session.post(self.url + TOKEN_ENDPOINT, data=json.dumps(body), verify=False)
+        response.raise_for_status()
+        token = response.json()
+        now = time.monotonic()
+        self.access_token = token['access_token']
+        self.token_type = token['token_type']
+        self.refresh_token = token.get('refresh_token', self.refresh_token)
+        self.expires_at = now + token.get('expires_in', 1800)
+        self.refresh_expires_at = now + token.get('refresh_expires_in', 2400)
+        logger.info(f"Got FDM token on {self.url} ({body['grant_type']}), expires in {token.get('expires_in')}s")
+
+    def __call__(self, request: requests.PreparedRequest) -> requests.PreparedRequest:
+        request.headers['Authorization'] = self.ensure_valid()
+        request.register_hook('response', self.__retry_unauthorized)
+        return request
+
+    def __retry_unauthorized(self, response: requests.Response, **kwargs) -> requests.Response:
+        """
+        Retries once with a new token when the FDM rejected the current one before its expiry
+        """
+        if response.status_code != 401 or getattr(response.request, '_token_retried', False):
+            return response
+        self.invalidate()
+        response.content  # release the connection back to the pool
+        request = response.request.copy()
+        request.headers['Authorization'] = self.ensure_valid()
+        request._token_retried = True
+        retry = response.connection.send(request, **kwargs)
+        retry.history.append(response)
+        retry.request = request
+        return retry
+
+
+class SpecCache:
+    """
+    On-disk copy of one device's ngfw.json, stored as <dir>/<host>/<spec version>.json
+    next to an index.json holding the ETag and FDM software version it was fetched with.
+    """
+
+    def __init__(self, directory: Path, host: str):
+        self.directory = directory / host
+        index = self.directory / 'index.json'
+        meta = json.loads(index.read_text()) if index.is_file() else {}
+        # an index whose spec file went missing is as good as no cache
+        if not (self.directory / f"{meta.get('version')}.json").is_file():
+            meta = {}
+        self.version: Optional[str] = meta.get('version')
+        self.etag: Optional[str] = meta.get('etag')
+        self.software_version: Optional[str] = meta.get('software_version')
+
+    def load(self) -> dict:
+        return json.loads((self.directory / f'{self.version}.json').read_text())
+
+    def save(self, spec: dict, etag: Optional[str], software_version: Optional[str]):
+        self.version = spec.get('info', {}).get('version', 'unknown')
+        self.etag, self.software_version = etag, software_version
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.__write(self.directory / f'{self.version}.json', spec)
+        self.__write(self.directory / 'index.json',
+                     {'version': self.version, 'etag': etag, 'software_version': software_version})
+
+    @staticmethod
+    def __write(path: Path, data: dict):
+        # write then rename, so a concurrent reader never sees half a spec
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(data))
+        tmp.replace(path)
@@ -1,6 +1,6 @@
 import ipaddress
 import logging
-import re
+import select
 # pylint: disable=deprecated-module
 import telnetlib
 import time
@@ -9,6 +9,11 @@ from typing import Optional
 from pyats.datastructures import AttrDict
 from pyats.topology import Device
 
+from connectors import instrumentation, transcript
+from connectors.recording import RecordingStream, open_recorder
+from connectors.dialog import Dialog, DialogResult, Statement, end_prompt, IOS_SAVE_DIALOG, IOS_CRYPTO_KEY_DIALOG
+from scripts.show_cache import SHOW_CACHE, changes_config
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
@@ -33,6 +38,10 @@ class TelnetConnector:
             host=self.connection.ip.compressed,
             port=self.connection.port,
         )
+        recorder = open_recorder(self.connection, self.device.name, 'telnet')
+        if recorder:
+            # raw socket level, so option negotiation is replayed too
+            self._conn.sock = RecordingStream(self._conn.sock, recorder)
 
     def read(self) -> str:
         """
@@ -44,6 +53,8 @@ class TelnetConnector:
         """
         Sends command followed by newline
         """
+        if changes_config(command):
+            SHOW_CACHE.invalidate(self.device.name)
         self._conn.write(command.encode() + b'\n')
 
     def write_raw(self, command: str) -> str:
@@ -67,11 +78,22 @@ class TelnetConnector:
         if not self._conn:
             raise RuntimeError('Connection is not established')
         prompt: list[bytes] = list(map(lambda s: s.encode(), kwargs['prompt']))
+        if changes_config(command):
+            SHOW_CACHE.invalidate(self.device.name)
+        timer = instrumentation.start(self.device.name, 'telnet', command)
         self._conn.write(f'{command}\n'.encode())
         if kwargs.get('timeout'):
             time.sleep(kwargs['timeout'])
+            if timer:
+                timer.slept(kwargs['timeout'])
         response = self._conn.expect(prompt)
-        return response[2].decode('utf8') if isinstance(response, tuple) else response
+        if timer and isinstance(response, tuple):
+            # telnetlib hands over the output only once it matched, so there is no first-byte time
+            timer.bytes_read += len(response[2])
+            timer.finish(' | '.join(kwargs['prompt']), response[0] != -1)
+        output = response[2].decode('utf8') if isinstance(response, tuple) else response
+        transcript.record(self.device.name, 'telnet', command, output)
+        return output
 
     def configure_initial_interface(self):
         """
@@ -98,75 +120,88 @@ class TelnetConnector:
         self.execute('ip ssh version 2', prompt=[r'\(config\)#'])
         self.execute(f'username {username} privilege 15 secret {password}', prompt=[r'\(config\)#'])
         self.execute('ip domain name cisco.com', prompt=[r'\(config\)#'])
-        self.execute('crypto key generate rsa modulus 2048', prompt=[r'\(config\)#'])
+        self.run_dialog(IOS_CRYPTO_KEY_DIALOG, command='crypto key generate rsa modulus 2048')
         self.execute('line vty 0 4', prompt=[r'\(config-line\)#'])
         self.execute('transport input ssh', prompt=[r'\(config-line\)#'])
         self.execute('login local', prompt=[r'\(config-line\)#'])
         self.execute('exit', prompt=[r'\(config\)#'])
 
-    def configure_ftd(self):
+    def read_chunk(self, timeout: float) -> str:
+        """
+        Returns what arrived within timeout, as soon as anything did
+        """
+        data = self._conn.read_very_eager()
+        if not data:
+            select.select([self._conn], [], [], timeout)
+            data = self._conn.read_very_eager()
+        return data.decode(errors='ignore')
+
+    def run_dialog(self, dialog: Dialog, command: Optional[str] = None, timeout: float = 60) -> DialogResult:
         """
-        Goes through the initial setup of FTD
+        Optionally sends command, then answers the dialog's prompts until one of its end prompts
+        """
+        timer = instrumentation.start(self.device.name, 'telnet', command) if command is not None else None
+        if command is not None:
+            self.write(command)
+        read = self.read_chunk
+        if timer:
+            def read(remaining: float) -> str:
+                text = self.read_chunk(remaining)
+                timer.received(len(text))
+                return text
+        try:
+            result = dialog.run(read, lambda text: self._conn.write(text.encode()), timeout)
+        except TimeoutError:
+            if timer:
+                timer.finish('', False)
+            raise
+        if timer:
+            timer.finish(result.last, True)
+        transcript.record(self.device.name, 'telnet', command or '', result.transcript)
+        return result
+
+    def ftd_setup_dialog(self) -> Dialog:
+        """
+        Login, EULA and first-boot wizard of FTD, ending at the CLI prompt
         """
         creds = self.device.credentials
         mgmt = self.device.interfaces['GigabitEthernet0/0'].ipv4
-        mgmt_ip, mask = mgmt.ip.compressed, mgmt.network.netmask.exploded
         gateway = ipaddress.ip_address(self.device.custom['mgmt_gw']).compressed
         dns = ipaddress.ip_address(self.device.custom['dns']).compressed
-        domain = self.device.custom['domain']
-
-        self.write('\n\r')
-        time.sleep(2)
-        out = self.read()
-
-        if re.search(r'(firepower) login:', out):
-            logger.info("Attempting FTD login")
-            if 'Password:' in out:
-                self.execute('\n', prompt=[r'FTD login\:'])
-            self.write(creds.default.username)
-            time.sleep(3)
-            out = self.read()
-            self.write(
-                creds.login.password.plaintext if 'Enter new password:' in out else creds.default.password.plaintext)
-            time.sleep(5)
-            out = self.read()
+        new_password = creds.login.password.plaintext
+        return Dialog([
+            Statement(r'firepower login: ?', creds.default.username, name='login'),
+            Statement(r'(?m:^Password: ?)', creds.default.password.plaintext, name='password'),
+            end_prompt(r'Login incorrect', name='login incorrect'),
+            Statement(r'Press <ENTER> to display the EULA: ?', '', name='eula'),
+            Statement(r'--More--', ' ', newline=False, name='more'),
+            Statement(r'AGREE to the EULA: ?', 'YES', name='agree'),
+            Statement(r'Enter new password: ?', new_password, name='new password'),
+            Statement(r'Confirm new password: ?', new_password, name='confirm password'),
+            Statement(r'IPv4\? \(y/n\) \[y\]: ?', 'y', name='ipv4'),
+            Statement(r'IPv6\? \(y/n\) \[n\]: ?', 'n', name='ipv6'),
+            Statement(r'\(dhcp/manual\) \[manual\]: ?', 'manual', name='dhcp'),
+            Statement(r'IPv4 address for the management interface \[[^\]]*\]: ?', mgmt.ip.compressed,
+                      name='address'),
+            Statement(r'netmask for the management interface \[[^\]]*\]: ?', mgmt.network.netmask.exploded,
+                      name='netmask'),
+            Statement(r'gateway for the management interface \[[^\]]*\]: ?', gateway, name='gateway'),
+            Statement(r'fully qualified hostname for this system \[[^\]]*\]: ?', 'firepower', name='hostname'),
+            Statement(r"DNS servers or 'none' \[[^\]]*\]: ?", dns, name='dns'),
+            Statement(r"search domains or 'none' \[[^\]]*\]: ?", self.device.custom['domain'], name='domain'),
+            Statement(r'Manage the device locally\? \(yes/no\) \[yes\]: ?', 'yes', name='manage locally'),
+            end_prompt(r'(?:^|\n)> ?$'),
+        ])
 
-        if any(k in out for k in ['Press <ENTER>', 'You must change', '--More--']):
-            logger.info("Proceeding through FTD setup")
-            if 'Press <ENTER>' in out or '--More--' in out:
-                for _ in range(20):
-                    out = self.write_raw(' ')
-                    time.sleep(.3)
-                    if 'AGREE to the EULA' in out:
-                        print(f'Printing: {out}')
-                        self.execute('YES', prompt=[r'Enter new password\:'])
-
-            cmds = [
-                (creds.login.password.plaintext, r'Confirm new password:'),
-                (creds.login.password.plaintext, r'IPv4\? \(y/n\) \[y\]:'),
-                ('y', r'IPv6\? \(y/n\) \[n\]:'),
-                ('n', r'\(dhcp\/manual\) \[manual\]:'),
-                ('manual', r'management interface \[.*\]:'),
-                (mgmt_ip, r'netmask for the management interface \[.*\]:'),
-                (mask, r'gateway for the management interface \[.*\]:'),
-                (gateway, r'fully qualified hostname for this system \[.*\]:'),
-                ('firepower', r'comma\-separated list of DNS servers or \'none\' \[.*\]:'),
-                (dns, r'comma\-separated list of search domains or \'none\' \[\]:'),
-                (domain, r'Manage the device locally\? \(yes\/no\) \[yes\]:')
-            ]
-            for cmd, prompt in cmds:
-                self.execute(cmd, prompt=[prompt])
-            self.write('yes')
-
-            # Wait for setup to finish
-            for _ in range(10):
-                time.sleep(2)
-                if '>' in self.read():
-                    logger.info("FTD setup completed.")
-                    return
-            logger.error("FTD setup timed out.")
-        elif 'Login incorrect' in out:
+    def configure_ftd(self, timeout: float = 600):
+        """
+        Goes through the initial setup of FTD, answering each prompt as soon as it appears
+        """
+        result = self.run_dialog(self.ftd_setup_dialog(), command='', timeout=timeout)
+        if result.last == 'login incorrect':
             logger.error("FTD default credentials failed.")
+            return
+        logger.info(f"FTD setup completed in {result.elapsed:.1f}s after {len(result.answered)} prompts.")
 
     def enable_secret(self):
         """
@@ -180,10 +215,7 @@ class TelnetConnector:
         Saves the running configuration
         """
         self.execute('end', prompt=[r'\w+#'])
-        self.write('write memory')
-        if self.contains(['Continue? [no]:', '[confirm]']):
-            self.execute('yes', prompt=[r'\w+#'])
-        self.execute('', prompt=[r'\w+#'])
+        self.run_dialog(IOS_SAVE_DIALOG, command='write memory')
 
     def configure_routes(self):
         if not self.device.custom.get('routes'):
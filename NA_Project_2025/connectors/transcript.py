@@ -0,0 +1,111 @@
+import atexit
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Optional
+
+# Logged command output keeps this many characters from its start and end
+LOG_HEAD = 1024
+LOG_TAIL = 512
+TRANSCRIPT_BUFFER = 1 << 16
+
+# Full transcripts go to their own logger, never to the console
+_transcript = logging.getLogger('na.transcript')
+_transcript.propagate = False
+_transcript.setLevel(logging.CRITICAL + 1)
+_listener: Optional[QueueListener] = None
+_handler: Optional[QueueHandler] = None
+_lock = threading.Lock()
+
+
+class Truncated:
+    """
+    Log argument that shortens long output to its head and tail, only when the record is formatted:
+    logger.info('Output:\\n%s', Truncated(output)) costs nothing while INFO is off.
+    """
+    __slots__ = ('text', 'head', 'tail')
+
+    def __init__(self, text: str, head: int = LOG_HEAD, tail: int = LOG_TAIL):
+        self.text = text
+        self.head = head
+        self.tail = tail
+
+    def __str__(self) -> str:
+        omitted = len(self.text) - self.head - self.tail
+        if omitted <= 0:
+            return self.text
+        return f'{self.text[:self.head]}\n... [{omitted} characters omitted] ...\n{self.text[-self.tail:]}'
+
+
+class PerDeviceFileHandler(logging.Handler):
+    """
+    Writes each record to <directory>/<device>.log through a large buffer.
+    Only the queue listener thread calls it, so file writes never block a connector.
+    """
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._files = {}
+        self.setFormatter(logging.Formatter('%(asctime)s [%(protocol)s] %(command)s\n%(message)s'))
+
+    def emit(self, record: logging.LogRecord):
+        file = self._files.get(record.device)
+        if file is None:
+            file = open(self.directory / f'{record.device}.log', 'a', encoding='utf-8', buffering=TRANSCRIPT_BUFFER)
+            self._files[record.device] = file
+        file.write(self.format(record) + '\n')
+
+    def flush(self):
+        for file in self._files.values():
+            file.flush()
+
+    def close(self):
+        for file in self._files.values():
+            file.close()
+        self._files.clear()
+        super().close()
+
+
+def enable_transcripts(directory: str):
+    """
+    Starts writing full per-device transcripts under directory from a background thread
+    """
+    global _listener, _handler
+    with _lock:
+        if _listener is not None:
+            return
+        records = queue.SimpleQueue()
+        _handler = QueueHandler(records)
+        _listener = QueueListener(records, PerDeviceFileHandler(directory))
+        _listener.start()
+        _transcript.addHandler(_handler)
+        _transcript.setLevel(logging.DEBUG)
+    atexit.register(disable_transcripts)
+
+
+def disable_transcripts():
+    """
+    Stops the background writer after it wrote everything queued so far
+    """
+    global _listener, _handler
+    with _lock:
+        if _listener is None:
+            return
+        _transcript.removeHandler(_handler)
+        _transcript.setLevel(logging.CRITICAL + 1)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = _handler = None
+
+
+def record(device: str, protocol: str, command: str, output: str):
+    """
+    Adds a command and its full output to the device's transcript, when transcripts are enabled
+    """
+    if _transcript.isEnabledFor(logging.DEBUG):
+        _transcript.debug('%s', output, extra={'device': device, 'protocol': protocol, 'command': command})
@@ -1,34 +1,92 @@
-
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
 
 from pyats.aetest.steps import Steps
+from pyats.topology import Device
 from connectors.swagger_connector import SwaggerConnector
 
+logger = logging.getLogger(__name__)
+
+# edits in flight at once; stays below the default RequestsClient pool size
+EDIT_WORKERS = 8
+# FTD management and diagnostic ports are set up at bootstrap and never synced from the testbed
+MANAGEMENT_INTERFACES = ('Management', 'Diagnostic')
+
+
+def desired_interfaces(device: Device) -> dict[str, dict]:
+    """
+    Returns the state the testbed asks for of the addressed data interfaces, keyed by hardwareName.
+    An interface without an alias is skipped: FDM needs the alias as its logical name.
+    """
+    desired = {}
+    for name, interface in device.interfaces.items():
+        if getattr(interface, 'ipv4', None) is None or name.startswith(MANAGEMENT_INTERFACES):
+            continue
+        if not getattr(interface, 'alias', None):
+            logger.warning('%s %s has no alias to use as its logical name, not syncing it', device.name, name)
+            continue
+        desired[name] = {
+            'name': interface.alias,
+            'enabled': True,
+            'ipAddress': interface.ipv4.ip.compressed,
+            'netmask': interface.ipv4.netmask.compressed,
+        }
+    return desired
+
+
+def apply_interface_state(swagger: SwaggerConnector, obj, desired: dict) -> bool:
+    """
+    Updates obj in place to a static ipv4 interface from desired; returns False when it already matched
+    """
+    address = obj.ipv4.ipAddress
+    if (obj.name == desired['name'] and obj.enabled and obj.ipv4.ipType == 'STATIC' and not obj.ipv4.dhcp
+            and address is not None and address.ipAddress == desired['ipAddress']
+            and address.netmask == desired['netmask']):
+        return False
+    if address is None:
+        obj.ipv4.ipAddress = swagger.client.get_model('HAIPv4Address')()
+    obj.ipv4.ipAddress.ipAddress = desired['ipAddress']
+    obj.ipv4.ipAddress.netmask = desired['netmask']
+    obj.enabled = True
+    obj.ipv4.dhcp = False
+    obj.ipv4.ipType = 'STATIC'
+    obj.name = desired['name']
+    return True
+
+
+def sync_interfaces(swagger: SwaggerConnector, device: Device,
+                    on_edit: Optional[Callable[[str], None]] = None) -> list[str]:
+    """
+    Brings the FDM physical interfaces in line with the testbed in one list call and
+    concurrent edits of only the interfaces that differ. Returns the edited hardware names.
+    """
+    desired = desired_interfaces(device)
+    live = swagger.client.Interface.getPhysicalInterfaceList().result()['items']
+    changed = [obj for obj in live
+               if obj.hardwareName in desired and apply_interface_state(swagger, obj, desired[obj.hardwareName])]
+    if not changed:
+        return []
+
+    def edit(obj):
+        swagger.client.Interface.editPhysicalInterface(objId=obj.id, body=obj).result()
+        if on_edit:
+            on_edit(obj.hardwareName)
+        return obj.hardwareName
+
+    # bravado's RequestsClient only sends on .result(), so the edits are spread over threads
+    with ThreadPoolExecutor(max_workers=min(EDIT_WORKERS, len(changed))) as pool:
+        return list(pool.map(edit, changed))
+
 
 def configure_interfaces(steps: Steps, swagger: SwaggerConnector):
     """
-    Configures ipv4 addresses on interfaces
+    Configures ipv4 addresses on interfaces and deploys once if anything changed
 
     Contributors: Dusca Alexandru, Furmanek Carina
     """
     with steps.start("Configuring Interface"):
-        existing_object = swagger.client.Interface.getPhysicalInterfaceList().result()['items']
-        for obj in existing_object:
-            if obj.hardwareName == 'GigabitEthernet0/0':
-                interface_ip = device.interfaces['GigabitEthernet0/0'].ipv4.ip.compressed
-                interface_mask = device.interfaces['GigabitEthernet0/0'].ipv4.netmask.compressed
-                obj.ipv4.ipAddress.ipAddress = interface_ip
-                obj.ipv4.ipAddress.netmask = interface_mask
-                obj.enabled = True
-                obj.ipv4.dhcp = False
-                obj.ipv4.ipType = 'STATIC'
-            elif obj.hardwareName == 'GigabitEthernet0/1':
-                interface_ip = device.interfaces['GigabitEthernet0/1'].ipv4.ip.compressed
-                interface_mask = device.interfaces['GigabitEthernet0/1'].ipv4.netmask.compressed
-                obj.ipv4.ipAddress.ipAddress = interface_ip
-                obj.ipv4.ipAddress.netmask = interface_mask
-                obj.enabled = True
-                obj.ipv4.dhcp = False
-                obj.ipv4.ipType = 'STATIC'
-            else:
-                continue
-            swagger.client.Interface.editPhysicalInterface(objId=obj.id, body=obj).result()
\ No newline at end of file
+        edited = sync_interfaces(swagger, swagger.device)
+    if edited:
+        with steps.start("Deploy configuration"):
+            swagger.deploy()
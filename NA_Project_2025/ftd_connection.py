@@ -2,13 +2,12 @@ from pyats.aetest import steps
 
 import ssl
 
-from pyats.topology import loader
-
 ssl._create_default_https_context = ssl._create_unverified_context
 from connectors.swagger_connector import SwaggerConnector
+from ftd_configuration import sync_interfaces
+from scripts.testbed_provider import LazyTestbed
 
-tb = loader.load('testbed_example.yaml')
-device_fdm = tb.devices['FTD']
+tb = LazyTestbed('testbed_example.yaml')
 
 
 class ConfigureFDM:
@@ -20,6 +19,7 @@ class ConfigureFDM:
         """
         Contributors: Dusca Alexandru, Furmanek Carina
         """
+        device_fdm = self.device_fdm
         with steps.start('Connect to FDM'):
             swagger: SwaggerConnector = device_fdm.connections.rest['class'](device_fdm)
             swagger.connect(connection=device_fdm.connections.rest)
@@ -35,33 +35,7 @@ class ConfigureFDM:
                 print(result)
 
         with steps.start("configure Interface"):
-            existing_object = swagger.client.Interface.getPhysicalInterfaceList().result()['items']
-            for obj in existing_object:
-                if obj.hardwareName == 'GigabitEthernet0/0':
-                    obj.ipv4.ipAddress.ipAddress = device_fdm.interfaces['GigabitEthernet0/0'].ipv4.ip.compressed
-                    obj.ipv4.ipAddress.netmask = device_fdm.interfaces['GigabitEthernet0/0'].ipv4.netmask.compressed
-                    obj.enabled = True
-                    obj.ipv4.dhcp = False
-                    obj.ipv4.ipType = 'STATIC'
-                    obj.name = device_fdm.interfaces['GigabitEthernet0/0'].alias
-                elif obj.hardwareName == 'GigabitEthernet0/1':
-                    obj.ipv4.ipAddress.ipAddress = device_fdm.interfaces['GigabitEthernet0/1'].ipv4.ip.compressed
-                    obj.ipv4.ipAddress.netmask = device_fdm.interfaces['GigabitEthernet0/1'].ipv4.netmask.compressed
-                    obj.enabled = True
-                    obj.ipv4.dhcp = False
-                    obj.ipv4.ipType = 'STATIC'
-                    obj.name = device_fdm.interfaces['GigabitEthernet0/1'].alias
-                elif obj.hardwareName == 'GigabitEthernet0/2':
-                    obj.ipv4.ipAddress.ipAddress = device_fdm.interfaces['GigabitEthernet0/2'].ipv4.ip.compressed
-                    obj.ipv4.ipAddress.netmask = device_fdm.interfaces['GigabitEthernet0/2'].ipv4.netmask.compressed
-                    obj.enabled = True
-                    obj.ipv4.dhcp = False
-                    obj.ipv4.ipType = 'STATIC'
-                    obj.name = device_fdm.interfaces['GigabitEthernet0/2'].alias
-                else:
-                    continue
-                result = swagger.client.Interface.editPhysicalInterface(objId=obj.id, body=obj).result()
-                print(result)
+            sync_interfaces(swagger, device_fdm, on_edit=lambda name: print(f"{name} updated"))
 
         # with steps.start('create security zone'):
         #     ref = swagger.client.get_model('ReferenceModel')
@@ -125,11 +99,5 @@ class ConfigureFDM:
         #     network_object = swagger.client.get_model('NetworkObject')
 
         with steps.start('Deploy configuration'):
-            response = swagger.client.Deployment.addDeployment().result()
-            for _ in range(10):
-                tasks = swagger.client.Deployment.getDeployment(objId=response.id).result()
-                status = tasks['deploymentStatusMessages'][-1]
-                if status.taskState == "FINISHED":
-                    break
-            else:
-                print("Deployment failed")
\ No newline at end of file
+            report = swagger.deploy(on_progress=lambda state, message: print(f"{state}: {message}"))
+            print(report)
\ No newline at end of file
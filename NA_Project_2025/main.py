@@ -3,13 +3,15 @@ from typing import Dict
 
 from pyats import aetest
 from pyats.aetest.steps import Steps
-from pyats.topology import loader
 
 from connectors.ssh_connector import SSHConnector
 from connectors.telnet_connector import TelnetConnector
+from connectors.transcript import enable_transcripts
+from scripts.bootstrap_scheduler import BootstrapScheduler
+from scripts.testbed_provider import LazyTestbed
 from ubuntu_config import configure as configure_ubuntu_server
 
-testbed = loader.load('testbed_config.yaml')
+testbed = LazyTestbed('testbed_config.yaml')
 
 log = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, encoding='utf-8')
@@ -26,10 +28,16 @@ class SetupTelnetConnections(aetest.CommonSetup):
     def initialize_telnet_objects(self):
         """Create a dictionary to store TelnetConnector objects"""
         self.parent.parameters['telnet_objects'] = {}
+        if testbed.custom.get('transcript_dir'):
+            # full output of every command, one file per device, written in the background
+            enable_transcripts(testbed.custom['transcript_dir'])
+        workers = testbed.custom.get('bootstrap_workers', 4)
+        self.parent.parameters['scheduler'] = BootstrapScheduler(max_workers=workers)
 
     @aetest.subsection
-    def connect_telnet_devices(self, telnet_objects: Dict[str, TelnetConnector]):
+    def connect_telnet_devices(self, telnet_objects: Dict[str, TelnetConnector], scheduler: BootstrapScheduler):
         """Connects all devices with a Telnet connection in the testbed"""
+        jobs = {}
         for dev_name, dev in testbed.devices.items():
             if 'telnet' not in dev.connections:
                 log.info(f"No Telnet connection for '{dev_name}'")
@@ -40,14 +48,17 @@ class SetupTelnetConnections(aetest.CommonSetup):
                 log.warning(f"Telnet class not defined for '{dev_name}'")
                 continue
 
-            try:
+            def connect(dev_name=dev_name, dev=dev, telnet_class=telnet_class):
                 log.info(f"Connecting to '{dev_name}' via Telnet...")
                 conn = telnet_class(dev)
                 conn.connect(connection=dev.connections.telnet)
                 telnet_objects[dev_name] = conn
                 log.info(f"Successfully connected to '{dev_name}'")
-            except Exception as e:
-                log.error(f"[ERROR] Could not connect to '{dev_name}': {e}")
+
+            jobs[dev_name] = connect
+
+        scheduler.run_phase('telnet_connect', jobs)
+        log.info(scheduler.summary('telnet_connect'))
 
 
 class TelnetDeviceConfiguration(aetest.Testcase):
@@ -65,19 +76,23 @@ class TelnetDeviceConfiguration(aetest.Testcase):
                 self.failed("Failed to configure Ubuntu Server", goto=['next_tc'])
 
     @aetest.test
-    def configure_telnet_devices(self, steps: Steps, telnet_objects: Dict[str, TelnetConnector]):
-        """Iterate over telnet-connected devices and apply configs"""
+    def configure_telnet_devices(self, steps: Steps, telnet_objects: Dict[str, TelnetConnector],
+                                 scheduler: BootstrapScheduler):
+        """Apply configs on all telnet-connected devices in parallel"""
+        jobs = {}
         for dev_name, connector in telnet_objects.items():
-            with steps.start(f"Configuring {dev_name}"):
-                try:
-                    if connector.device.os == 'ftd':
-                        connector.configure_ftd()
-                    else:
-                        connector.do_initial_config()
-                        # continue
-                    log.info(f"Successfully configured '{dev_name}'")
-                except Exception as e:
-                    log.error(f"Failed to configure '{dev_name}': {e}")
+            def configure(dev_name=dev_name, connector=connector):
+                if connector.device.os == 'ftd':
+                    connector.configure_ftd()
+                else:
+                    connector.do_initial_config()
+                log.info(f"Successfully configured '{dev_name}'")
+
+            jobs[dev_name] = configure
+
+        scheduler.run_phase('telnet', jobs, depends_on=('telnet_connect',))
+        scheduler.report_steps(steps, 'telnet')
+        log.info(scheduler.summary('telnet'))
 
 
 class SSHDeviceConfiguration(aetest.Testcase):
@@ -87,8 +102,9 @@ class SSHDeviceConfiguration(aetest.Testcase):
         self.parent.parameters['ssh_objects'] = {}
 
     @aetest.test
-    def connect_all_devices_via_ssh(self, ssh_objects: dict[str, SSHConnector]):
+    def connect_all_devices_via_ssh(self, ssh_objects: dict[str, SSHConnector], scheduler: BootstrapScheduler):
         """Connects all testbed devices via SSH and stores objects"""
+        jobs = {}
         for dev_name, dev in testbed.devices.items():
             if dev.type != 'router':
                 log.info(f"[SKIP] Device '{dev_name}' is type '{dev.type}', skipping SSH connection")
@@ -96,30 +112,57 @@ class SSHDeviceConfiguration(aetest.Testcase):
             if 'ssh' not in dev.connections:
                 log.warning(f"Device '{dev_name}' has no SSH connection defined, skipping")
                 continue
-            try:
-                ssh_class = dev.connections.ssh.get('class', None)
-                if not ssh_class:
-                    log.warning(f"Device '{dev_name}' SSH connection has no 'class' defined, skipping")
-                    continue
+            ssh_class = dev.connections.ssh.get('class', None)
+            if not ssh_class:
+                log.warning(f"Device '{dev_name}' SSH connection has no 'class' defined, skipping")
+                continue
 
+            def connect(dev_name=dev_name, dev=dev, ssh_class=ssh_class):
                 log.info(f"Connecting to device '{dev_name}' via SSH...")
                 ssh_conn = ssh_class(dev)
                 ssh_conn.connect(connection=dev.connections.ssh)
                 ssh_objects[dev_name] = ssh_conn
                 log.info(f"Successfully connected to device '{dev_name}'")
 
-            except Exception as e:
-                log.error(f"Failed to connect to device '{dev_name}' via SSH: {e}")
+            jobs[dev_name] = connect
+
+        # SSH only comes up once the Telnet bootstrap enabled it on the device
+        scheduler.run_phase('ssh_connect', jobs, depends_on=('telnet',))
+        log.info(scheduler.summary('ssh_connect'))
 
     @aetest.test
-    def configure_all_devices(self, steps: Steps, ssh_objects: dict[str, SSHConnector]):
-        """Configures all connected devices"""
+    def configure_all_devices(self, steps: Steps, ssh_objects: dict[str, SSHConnector],
+                              scheduler: BootstrapScheduler):
+        """Configures all connected devices in parallel"""
+        jobs = {}
         for dev_name, connector in ssh_objects.items():
-            with steps.start(f"Configuring {dev_name}"):
+            def configure(dev_name=dev_name, connector=connector):
                 log.info(f"Configuring device '{dev_name}'...")
                 connector.configure()
                 log.info(f"Finished configuring device '{dev_name}'")
 
+            jobs[dev_name] = configure
+
+        scheduler.run_phase('ssh', jobs, depends_on=('ssh_connect',))
+        scheduler.report_steps(steps, 'ssh')
+        log.info(scheduler.summary('ssh'))
+
+    @aetest.test
+    def verify_interfaces(self, steps: Steps, ssh_objects: dict[str, SSHConnector], scheduler: BootstrapScheduler):
+        """Checks every configured interface comes up with its testbed address"""
+        jobs = {}
+        for dev_name, connector in ssh_objects.items():
+            def verify(dev_name=dev_name, connector=connector):
+                problems = connector.wait_for_interfaces()
+                if problems:
+                    raise RuntimeError(f"Interfaces not up with their address on '{dev_name}': {problems}")
+
+            jobs[dev_name] = verify
+
+        scheduler.run_phase('verify', jobs, depends_on=('ssh',))
+        scheduler.report_steps(steps, 'verify', title='Verifying')
+        log.info(scheduler.summary('verify'))
+
 
 class ConnectionToFTD(aetest.Testcase):
     """Connects to the FTD via Swagger REST API and performs simple verification"""
@@ -2,9 +2,9 @@ import os
 import subprocess
 import unittest
 
-from pyats.topology import loader
-
-from scripts.ping_helper import test_pings
+from scripts.icmp_prober import probe_icmp
+from scripts.ping_helper import test_pings, summarize_pings
+from scripts.testbed_provider import get_testbed
 
 vor: bool = True
 
@@ -23,7 +23,7 @@ class RealPingTests(unittest.TestCase):
          testbed and collect all destination IPs.
         """
         testbed_path = os.path.join(os.path.dirname(__file__), "testbed_config.yaml")
-        cls.testbed = loader.load(testbed_path)
+        cls.testbed = get_testbed(testbed_path)
 
         cls.device = cls.testbed.devices["UbuntuServer"]
         cls.device_name = cls.device.name
@@ -101,3 +101,14 @@ class RealPingTests(unittest.TestCase):
                 self.assertTrue(success, msg=f"Ping to {ip} failed")
 
         self.assertTrue(result, msg="One or more devices did not respond to ping")
+
+    def test_ping_all_devices_in_process(self):
+        """Pings all IPs at once from ICMP sockets in this process instead of one ping subprocess each."""
+        stats = probe_icmp(self.topology_addresses)
+        result, ping_details = summarize_pings(stats, self.device_name)
+
+        for ip, success in ping_details.items():
+            with self.subTest(ip=ip):
+                self.assertTrue(success, msg=f"Ping to {ip} failed: {stats[ip]}")
+
+        self.assertTrue(result, msg="One or more devices did not respond to ping")
@@ -0,0 +1,109 @@
+"""
+Runs per-device bootstrap phases (Telnet, SSH) in parallel with a bounded worker pool
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from pyats.aetest.steps import Steps
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DeviceResult:
+    """Outcome of one phase on one device"""
+    device: str
+    phase: str
+    ok: bool
+    duration: float
+    error: Optional[str] = None
+
+
+class BootstrapScheduler:
+    """
+    Runs the same phase for many devices at once.
+
+    A device is skipped in a phase when one of the phases it depends on failed for it, directly or
+    further upstream: a device whose telnet_connect failed has no telnet job, and is still skipped
+    in a phase that depends on telnet. "Telnet before SSH" holds per device while the devices
+    themselves run in parallel.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        if max_workers < 1:
+            raise ValueError('max_workers must be at least 1')
+        self.max_workers = max_workers
+        self.results: dict[str, dict[str, DeviceResult]] = {}
+        self.wall_clock: dict[str, float] = {}
+        self.dependencies: dict[str, tuple[str, ...]] = {}
+
+    def _run_job(self, phase: str, dev_name: str, job: Callable[[], None]) -> DeviceResult:
+        start = time.monotonic()
+        try:
+            job()
+        except Exception as e:
+            logger.error(f"[{phase}] '{dev_name}' failed: {e}")
+            return DeviceResult(dev_name, phase, False, time.monotonic() - start, str(e))
+        return DeviceResult(dev_name, phase, True, time.monotonic() - start)
+
+    def run_phase(self, phase: str, jobs: dict[str, Callable[[], None]],
+                  depends_on: tuple[str, ...] = ()) -> dict[str, DeviceResult]:
+        """
+        Runs every job of a phase with at most max_workers devices in flight
+        """
+        self.dependencies[phase] = depends_on
+        phase_results: dict[str, DeviceResult] = {}
+        runnable = {}
+        for dev_name, job in jobs.items():
+            failed = next(filter(None, (self._failed(dep, dev_name) for dep in depends_on)), None)
+            if failed:
+                phase_results[dev_name] = DeviceResult(
+                    dev_name, phase, False, 0.0, f"skipped, '{failed}' phase failed")
+                continue
+            runnable[dev_name] = job
+
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=phase) as pool:
+            futures = [pool.submit(self._run_job, phase, dev_name, job) for dev_name, job in runnable.items()]
+            for future in as_completed(futures):
+                result = future.result()
+                phase_results[result.device] = result
+        self.wall_clock[phase] = time.monotonic() - start
+
+        self.results[phase] = {name: phase_results[name] for name in jobs}
+        return self.results[phase]
+
+    def _failed(self, phase: str, dev_name: str) -> Optional[str]:
+        """
+        The phase that failed for the device: this one, or one upstream when the device had no job here
+        """
+        result = self.results.get(phase, {}).get(dev_name)
+        if result is not None:
+            return None if result.ok else phase
+        return next(filter(None, (self._failed(dep, dev_name) for dep in self.dependencies.get(phase, ()))), None)
+
+    def report_steps(self, steps: Steps, phase: str, title: str = 'Configuring'):
+        """
+        Reports each device result of a phase as its own aetest step
+        """
+        for dev_name, result in self.results.get(phase, {}).items():
+            with steps.start(f"{title} {dev_name}", continue_=True) as step:
+                if result.ok:
+                    step.passed(f"done in {result.duration:.2f}s")
+                else:
+                    step.failed(result.error)
+
+    def sequential_time(self, phase: str) -> float:
+        """Time the phase would have taken running the devices one after another"""
+        return sum(result.duration for result in self.results.get(phase, {}).values())
+
+    def summary(self, phase: str) -> str:
+        """Wall-clock comparison of the parallel run against the sequential path"""
+        sequential = self.sequential_time(phase)
+        parallel = self.wall_clock.get(phase, 0.0)
+        speedup = sequential / parallel if parallel else 1.0
+        return (f"[{phase}] {len(self.results.get(phase, {}))} devices, workers={self.max_workers}: "
+                f"parallel {parallel:.2f}s vs sequential {sequential:.2f}s (x{speedup:.1f})")
@@ -0,0 +1,132 @@
+import logging
+import os
+import select
+import socket
+import struct
+import time
+from typing import Optional
+
+from scripts.ping_helper import PingStats, sweep_local
+
+logger = logging.getLogger(__name__)
+
+ICMP_ECHO_REQUEST, ICMP_ECHO_REPLY = 8, 0
+PAYLOAD = b'na-project-probe'
+RECEIVE_BUFFER = 1 << 20
+
+
+def checksum(data: bytes) -> int:
+    """
+    Internet checksum (RFC 1071)
+    """
+    if len(data) % 2:
+        data += b'\0'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+
+def open_icmp_socket() -> tuple[Optional[socket.socket], bool]:
+    """
+    Returns (socket, is_raw). Unprivileged datagram ICMP sockets need net.ipv4.ping_group_range
+    to include our group; raw sockets need root or CAP_NET_RAW. (None, False) when neither is allowed.
+    """
+    for sock_type in (socket.SOCK_DGRAM, socket.SOCK_RAW):
+        try:
+            return socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP), sock_type == socket.SOCK_RAW
+        except PermissionError:
+            continue
+    return None, False
+
+
+class IcmpProber:
+    """
+    Pings many hosts from one socket inside this process: every round sends one echo request to each
+    target back to back, and replies are collected with select until the next round is due.
+    Falls back to ping subprocesses (ping_helper.sweep_local) when ICMP sockets are not permitted.
+    """
+
+    def __init__(self, count: int = 4, interval: float = 0.2, timeout: float = 1.0):
+        self.count = count
+        self.interval = interval
+        self.timeout = timeout
+        self.identifier = os.getpid() & 0xffff
+
+    def probe(self, targets: list[str]) -> dict[str, Optional[PingStats]]:
+        sock, is_raw = open_icmp_socket()
+        if sock is None:
+            logger.info('ICMP sockets not permitted, falling back to ping subprocesses')
+            return sweep_local(targets, count=self.count, timeout=self.timeout)
+        with sock:
+            return self.__probe(sock, is_raw, targets)
+
+    def __probe(self, sock: socket.socket, is_raw: bool, targets: list[str]) -> dict[str, Optional[PingStats]]:
+        addresses = {target: socket.gethostbyname(target) for target in targets}
+        by_address = {address: target for target, address in addresses.items()}
+        rtts: dict[str, list[float]] = {target: [] for target in targets}
+        sent_at: dict[int, tuple[str, float]] = {}
+        sock.setblocking(False)
+        # a whole round of replies arrives at once; raw sockets also get a copy of every request on loopback
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+
+        sequence = 0
+        for round_number in range(self.count):
+            round_start = time.monotonic()
+            for target, address in addresses.items():
+                sequence = (sequence + 1) & 0xffff
+                try:
+                    sock.sendto(self.__echo_request(sequence), (address, 0))
+                except OSError as e:
+                    logger.debug(f'Echo request to {target} not sent: {e}')
+                    continue
+                sent_at[sequence] = (target, time.monotonic())
+            last_round = round_number == self.count - 1
+            self.__collect(sock, is_raw, by_address, sent_at, rtts,
+                           round_start + (self.timeout if last_round else self.interval), stop_early=last_round)
+
+        return {target: self.__stats(target, samples) for target, samples in rtts.items()}
+
+    def __echo_request(self, sequence: int) -> bytes:
+        header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, self.identifier, sequence)
+        return struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, checksum(header + PAYLOAD), self.identifier,
+                           sequence) + PAYLOAD
+
+    def __collect(self, sock, is_raw, by_address, sent_at, rtts, until: float, stop_early: bool):
+        """
+        Reads echo replies until `until`; with stop_early, returns once every request was answered
+        """
+        while (remaining := until - time.monotonic()) > 0:
+            if stop_early and not sent_at:
+                return
+            readable, _, _ = select.select([sock], [], [], remaining)
+            if not readable:
+                return
+            while True:
+                try:
+                    packet, (address, _) = sock.recvfrom(2048)
+                except BlockingIOError:
+                    break
+                received = time.monotonic()
+                if is_raw:
+                    packet = packet[(packet[0] & 0x0f) * 4:]  # strip the IP header
+                icmp_type, _, _, identifier, sequence = struct.unpack('!BBHHH', packet[:8])
+                # datagram sockets only see their own replies, with the identifier rewritten by the kernel
+                if icmp_type != ICMP_ECHO_REPLY or (is_raw and identifier != self.identifier):
+                    continue
+                target, sent = sent_at.get(sequence, (None, 0.0))
+                if target is None or by_address.get(address) != target:
+                    continue
+                del sent_at[sequence]
+                rtts[target].append((received - sent) * 1000)
+
+    def __stats(self, target: str, samples: list[float]) -> PingStats:
+        stats = PingStats(target, self.count, len(samples), 100.0 * (self.count - len(samples)) / self.count)
+        if samples:
+            stats.rtt_min, stats.rtt_avg, stats.rtt_max = min(samples), sum(samples) / len(samples), max(samples)
+        return stats
+
+
+def probe_icmp(targets: list[str], count: int = 4, interval: float = 0.2,
+               timeout: float = 1.0) -> dict[str, Optional[PingStats]]:
+    return IcmpProber(count, interval, timeout).probe(targets)
@@ -1,9 +1,14 @@
 # ping_helper.py
 
+import asyncio
 import logging
-import time
-from typing import Callable, Tuple
 import re
+import shlex
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+from connectors.transcript import Truncated
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -11,47 +16,190 @@ logger.setLevel(logging.INFO)
 Contributors: Jude Victor
 """
 
-def test_pings(
+LINUX_OS = ('ubuntu', 'linux')
+IOS_SUMMARY = re.compile(
+    r'Success rate is (\d{1,3}) percent(?: \((\d+)/(\d+)\))?(?:, round-trip min/avg/max = (\d+)/(\d+)/(\d+) ms)?'
+)
+LINUX_SUMMARY = re.compile(r'(\d+) packets transmitted, (\d+) (?:packets )?received.*?([\d.]+)% packet loss')
+LINUX_RTT = re.compile(r'(?:rtt|round-trip) min/avg/max(?:/\w+)? = ([\d.]+)/([\d.]+)/([\d.]+)')
+# lines of the multiplexed Linux sweep are tagged with their target: "[10.0.0.1] 64 bytes from ..."
+TAGGED_LINE = re.compile(r'^\[([^\]\s]+)\] (.*)$', re.MULTILINE)
+POLL_INTERVAL = 0.1
+
+
+@dataclass
+class PingStats:
+    """
+    Summary of the replies to one target; rtt values are in milliseconds
+    """
+    target: str
+    sent: int = 0
+    received: int = 0
+    loss: float = 100.0
+    rtt_min: Optional[float] = None
+    rtt_avg: Optional[float] = None
+    rtt_max: Optional[float] = None
+
+    @property
+    def reachable(self) -> bool:
+        return self.received > 0 or self.loss < 100
+
+
+def parse_ping(target: str, output: str) -> Optional[PingStats]:
+    """
+    Parses IOS or Linux ping output; returns None while the summary has not arrived yet
+    """
+    match = IOS_SUMMARY.search(output)
+    if match:
+        rate, received, sent, *rtt = match.groups()
+        stats = PingStats(target, int(sent or 0), int(received or 0), 100.0 - int(rate))
+        if rtt[0] is not None:
+            stats.rtt_min, stats.rtt_avg, stats.rtt_max = map(float, rtt)
+        return stats
+
+    match = LINUX_SUMMARY.search(output)
+    if not match:
+        return None
+    stats = PingStats(target, int(match.group(1)), int(match.group(2)), float(match.group(3)))
+    rtt = LINUX_RTT.search(output, match.end())
+    if rtt:
+        stats.rtt_min, stats.rtt_avg, stats.rtt_max = map(float, rtt.groups())
+    return stats
+
+
+def summarize_pings(stats: dict[str, Optional[PingStats]], device_name: str) -> Tuple[bool, dict[str, bool]]:
+    """Reduces sweep statistics to the (all reachable, reachable per address) result of test_pings"""
+    ping_results: dict[str, bool] = {}
+    for addr, result in stats.items():
+        ping_results[addr] = result is not None and result.reachable
+        if ping_results[addr]:
+            logger.info('Ping from %s to %s succeeded (%s)\n', device_name, addr, result)
+        else:
+            logger.warning('Ping from %s to %s failed\n', device_name, addr)
+    return all(ping_results.values()), ping_results
+
+
+def _tagged_outputs(output: str) -> dict[str, str]:
+    per_target: dict[str, list[str]] = {}
+    for target, line in TAGGED_LINE.findall(output):
+        per_target.setdefault(target, []).append(line)
+    return {target: '\n'.join(lines) for target, lines in per_target.items()}
+
+
+def sweep_pings(
     topology_addresses: list[str],
     execute: Callable[..., str],
     read: Callable[[], str],
-    device_name: str,
-    os: str
-    ) -> Tuple[bool, dict[str, bool]]:
-    """Testing connectivity with ping command from a device to a list of IP addresses from testbed"""
-    ping_results: dict[str, bool] = {}
-    pattern = r'(?:Success rate is (\d{1,3}) percent)|(?:(\d{1,3})\% packet loss)'
+    os: str,
+    count: int = 4,
+    wait: float = 12.0,
+    on_result: Optional[Callable[[PingStats], None]] = None,
+    exec_many: Optional[Callable[[list[str], float], dict[str, str]]] = None,
+    ) -> dict[str, Optional[PingStats]]:
+    """
+    Pings every address from a device session and returns the parsed statistics per address
+    (None when no summary arrived within `wait` seconds).
 
-    if os != 'ubuntu':
-        execute('\r', prompt=[r'\w+#'])
+    On Linux all pings run at once in the background of a single shell command and their output is
+    tagged per target, so the sweep takes about as long as the slowest ping. The IOS CLI has no background
+    jobs: given exec_many (SSHConnector.execute_show on a pooled transport) every ping gets its own exec
+    channel and they run in parallel, as many at a time as the device allows channels. Without it the
+    pings run one at a time in the shell, each returning as soon as its summary is read.
+    """
+    stats: dict[str, Optional[PingStats]] = dict.fromkeys(topology_addresses)
+
+    def collect(target: str, text: str) -> bool:
+        if stats[target] is None:
+            stats[target] = parse_ping(target, text)
+            if stats[target] is not None and on_result:
+                on_result(stats[target])
+        return stats[target] is not None
+
+    if os in LINUX_OS and len(topology_addresses) > 1:
+        jobs = ' '.join(shlex.quote(addr) for addr in topology_addresses)
+        command = f'for a in {jobs}; do (ping -c {count} -W 1 "$a" 2>&1 | sed "s/^/[$a] /") & done; wait'
+        logger.info('Running ping sweep: %s', command)
+        out = execute(command, prompt=[])
+        deadline = time.monotonic() + wait
+        while True:
+            for addr, text in _tagged_outputs(out).items():
+                if addr in stats:
+                    collect(addr, text)
+            if all(stats.values()) or time.monotonic() >= deadline:
+                break
+            time.sleep(POLL_INTERVAL)
+            out += read()
+        if not all(stats.values()):
+            logger.error('Ping sweep incomplete:\n%s', Truncated(out))
+        return stats
+
+    if os not in LINUX_OS and exec_many is not None:
+        commands = {f'ping {addr}': addr for addr in topology_addresses}
+        logger.info('Running ping commands on exec channels: %s', list(commands))
+        for command, out in exec_many(list(commands), wait).items():
+            if not collect(commands[command], out):
+                logger.error('No ping summary from %s:\n%s', commands[command], Truncated(out))
+        return stats
 
     for addr in topology_addresses:
-        ping_command = f'ping {addr}' if os != 'ubuntu' else f'ping -c 4 {addr}'
-        print(f"\n--- Running ping command: {ping_command} ---")
+        ping_command = f'ping {addr}' if os not in LINUX_OS else f'ping -c {count} {addr}'
+        logger.info('Running ping command: %s', ping_command)
         out = execute(ping_command, prompt=[])
-        matched_regex = False
-        percentage = 0
-
-        for i in range(4):
-            time.sleep(1)
-            out += read() if i != 0 else ""
-            print(f"\n--- Ping Output Round {i + 1} ---\n{out}\n")
-
-            match = re.search(pattern, out)
-            if match:
-                matched_regex = True
-                percentage = int(match.group(1)) if match.group(1) is not None else 100 - int(match.group(2))
-                break
+        deadline = time.monotonic() + wait
+        while not collect(addr, out) and time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            out += read()
+        if stats[addr] is None:
+            logger.error('No ping summary from %s:\n%s', addr, Truncated(out))
+    return stats
 
-        if not matched_regex:
-            logger.error(out)
-            percentage = 0
 
-        if percentage == 0:
-            ping_results[addr] = False
-            logger.warning('Ping from %s to %s failed\n', device_name, addr)
-        else:
-            ping_results[addr] = True
-            logger.info('Ping from %s to %s succeeded\n', device_name, addr)
+async def _ping_local(addr: str, count: int, timeout: float, limit: asyncio.Semaphore,
+                      on_result: Optional[Callable[[PingStats], None]]) -> Optional[PingStats]:
+    async with limit:
+        process = await asyncio.create_subprocess_exec(
+            'ping', '-c', str(count), '-W', str(timeout), addr,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+        )
+        stdout, _ = await process.communicate()
+    result = parse_ping(addr, stdout.decode(errors='ignore'))
+    if result is not None and on_result:
+        on_result(result)
+    return result
+
+
+def sweep_local(
+    topology_addresses: list[str],
+    count: int = 4,
+    timeout: float = 1,
+    max_parallel: int = 128,
+    on_result: Optional[Callable[[PingStats], None]] = None,
+    ) -> dict[str, Optional[PingStats]]:
+    """
+    Pings every address from this host with one ping subprocess per target, at most max_parallel at a time.
+    on_result is called as each target finishes.
+    """
+    async def run():
+        limit = asyncio.Semaphore(max_parallel)
+        results = await asyncio.gather(
+            *(_ping_local(addr, count, timeout, limit, on_result) for addr in topology_addresses)
+        )
+        return dict(zip(topology_addresses, results))
+
+    return asyncio.run(run())
+
+
+def test_pings(
+    topology_addresses: list[str],
+    execute: Callable[..., str],
+    read: Callable[[], str],
+    device_name: str,
+    os: str,
+    exec_many: Optional[Callable[[list[str], float], dict[str, str]]] = None,
+    ) -> Tuple[bool, dict[str, bool]]:
+    """Testing connectivity with ping command from a device to a list of IP addresses from testbed"""
+    if os not in LINUX_OS and exec_many is None:
+        execute('\r', prompt=[r'\w+#'])
 
-    return all(ping_results.values()), ping_results
\ No newline at end of file
+    stats = sweep_pings(topology_addresses, execute, read, os, exec_many=exec_many)
+    return summarize_pings(stats, device_name)
@@ -0,0 +1,133 @@
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 30.0
+SHOW_PREFIXES = ('show ', 'do show ')
+# Mode changes, saves and checks that leave the running config as it is
+READ_ONLY_COMMANDS = ('', 'en', 'enable', 'disable', 'end', 'exit', 'conf t', 'configure terminal',
+                      'write', 'write memory')
+READ_ONLY_PREFIXES = ('ping ', 'traceroute ', 'terminal ')
+
+INTERFACE_BRIEF_LINE = re.compile(
+    r'^(?P<interface>\S+)\s+(?P<ip>\S+)\s+(?P<ok>YES|NO)\s+(?P<method>\S+)\s+'
+    r'(?P<status>up|down|administratively down|deleted)\s+(?P<protocol>up|down)\s*$',
+    re.MULTILINE,
+)
+
+
+@dataclass(frozen=True)
+class InterfaceBrief:
+    interface: str
+    ip_address: Optional[str]
+    ok: bool
+    method: str
+    status: str
+    protocol: str
+
+    @property
+    def is_up(self) -> bool:
+        return self.status == 'up' and self.protocol == 'up'
+
+
+def parse_ip_interface_brief(output: str) -> list[InterfaceBrief]:
+    return [
+        InterfaceBrief(
+            match['interface'],
+            None if match['ip'].lower() == 'unassigned' else match['ip'],
+            match['ok'] == 'YES',
+            match['method'],
+            match['status'],
+            match['protocol'],
+        )
+        for match in INTERFACE_BRIEF_LINE.finditer(output)
+    ]
+
+
+# command -> parser turning its raw output into records
+PARSERS: dict[str, Callable[[str], list]] = {
+    'show ip interface brief': parse_ip_interface_brief,
+}
+
+
+def is_show(command: str) -> bool:
+    return command.strip().lower().startswith(SHOW_PREFIXES)
+
+
+def changes_config(command: str) -> bool:
+    """
+    False for show commands, mode changes and pings; anything else sent to a device may change it
+    """
+    command = command.strip().lower()
+    return not (command in READ_ONLY_COMMANDS or is_show(command) or command.startswith(READ_ONLY_PREFIXES))
+
+
+class ShowCache:
+    """
+    Parsed show output keyed by (device, command). Output is parsed once when fetched and the records
+    are reused until ttl expires or a config command sent through a connector invalidates the device.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[tuple[str, str], tuple[float, list]] = {}
+        # bumped on every invalidation, so output fetched before a config push is not stored after it
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, device: str, command: str, fetch: Callable[[str], str], ttl: Optional[float] = None) -> list:
+        """
+        Returns the records for command on device, calling fetch(command) only on a miss
+        """
+        parser = PARSERS.get(command)
+        if parser is None:
+            raise KeyError(f"No parser registered for '{command}'")
+        key = (device, command)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generations.get(device, 0)
+        records = parser(fetch(command))
+        with self._lock:
+            if self._generations.get(device, 0) == generation:
+                self._entries[key] = (now + (self.ttl if ttl is None else ttl), records)
+        return records
+
+    def invalidate(self, device: str, command: Optional[str] = None):
+        """
+        Drops the cached records of one command, or of every command when none is given
+        """
+        with self._lock:
+            self._generations[device] = self._generations.get(device, 0) + 1
+            if command is not None:
+                self._entries.pop((device, command), None)
+                return
+            for key in [key for key in self._entries if key[0] == device]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            for device, _ in self._entries:
+                self._generations[device] = self._generations.get(device, 0) + 1
+            self._entries.clear()
+
+
+SHOW_CACHE = ShowCache()
+
+
+def interfaces_without_ip(records: list[InterfaceBrief]) -> list[str]:
+    """
+    Names of interfaces that are up/up but have no address assigned
+    """
+    return [record.interface for record in records if record.is_up and record.ip_address is None]
@@ -2,23 +2,37 @@
 Configures Ubuntu Server
 Contributors: Dusca Alexandru
 """
+import ipaddress
+import json
 import logging
 from subprocess import Popen, PIPE
+from typing import Optional
 
 from pyats.topology import Device
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, encoding='utf-8')
 
-def configure(device: Device):
+INTERFACE = 'ens4'
+
+
+def configure(device: Device, batch: Optional[bool] = None):
     """
-    Adds ip addresses to interface and static routes to all other networks
+    Adds ip addresses to interface and static routes to all other networks.
+    In batch mode (the default, `custom.batch_config: false` turns it off) only the missing
+    addresses and routes are applied, all in one `ip -batch` process.
     """
-    eth1 = device.interfaces['ens4']
+    if batch is None:
+        batch = device.custom.get('batch_config', True)
+    if batch:
+        apply_batch(device)
+        return
+
+    eth1 = device.interfaces[INTERFACE]
     print(eth1)
     commands = [
-        f'sudo ip address add {eth1.ipv4.compressed} dev ens4',
-        'sudo ip link set dev ens4 up',
+        f'sudo ip address add {eth1.ipv4.compressed} dev {INTERFACE}',
+        f'sudo ip link set dev {INTERFACE} up',
     ]
     routes = device.custom['routes']
     for _,route in routes.items():
@@ -26,4 +40,61 @@ def configure(device: Device):
     for cmd in commands:
         logger.info(f'executing: {cmd.split(' ')}')
         with Popen(cmd.split(' '), stdout=PIPE, stderr=PIPE) as proc:
-            proc.communicate()
\ No newline at end of file
+            proc.communicate()
+
+
+def _run_ip(args: list[str], script: str) -> str:
+    with Popen(args, stdin=PIPE, stdout=PIPE, stderr=PIPE, text=True) as proc:
+        out, err = proc.communicate(script)
+    if proc.returncode:
+        raise RuntimeError(f'{' '.join(args)} failed: {err.strip()}')
+    return out
+
+
+def read_state(interface: str = INTERFACE) -> tuple[set[str], bool, dict[str, str]]:
+    """
+    Returns (addresses on interface, interface admin up, routes as network -> gateway)
+    from one `ip -json -batch` call
+    """
+    out = _run_ip(['ip', '-json', '-4', '-batch', '-'], f'address show dev {interface}\nroute show\n')
+    # every batch command prints its own JSON document on one line
+    documents = [json.loads(line) for line in out.splitlines() if line.strip()]
+    links, routes = documents
+    link = links[0] if links else {}
+    addresses = {f"{info['local']}/{info['prefixlen']}" for info in link.get('addr_info', [])}
+    gateways = {
+        ipaddress.ip_network(route['dst']).compressed: route.get('gateway')
+        for route in routes if route['dst'] != 'default'
+    }
+    return addresses, 'UP' in link.get('flags', []), gateways
+
+
+def plan(device: Device, state: tuple[set[str], bool, dict[str, str]]) -> list[str]:
+    """
+    Returns the `ip -batch` lines needed to go from state to what the testbed describes
+    """
+    addresses, link_up, gateways = state
+    wanted = device.interfaces[INTERFACE].ipv4.compressed
+    lines = []
+    if wanted not in addresses:
+        lines.append(f'address add {wanted} dev {INTERFACE}')
+    if not link_up:
+        lines.append(f'link set dev {INTERFACE} up')
+    for route in device.custom['routes'].values():
+        network = ipaddress.ip_network(route['network']).compressed
+        if gateways.get(network) != route['via']:
+            lines.append(f'route replace {network} via {route['via']}')
+    return lines
+
+
+def apply_batch(device: Device):
+    """
+    Applies only the missing operations; a re-run on a configured server launches a single process
+    """
+    lines = plan(device, read_state())
+    if not lines:
+        logger.info(f'{device.name} already configured')
+        return
+    for line in lines:
+        logger.info(f'batch: ip {line}')
+    _run_ip(['sudo', 'ip', '-batch', '-'], '\n'.join(lines) + '\n')
@@ -0,0 +1,73 @@
+import asyncio
+import ipaddress
+import unittest
+from unittest.mock import MagicMock
+
+from pyats.datastructures import AttrDict
+
+from connectors.async_telnet_connector import AsyncTelnetConnector, IAC, DO, WILL, WONT, DONT
+
+ECHO, SUPPRESS_GO_AHEAD = 1, 3
+
+
+class TestAsyncTelnetConnector(unittest.IsolatedAsyncioTestCase):
+    """
+    Unit tests for the asyncio Telnet connector against a local console server.
+    """
+
+    async def asyncSetUp(self):
+        self.received = bytearray()
+        self.server = await asyncio.start_server(self._console, '127.0.0.1', 0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.connection = AttrDict(ip=ipaddress.ip_address('127.0.0.1'), port=port)
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _console(self, reader, writer):
+        writer.write(bytes([IAC, DO, ECHO, IAC, WILL, SUPPRESS_GO_AHEAD]) + b'\r\nRouter>')
+        await writer.drain()
+        while data := await reader.read(1024):
+            self.received += data
+            if b'enable\n' in data:
+                writer.write(b'enable\r\nRouter#')
+                await writer.drain()
+        writer.close()
+
+    async def test_execute_waits_for_prompt(self):
+        """Commands return once the prompt arrives and telnet negotiation is stripped."""
+        conn = AsyncTelnetConnector(MagicMock())
+        await conn.connect(connection=self.connection)
+        banner = await conn.execute('', prompt=[r'\w+>'], timeout=2)
+        output = await conn.execute('enable', prompt=[r'\w+#'], timeout=2)
+        await conn.disconnect()
+
+        self.assertNotIn(chr(IAC), banner)
+        self.assertTrue(output.endswith('Router#'))
+        self.assertIn(bytes([IAC, WONT, ECHO]), self.received)
+        self.assertIn(bytes([IAC, DONT, SUPPRESS_GO_AHEAD]), self.received)
+
+    async def test_many_consoles_on_one_loop(self):
+        """Several connectors are driven concurrently from one event loop."""
+        conns = [AsyncTelnetConnector(MagicMock()) for _ in range(5)]
+        await asyncio.gather(*(conn.connect(connection=self.connection) for conn in conns))
+        outputs = await asyncio.gather(*(conn.execute('enable', prompt=[r'\w+#'], timeout=2) for conn in conns))
+        self.assertTrue(all(conn.is_connected() for conn in conns))
+        await asyncio.gather(*(conn.disconnect() for conn in conns))
+
+        self.assertTrue(all(out.endswith('Router#') for out in outputs))
+
+    async def test_expect_times_out(self):
+        """A prompt that never shows up returns index -1."""
+        conn = AsyncTelnetConnector(MagicMock())
+        await conn.connect(connection=self.connection)
+        index, match, _ = await conn.expect([r'\(config\)#'], timeout=0.2)
+        await conn.disconnect()
+
+        self.assertEqual(-1, index)
+        self.assertIsNone(match)
+
+
+if __name__ == '__main__':
+    unittest.main()
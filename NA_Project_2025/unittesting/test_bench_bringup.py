@@ -0,0 +1,36 @@
+import time
+import unittest
+
+from benchmarks.bench_bringup import PhaseMeter, compare, run
+from connectors.recording import CLIENT_TO_DEVICE, DEVICE_TO_CLIENT
+
+
+class TestBenchBringup(unittest.TestCase):
+    def test_nested_phase_is_charged_separately(self):
+        meter = PhaseMeter()
+        with meter.phase('ssh_config'):
+            meter.event(CLIENT_TO_DEVICE, b'interface Ethernet0/1\n')
+            with meter.phase('save'):
+                meter.event(CLIENT_TO_DEVICE, b'write\n')
+                meter.event(DEVICE_TO_CLIENT, b'[OK]\r\nR1#')
+                meter.sleep(0.05)
+            meter.event(DEVICE_TO_CLIENT, b'R1#')
+        config, save = meter.stats['ssh_config'], meter.stats['save']
+        self.assertEqual((config.commands, config.bytes_read, config.sleep_seconds), (1, 3, 0))
+        self.assertEqual((save.commands, save.bytes_read, save.sleep_seconds), (1, 9, 0.05))
+        self.assertGreaterEqual(save.device_seconds, 0.05)
+        self.assertLess(config.device_seconds, 0.05)
+
+    def test_run_and_compare(self):
+        results = run(devices=2, workers=2, latency=0, jitter=0)
+        self.assertEqual(results['failures'], {})
+        self.assertEqual(list(results['stages']), ['telnet_connect', 'telnet', 'ssh_connect', 'ssh', 'verify_ping'])
+        for name in ('telnet_bootstrap', 'ssh_config', 'save', 'verify_ping'):
+            self.assertGreater(results['phases'][name]['commands'], 0, name)
+        # do_initial_config still waits 2 x 1 s per device
+        self.assertEqual(results['phases']['telnet_bootstrap']['sleep_seconds'], 4.0)
+        self.assertEqual(len(compare(results, results)), 1 + 5 + 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
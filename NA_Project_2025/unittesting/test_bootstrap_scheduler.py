@@ -0,0 +1,83 @@
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from scripts.bootstrap_scheduler import BootstrapScheduler
+
+
+class TestBootstrapScheduler(unittest.TestCase):
+    """
+    Unit tests for the parallel bootstrap scheduler.
+    """
+
+    def test_runs_devices_in_parallel(self):
+        """Four 0.2s jobs with four workers finish in about one job's time."""
+        scheduler = BootstrapScheduler(max_workers=4)
+        jobs = {f"R{i}": lambda: time.sleep(0.2) for i in range(4)}
+
+        results = scheduler.run_phase('telnet', jobs)
+
+        self.assertTrue(all(result.ok for result in results.values()))
+        self.assertLess(scheduler.wall_clock['telnet'], 0.6)
+        self.assertGreaterEqual(scheduler.sequential_time('telnet'), 0.8)
+        self.assertIn('sequential', scheduler.summary('telnet'))
+
+    def test_failed_dependency_skips_device(self):
+        """A device whose Telnet phase failed is not configured over SSH."""
+        scheduler = BootstrapScheduler(max_workers=2)
+
+        def broken():
+            raise ConnectionError("console busy")
+
+        scheduler.run_phase('telnet', {'IOU1': broken, 'CSR': lambda: None})
+        ssh_job = MagicMock()
+        results = scheduler.run_phase('ssh', {'IOU1': ssh_job, 'CSR': lambda: None}, depends_on=('telnet',))
+
+        ssh_job.assert_not_called()
+        self.assertFalse(results['IOU1'].ok)
+        self.assertIn('telnet', results['IOU1'].error)
+        self.assertTrue(results['CSR'].ok)
+
+    def test_skip_follows_upstream_failures(self):
+        """A device whose Telnet connect failed has no bootstrap job and is still not touched over SSH."""
+        scheduler = BootstrapScheduler(max_workers=2)
+
+        def broken():
+            raise ConnectionError("connection refused")
+
+        scheduler.run_phase('telnet_connect', {'IOU1': broken, 'CSR': lambda: None})
+        scheduler.run_phase('telnet', {'CSR': lambda: None}, depends_on=('telnet_connect',))
+        ssh_job = MagicMock()
+        results = scheduler.run_phase('ssh_connect', {'IOU1': ssh_job, 'CSR': lambda: None}, depends_on=('telnet',))
+
+        ssh_job.assert_not_called()
+        self.assertEqual("skipped, 'telnet_connect' phase failed", results['IOU1'].error)
+        self.assertTrue(results['CSR'].ok)
+
+    def test_results_keep_testbed_order(self):
+        """Results are reported in the order the devices were submitted."""
+        scheduler = BootstrapScheduler(max_workers=3)
+        jobs = {'A': lambda: time.sleep(0.1), 'B': lambda: None, 'C': lambda: time.sleep(0.05)}
+
+        results = scheduler.run_phase('ssh', jobs)
+
+        self.assertEqual(['A', 'B', 'C'], list(results))
+
+    def test_report_steps_fails_step_for_failed_device(self):
+        """Each device gets its own aetest step with the phase outcome."""
+        scheduler = BootstrapScheduler()
+
+        def broken():
+            raise RuntimeError("prompt not found")
+
+        scheduler.run_phase('ssh', {'IOSv': broken})
+        steps = MagicMock()
+        scheduler.report_steps(steps, 'ssh')
+
+        steps.start.assert_called_once_with("Configuring IOSv", continue_=True)
+        step = steps.start.return_value.__enter__.return_value
+        step.failed.assert_called_once_with("prompt not found")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,24 @@
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+class TestDeferredImports(unittest.TestCase):
+    """
+    Importing the connector modules must not load the protocol libraries they wrap.
+    """
+
+    def test_protocol_libraries_load_on_use(self):
+        code = ('import sys, connectors.ssh_connector, connectors.swagger_connector, ftd_connection; '
+                'print(sorted(m for m in ("paramiko", "bravado") if m in sys.modules))')
+        result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_DIR, capture_output=True, text=True)
+
+        self.assertEqual(0, result.returncode, result.stderr)
+        self.assertEqual('[]', result.stdout.strip())
+
+
+if __name__ == '__main__':
+    unittest.main()
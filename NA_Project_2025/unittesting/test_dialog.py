@@ -0,0 +1,97 @@
+import ipaddress
+import unittest
+from unittest.mock import MagicMock, patch
+
+from connectors.dialog import Dialog, Statement, end_prompt, IOS_SAVE_DIALOG
+from connectors.telnet_connector import TelnetConnector
+
+# (answer the console waits for, what it prints after receiving it)
+FTD_CONSOLE = [
+    ('\n', 'firepower login: '),
+    ('admin\n', 'Password: '),
+    ('Admin123\n', 'You must accept the EULA to continue.\r\nPress <ENTER> to display the EULA: '),
+    ('\n', 'End User License Agreement\r\n--More--'),
+    (' ', 'page two\r\n--More--'),
+    (' ', 'page three\r\nPlease enter \'YES\' or press <ENTER> to AGREE to the EULA: '),
+    ('YES\n', 'You must change the password for \'admin\' to continue.\r\nEnter new password: '),
+    ('Cisco@135\n', 'Confirm new password: '),
+    ('Cisco@135\n', 'Do you want to configure IPv4? (y/n) [y]: '),
+    ('y\n', 'Do you want to configure IPv6? (y/n) [n]: '),
+    ('n\n', 'Configure IPv4 via DHCP or manually? (dhcp/manual) [manual]: '),
+    ('manual\n', 'Enter an IPv4 address for the management interface [192.168.45.45]: '),
+    ('192.168.100.2\n', 'Enter an IPv4 netmask for the management interface [255.255.255.0]: '),
+    ('255.255.255.0\n', 'Enter the IPv4 default gateway for the management interface [data-interfaces]: '),
+    ('192.168.100.1\n', 'Enter a fully qualified hostname for this system [firepower]: '),
+    ('firepower\n', 'Enter a comma-separated list of DNS servers or \'none\' [208.67.222.222]: '),
+    ('8.8.8.8\n', 'Enter a comma-separated list of search domains or \'none\' []: '),
+    ('local\n', 'Manage the device locally? (yes/no) [yes]: '),
+    ('yes\n', 'Configuring firewall mode to routed\r\n\r\nUpdate policy deployment information\r\n> '),
+]
+
+
+class FakeConsole:
+    """
+    Telnet stand-in that prints the next prompt only after the expected answer, split in small chunks
+    """
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.pending = b''
+        self.received = []
+
+    def write(self, data: bytes):
+        self.received.append(data.decode())
+        expected, output = self.script.pop(0)
+        assert data.decode() == expected, f'expected {expected!r}, got {data.decode()!r}'
+        self.pending += output.encode()
+
+    def read_very_eager(self) -> bytes:
+        chunk, self.pending = self.pending[:7], self.pending[7:]
+        return chunk
+
+
+def ftd_device():
+    device = MagicMock()
+    device.credentials.default.username = 'admin'
+    device.credentials.default.password.plaintext = 'Admin123'
+    device.credentials.login.password.plaintext = 'Cisco@135'
+    device.interfaces = {'GigabitEthernet0/0': MagicMock(ipv4=ipaddress.ip_interface('192.168.100.2/24'))}
+    device.custom = {'mgmt_gw': '192.168.100.1', 'dns': '8.8.8.8', 'domain': 'local'}
+    return device
+
+
+class TestDialog(unittest.TestCase):
+    def test_earliest_prompt_wins(self):
+        dialog = Dialog([Statement('second', 'b'), Statement('first', 'a'), end_prompt('#$')])
+        writes = []
+        result = dialog.run(lambda timeout: '', writes.append, buffer='first second R1#')
+        self.assertEqual(writes, ['a\n', 'b\n'])
+        self.assertTrue(result.completed)
+
+    def test_timeout_names_last_prompts(self):
+        dialog = Dialog([Statement(r'\[confirm\]', ''), end_prompt('#$')])
+        with self.assertRaisesRegex(TimeoutError, 'confirm'):
+            dialog.run(lambda timeout: '', lambda text: None, timeout=0.05, buffer='[confirm]')
+
+    @patch('connectors.telnet_connector.select.select')
+    def test_ios_save_dialog(self, _):
+        connector = TelnetConnector(MagicMock())
+        connector._conn = FakeConsole([
+            ('write memory\n', 'Destination filename [startup-config]? \r\nContinue? [no]: '),
+            ('yes\n', 'Building configuration...\r\n[OK]\r\nR1#'),
+        ])
+        result = connector.run_dialog(IOS_SAVE_DIALOG, command='write memory')
+        self.assertEqual(result.answered, ['continue', 'prompt'])
+
+    @patch('connectors.telnet_connector.select.select')
+    def test_ftd_wizard(self, select):
+        connector = TelnetConnector(ftd_device())
+        console = FakeConsole(FTD_CONSOLE)
+        connector._conn = console
+        connector.configure_ftd()
+        self.assertEqual(console.script, [])
+        self.assertEqual(console.received.count(' '), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import ipaddress
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from pyats.datastructures import AttrDict
+
+from benchmarks.fake_ios import FakeLab, split_lines
+from connectors.ssh_connector import SSHConnector
+from connectors.ssh_pool import SSHTransportPool
+from connectors.telnet_connector import TelnetConnector
+from scripts.show_cache import parse_ip_interface_brief
+
+
+def connection(address, pool=False):
+    host, port = address
+    return AttrDict(ip=ipaddress.ip_address(host), port=port, pool=pool,
+                    credentials=AttrDict(login=AttrDict(username='admin', password=AttrDict(plaintext='x'))))
+
+
+def device(name):
+    mock = MagicMock()
+    mock.name = name
+    return mock
+
+
+class TestFakeIOSServer(unittest.TestCase):
+    def test_split_lines(self):
+        self.assertEqual(split_lines(b'en\r\nconf t\r\x00exit\nend\r'), (['en', 'conf t', 'exit'], b'end\r'))
+        self.assertEqual(split_lines(b'end\r' + b'\n'), (['end'], b''))
+
+    def test_ssh_config_modes(self):
+        with FakeLab(1, 'ssh') as lab:
+            connector = SSHConnector(device('R1'))
+            connector.connect(connection=connection(lab.devices['R1'].address))
+            connector._send_cmd('enable', prompts=[r'R1#'])
+            connector._send_cmd('configure terminal', prompts=[r'\(config\)#'])
+            connector._send_cmd('hostname EDGE', prompts=[r'EDGE\(config\)#'])
+            connector._send_cmd('interface Ethernet0/1', prompts=[r'\(config-if\)#'])
+            connector._send_cmd('ip address 192.168.101.1 255.255.255.0', prompts=[r'\(config-if\)#'])
+            connector._send_cmd('no shutdown', prompts=[r'\(config-if\)#'])
+            connector._send_cmd('exit', prompts=[r'\(config\)#'])
+            connector._send_cmd('router ospf 1', prompts=[r'\(config-router\)#'])
+            connector._send_cmd('exit', prompts=[r'\(config\)#'])
+            connector._send_cmd('ip dhcp pool LAN', prompts=[r'\(dhcp-config\)#'])
+            connector._send_cmd('end', prompts=[r'EDGE#'])
+            output = connector._send_cmd('show ip interface brief', prompts=[r'EDGE#'])
+            connector.disconnect()
+        [record] = parse_ip_interface_brief(output)
+        self.assertEqual((record.interface, record.ip_address, record.status), ('Ethernet0/1', '192.168.101.1', 'up'))
+
+    def test_pooled_ssh_shell_and_exec_channels_share_the_device(self):
+        pool = SSHTransportPool()
+        with FakeLab(1, 'ssh') as lab, patch('connectors.ssh_connector.POOL', pool):
+            connector = SSHConnector(device('R1'))
+            connector.connect(connection=connection(lab.devices['R1'].address, pool=True))
+            connector._send_cmd('enable', prompts=[r'R1#'])
+            connector._send_cmd('configure terminal', prompts=[r'\(config\)#'])
+            connector._send_cmd('interface Ethernet0/1', prompts=[r'\(config-if\)#'])
+            connector._send_cmd('ip address 192.168.101.1 255.255.255.0', prompts=[r'\(config-if\)#'])
+            output = connector.execute_show(['show ip interface brief'])['show ip interface brief']
+            connector.disconnect()
+
+            # the next connector reuses the transport and shell, back in privileged exec mode
+            again = SSHConnector(device('R1'))
+            again.connect(connection=connection(lab.devices['R1'].address, pool=True))
+            again._send_cmd('configure terminal', prompts=[r'\(config\)#'])
+            again.disconnect()
+            pool.close_all()
+        [record] = parse_ip_interface_brief(output)
+        self.assertEqual((record.interface, record.ip_address), ('Ethernet0/1', '192.168.101.1'))
+
+    def test_concurrent_pooled_connectors_do_not_interleave(self):
+        """One connector sits in interface config mode while another reads the device in privileged exec"""
+        pool = SSHTransportPool()
+        configuring, checked = threading.Barrier(2), threading.Barrier(2)
+
+        def open_connector(address):
+            connector = SSHConnector(device('R1'))
+            connector.connect(connection=connection(address, pool=True))
+            connector._send_cmd('enable', prompts=[r'R1#'])
+            return connector
+
+        def configure(address):
+            connector = open_connector(address)
+            connector._send_cmd('configure terminal', prompts=[r'\(config\)#'])
+            connector._send_cmd('interface Ethernet0/1', prompts=[r'\(config-if\)#'])
+            connector._send_cmd('ip address 192.168.101.1 255.255.255.0', prompts=[r'\(config-if\)#'])
+            configuring.wait(timeout=10)
+            checked.wait(timeout=10)
+            connector._send_cmd('no shutdown', prompts=[r'\(config-if\)#'])
+            connector._send_cmd('end', prompts=[r'R1#'])
+            connector.disconnect()
+
+        def check(address):
+            configuring.wait(timeout=10)
+            connector = open_connector(address)
+            try:
+                return connector._send_cmd('show ip interface brief', prompts=[r'R1#'])
+            finally:
+                checked.wait(timeout=10)
+                connector.disconnect()
+
+        with FakeLab(1, 'ssh', latency=0.01) as lab, patch('connectors.ssh_connector.POOL', pool):
+            address = lab.devices['R1'].address
+            with ThreadPoolExecutor(max_workers=2) as workers:
+                configured = workers.submit(configure, address)
+                output = workers.submit(check, address).result()
+                configured.result()
+            after = pool.get(connection(address, pool=True)).exec('show ip interface brief')
+            self.assertEqual(1, len(pool._transports))
+            pool.close_all()
+        # the check saw the address already set, in its own session and with the interface still down
+        [record] = parse_ip_interface_brief(output)
+        self.assertEqual((record.ip_address, record.status), ('192.168.101.1', 'administratively down'))
+        [record] = parse_ip_interface_brief(after)
+        self.assertEqual((record.ip_address, record.status), ('192.168.101.1', 'up'))
+
+    def test_many_telnet_devices_answer_concurrently(self):
+        commands = ['enable', 'configure terminal', 'interface Ethernet0/1', 'no shutdown', 'end']
+        prompts = [r'#', r'\(config\)#', r'\(config-if\)#', r'\(config-if\)#', r'R\d+#']
+
+        def bring_up(name, address):
+            connector = TelnetConnector(device(name))
+            connector.connect(connection=connection(address))
+            connector.execute('', prompt=[r'>'])
+            for command, prompt in zip(commands, prompts):
+                connector.execute(command, prompt=[prompt])
+            connector.disconnect()
+
+        with FakeLab(50, 'telnet', latency=0.02, jitter=0.01, seed=1) as lab:
+            start = time.monotonic()
+            with ThreadPoolExecutor(max_workers=50) as pool:
+                for future in [pool.submit(bring_up, name, server.address) for name, server in lab.devices.items()]:
+                    future.result()
+            elapsed = time.monotonic() - start
+        # one device alone needs at least 6 x 20 ms, all 50 one after another more than 6 s
+        self.assertGreater(elapsed, 0.12)
+        self.assertLess(elapsed, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
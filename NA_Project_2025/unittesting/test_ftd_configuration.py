@@ -0,0 +1,67 @@
+import ipaddress
+import unittest
+from unittest.mock import MagicMock
+
+from pyats.datastructures import AttrDict
+
+from ftd_configuration import desired_interfaces, sync_interfaces
+
+
+def live_interface(hardware_name, name, ip=None, netmask=None):
+    address = AttrDict(ipAddress=ip, netmask=netmask) if ip else None
+    return AttrDict(id=f'id-{hardware_name}', hardwareName=hardware_name, name=name, enabled=bool(ip),
+                    ipv4=AttrDict(ipType='STATIC' if ip else 'DHCP', dhcp=not ip, ipAddress=address))
+
+
+class TestSyncInterfaces(unittest.TestCase):
+    """
+    Unit tests for the declarative FDM interface sync.
+    """
+
+    def setUp(self):
+        self.device = MagicMock()
+        self.device.interfaces = {
+            'GigabitEthernet0/0': AttrDict(alias='mgmt', ipv4=ipaddress.ip_interface('192.168.110.2/24')),
+            'GigabitEthernet0/2': AttrDict(alias='to_IOSv15', ipv4=ipaddress.ip_interface('192.168.107.2/24')),
+        }
+        self.swagger = MagicMock()
+        self.swagger.client.get_model.return_value = AttrDict
+
+    def _live(self, *interfaces):
+        self.swagger.client.Interface.getPhysicalInterfaceList.return_value.result.return_value = {
+            'items': list(interfaces)
+        }
+
+    def test_only_differing_interfaces_are_edited(self):
+        """Matching and unmanaged interfaces are left alone, the rest is rewritten to the testbed state."""
+        self._live(
+            live_interface('GigabitEthernet0/0', 'mgmt', '192.168.110.2', '255.255.255.0'),
+            live_interface('GigabitEthernet0/1', 'inside'),
+            live_interface('GigabitEthernet0/2', 'outside'),
+        )
+        edited = sync_interfaces(self.swagger, self.device)
+
+        self.assertEqual(['GigabitEthernet0/2'], edited)
+        body = self.swagger.client.Interface.editPhysicalInterface.call_args.kwargs['body']
+        self.assertEqual(('to_IOSv15', '192.168.107.2', '255.255.255.0', 'STATIC'),
+                         (body.name, body.ipv4.ipAddress.ipAddress, body.ipv4.ipAddress.netmask, body.ipv4.ipType))
+
+    def test_configured_ftd_needs_no_edits(self):
+        self._live(
+            live_interface('GigabitEthernet0/0', 'mgmt', '192.168.110.2', '255.255.255.0'),
+            live_interface('GigabitEthernet0/2', 'to_IOSv15', '192.168.107.2', '255.255.255.0'),
+        )
+        self.assertEqual([], sync_interfaces(self.swagger, self.device))
+        self.swagger.client.Interface.editPhysicalInterface.assert_not_called()
+
+    def test_management_and_unnamed_interfaces_are_not_synced(self):
+        self.device.interfaces.update({
+            'Management0/0': AttrDict(alias='diagnostic', ipv4=ipaddress.ip_interface('192.168.111.2/24')),
+            'GigabitEthernet0/3': AttrDict(alias=None, ipv4=ipaddress.ip_interface('192.168.106.2/24')),
+            'GigabitEthernet0/4': AttrDict(alias='to_DockerGuest2', ipv4=None),
+        })
+        self.assertEqual(['GigabitEthernet0/0', 'GigabitEthernet0/2'], list(desired_interfaces(self.device)))
+
+
+if __name__ == '__main__':
+    unittest.main()
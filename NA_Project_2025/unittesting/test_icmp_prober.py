@@ -0,0 +1,34 @@
+import unittest
+
+from scripts.icmp_prober import IcmpProber, checksum, open_icmp_socket
+
+sock, _ = open_icmp_socket()
+ICMP_ALLOWED = sock is not None
+if sock:
+    sock.close()
+
+
+class TestIcmpProber(unittest.TestCase):
+    """
+    Unit tests for the in-process ICMP prober against the loopback range.
+    """
+
+    def test_checksum(self):
+        """An echo request with its checksum filled in sums to zero."""
+        packet = IcmpProber()._IcmpProber__echo_request(7)
+        self.assertEqual(0, checksum(packet))
+
+    @unittest.skipUnless(ICMP_ALLOWED, 'ICMP sockets need ping_group_range or CAP_NET_RAW')
+    def test_loopback_sweep(self):
+        """Every 127.0.0.0/8 address answers and gets rtt statistics."""
+        targets = [f'127.0.0.{host}' for host in range(1, 51)]
+        stats = IcmpProber(count=2, interval=0.05, timeout=1.0).probe(targets)
+
+        self.assertEqual(set(targets), set(stats))
+        for target in targets:
+            self.assertEqual((2, 2, 0.0), (stats[target].sent, stats[target].received, stats[target].loss))
+            self.assertLessEqual(stats[target].rtt_min, stats[target].rtt_max)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from benchmarks.fake_ios import FakeIOSShell
+from connectors import instrumentation
+from connectors.instrumentation import CommandEvent, HistogramSink, JsonlSink
+from connectors.ssh_connector import SSHConnector
+from connectors.telnet_connector import TelnetConnector
+
+
+def device(name='R1'):
+    mock = MagicMock()
+    mock.name = name
+    return mock
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.sink = HistogramSink()
+        instrumentation.add_sink(self.sink)
+        self.addCleanup(instrumentation.remove_sink, self.sink)
+
+    def test_disabled_without_sinks(self):
+        instrumentation.remove_sink(self.sink)
+        self.assertIsNone(instrumentation.start('R1', 'ssh', 'show version'))
+
+    def test_ssh_command_event(self):
+        events = []
+        collector = MagicMock(emit=events.append)
+        instrumentation.add_sink(collector)
+        self.addCleanup(instrumentation.remove_sink, collector)
+        with tempfile.TemporaryDirectory() as directory:
+            jsonl = JsonlSink(f'{directory}/events.jsonl')
+            instrumentation.add_sink(jsonl)
+            connector = SSHConnector(device())
+            connector._shell = FakeIOSShell(hostname='R1', latency=0.02)
+            connector._send_cmd('configure terminal', prompts=[r'\(config\)#'])
+            instrumentation.remove_sink(jsonl)
+            jsonl.close()
+            with open(f'{directory}/events.jsonl', encoding='utf-8') as file:
+                lines = [json.loads(line) for line in file]
+
+        [event] = events
+        self.assertEqual((event.device, event.protocol, event.command, event.prompt),
+                         ('R1', 'ssh', 'configure terminal', r'\(config\)#'))
+        self.assertGreaterEqual(event.first_byte, 0.02)
+        self.assertGreaterEqual(event.prompt_match, event.first_byte)
+        self.assertEqual(event.bytes_read, len('configure terminal\r\nEnter configuration commands, '
+                                               'one per line.  End with CNTL/Z.\r\nR1(config)#'))
+        self.assertEqual(lines[0]['command'], 'configure terminal')
+        self.assertEqual(self.sink.summary()['R1/ssh']['commands'], 1)
+
+    def test_telnet_timeout_has_no_prompt_match(self):
+        connector = TelnetConnector(device())
+        connector._conn = MagicMock()
+        connector._conn.expect.return_value = (-1, None, b'R1(config-if)')
+        connector.execute('exit', prompt=[r'\(config\)#'], timeout=0.01)
+        summary = self.sink.summary()['R1/telnet']
+        self.assertEqual((summary['timeouts'], summary['bytes_read'], summary['sleep']), (1, 13, 0.01))
+        self.assertIsNone(summary['p50'])
+
+    def test_histogram_percentiles(self):
+        for latency in [0.0015] * 90 + [0.3] * 10:
+            self.sink.emit(CommandEvent('R1', 'ssh', 'x', '#', 0, None, latency, latency, 0, 0))
+        self.assertEqual(self.sink.percentile(50), 0.002)
+        self.assertEqual(self.sink.percentile(90), 0.002)
+        self.assertEqual(self.sink.percentile(99), 0.512)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from scripts.ping_helper import test_pings
+from scripts.ping_helper import test_pings, sweep_pings, parse_ping
 
 
 class TestPingHelper(unittest.TestCase):
@@ -79,5 +79,57 @@ class TestPingHelper(unittest.TestCase):
         self.assertTrue(details["8.8.8.8"], "Expected 8.8.8.8 to be marked as reachable.")
 
 
+class TestPingSweep(unittest.TestCase):
+    """
+    Unit tests for the streaming ping sweep engine.
+    """
+
+    def test_linux_sweep_is_one_command(self):
+        """All targets are pinged by one backgrounded command and their tagged output is split per target."""
+        commands = []
+        chunks = iter([
+            "[10.0.0.2] 4 packets transmitted, 0 received, 100% packet loss, time 3004ms\n",
+            "[10.0.0.1] 4 packets transmitted, 4 received, 0% packet loss, time 3005ms\n"
+            "[10.0.0.1] rtt min/avg/max/mdev = 0.312/0.401/0.530/0.081 ms\n",
+        ])
+
+        def fake_execute(cmd, **kwargs):
+            commands.append(cmd)
+            return "[10.0.0.1] 64 bytes from 10.0.0.1: icmp_seq=1 ttl=64 time=0.312 ms\n"
+
+        stats = sweep_pings(["10.0.0.1", "10.0.0.2"], fake_execute, lambda: next(chunks, ""), "ubuntu", wait=2)
+
+        self.assertEqual(1, len(commands))
+        self.assertEqual(0.401, stats["10.0.0.1"].rtt_avg)
+        self.assertFalse(stats["10.0.0.2"].reachable)
+
+    def test_ios_pings_run_on_exec_channels(self):
+        """Given exec channels, IOS pings are handed over all at once and the shell is not used."""
+        batches = []
+
+        def fake_exec_many(commands, timeout):
+            batches.append(commands)
+            return {command: "Success rate is 100 percent (5/5), round-trip min/avg/max = 1/1/2 ms"
+                    for command in commands}
+
+        def fake_execute(cmd, **kwargs):
+            raise AssertionError(f"shell used for {cmd}")
+
+        result, details = test_pings(["10.0.0.1", "10.0.0.2"], fake_execute, lambda: "", "R1", "ios",
+                                     exec_many=fake_exec_many)
+
+        self.assertEqual([["ping 10.0.0.1", "ping 10.0.0.2"]], batches)
+        self.assertTrue(result)
+        self.assertEqual({"10.0.0.1": True, "10.0.0.2": True}, details)
+
+    def test_ios_statistics(self):
+        stats = parse_ping("10.0.0.1", "Success rate is 80 percent (4/5), round-trip min/avg/max = 1/2/4 ms")
+
+        self.assertEqual((5, 4, 20.0, 2.0), (stats.sent, stats.received, stats.loss, stats.rtt_avg))
+
+    def test_summary_not_arrived(self):
+        self.assertIsNone(parse_ping("10.0.0.1", "Type escape sequence to abort.\n!!!"))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
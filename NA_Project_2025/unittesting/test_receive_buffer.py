@@ -0,0 +1,55 @@
+import socket
+import unittest
+
+from connectors.receive_buffer import ReceiveBuffer
+
+
+class ChunkedStream:
+    """recv() hands out the given chunks one by one, then b'' like a closed channel"""
+
+    def __init__(self, *chunks: bytes):
+        self.chunks = list(chunks)
+
+    def recv(self, nbytes: int) -> bytes:
+        return self.chunks.pop(0)[:nbytes] if self.chunks else b''
+
+
+class TestReceiveBuffer(unittest.TestCase):
+    def test_multibyte_character_split_across_reads(self):
+        data = 'Description: câble à R2\r\nR1#'.encode()
+        split = data.index('â'.encode()) + 1
+        buffer = ReceiveBuffer(capacity=4)
+        stream = ChunkedStream(data[:split], data[split:])
+        while buffer.fill(stream):
+            pass
+        self.assertEqual(buffer.text(), data.decode())
+        self.assertEqual(buffer.getvalue(), data)
+        self.assertEqual(buffer.tail(5), '\r\nR1#')
+
+    def test_grows_past_initial_capacity(self):
+        chunks = [bytes([65 + i % 26]) * 1000 for i in range(100)]
+        buffer = ReceiveBuffer(capacity=16)
+        stream = ChunkedStream(*chunks)
+        while buffer.fill(stream, 4096):
+            pass
+        self.assertEqual(len(buffer), 100_000)
+        self.assertEqual(buffer.getvalue(), b''.join(chunks))
+
+    def test_socket_reads_into_buffer(self):
+        left, right = socket.socketpair()
+        with left, right:
+            right.sendall(b'show version\r\nR1#')
+            right.shutdown(socket.SHUT_WR)
+            buffer = ReceiveBuffer(capacity=8)
+            while buffer.fill(left, 4):
+                pass
+        self.assertEqual(buffer.text(), 'show version\r\nR1#')
+
+    def test_tail_of_short_output(self):
+        buffer = ReceiveBuffer()
+        buffer.fill(ChunkedStream(b'R1>'))
+        self.assertEqual(buffer.tail(256), 'R1>')
+
+
+if __name__ == '__main__':
+    unittest.main()
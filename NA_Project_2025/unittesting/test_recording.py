@@ -0,0 +1,91 @@
+import ipaddress
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from pyats.datastructures import AttrDict
+
+from benchmarks.replay import replay_server
+from connectors.recording import SessionRecording, CLIENT_TO_DEVICE, DEVICE_TO_CLIENT
+from connectors.ssh_connector import SSHConnector
+from connectors.telnet_connector import TelnetConnector
+
+OUT, IN = DEVICE_TO_CLIENT, CLIENT_TO_DEVICE
+
+
+def session(protocol):
+    return SessionRecording(protocol, 'R1', [
+        (0.0, OUT, b'\r\nR1#'),
+        (0.1, IN, b'show clock\n'),
+        (0.6, OUT, b'show clock\r\n*10:00:00.000 UTC Mon Oct 19 2026\r\nR1#'),
+    ])
+
+
+def connection(address, **kwargs):
+    host, port = address
+    return AttrDict(ip=ipaddress.ip_address(host), port=port, pool=False,
+                    credentials=AttrDict(login=AttrDict(username='admin', password=AttrDict(plaintext='x'))),
+                    **kwargs)
+
+
+def device():
+    mock = MagicMock()
+    mock.name = 'R1'
+    return mock
+
+
+class TestRecording(unittest.TestCase):
+    def test_save_and_load_keep_bytes(self):
+        recording = SessionRecording('telnet', 'R1', [(0.0, OUT, bytes(range(256)))])
+        with tempfile.TemporaryDirectory() as directory:
+            recording.save(f'{directory}/r1.jsonl')
+            self.assertEqual(SessionRecording.load(f'{directory}/r1.jsonl'), recording)
+
+    def test_telnet_record_then_replay(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with replay_server(session('telnet'), speed=0) as server:
+                connector = TelnetConnector(device())
+                connector.connect(connection=connection(server.address, record=directory))
+                connector._conn.read_until(b'R1#', 2)
+                output = connector.execute('show clock', prompt=[r'R1#\s*$'])
+                connector.disconnect()
+            self.assertIn('10:00:00', output)
+
+            recorded = SessionRecording.load(str(next(Path(directory).glob('R1-telnet-*.jsonl'))))
+            self.assertEqual(recorded.output(), session('telnet').output())
+            self.assertEqual([data for _, direction, data in recorded.events if direction == IN], [b'show clock\n'])
+
+            # what was recorded replays by itself
+            with replay_server(recorded, speed=0) as server:
+                connector = TelnetConnector(device())
+                connector.connect(connection=connection(server.address))
+                connector._conn.read_until(b'R1#', 2)
+                self.assertIn('10:00:00', connector.execute('show clock', prompt=[r'R1#\s*$']))
+                connector.disconnect()
+
+    def test_replay_timing_is_scaled(self):
+        with replay_server(session('telnet'), speed=5) as server:
+            connector = TelnetConnector(device())
+            connector.connect(connection=connection(server.address))
+            connector._conn.read_until(b'R1#', 2)
+            start = time.monotonic()
+            connector.execute('show clock', prompt=[r'R1#\s*$'])
+            elapsed = time.monotonic() - start
+            connector.disconnect()
+        # the device took 0.5 s to answer in the recording
+        self.assertGreaterEqual(elapsed, 0.09)
+        self.assertLess(elapsed, 0.4)
+
+    def test_ssh_replay(self):
+        with replay_server(session('ssh'), speed=0) as server:
+            connector = SSHConnector(device())
+            connector.connect(connection=connection(server.address))
+            output = connector._send_cmd('show clock', prompts=[r'R1#'])
+            connector.disconnect()
+        self.assertIn('10:00:00', output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import ipaddress
+import unittest
+from unittest.mock import MagicMock, patch
+
+from connectors.ssh_connector import SSHConnector
+from scripts.show_cache import (ShowCache, InterfaceBrief, parse_ip_interface_brief, interfaces_without_ip,
+                                is_show, changes_config)
+
+BRIEF = """Interface              IP-Address      OK? Method Status                Protocol
+GigabitEthernet0/0     192.168.11.1    YES manual up                    up
+GigabitEthernet0/1     unassigned      YES unset  up                    up
+GigabitEthernet0/2     unassigned      YES unset  administratively down down
+Loopback0              10.0.0.1        YES manual up                    up
+R1#"""
+
+
+class TestShowCache(unittest.TestCase):
+    def test_parse_ip_interface_brief(self):
+        records = parse_ip_interface_brief(BRIEF)
+        self.assertEqual(len(records), 4)
+        self.assertEqual(records[0], InterfaceBrief('GigabitEthernet0/0', '192.168.11.1', True, 'manual', 'up', 'up'))
+        self.assertIsNone(records[1].ip_address)
+        self.assertEqual(records[2].status, 'administratively down')
+        self.assertEqual(interfaces_without_ip(records), ['GigabitEthernet0/1'])
+
+    def test_is_show(self):
+        self.assertTrue(is_show('show ip route'))
+        self.assertTrue(is_show('  do show run | sect ospf'))
+        self.assertFalse(is_show('interface GigabitEthernet0/1'))
+        self.assertFalse(is_show('shutdown'))
+
+    def test_changes_config(self):
+        for command in ('', 'enable', 'end', 'exit', 'configure terminal', 'write memory', 'ping 192.168.11.2',
+                        'terminal length 0', 'do show ip route'):
+            self.assertFalse(changes_config(command), command)
+        for command in ('interface GigabitEthernet0/1', 'no shutdown', 'hostname R1', 'router ospf 1'):
+            self.assertTrue(changes_config(command), command)
+
+    def test_fetches_once_until_ttl_expires(self):
+        cache = ShowCache(ttl=30)
+        fetch = MagicMock(return_value=BRIEF)
+        with patch('scripts.show_cache.time.monotonic', return_value=100.0):
+            first = cache.get('R1', 'show ip interface brief', fetch)
+            second = cache.get('R1', 'show ip interface brief', fetch)
+        self.assertIs(first, second)
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        with patch('scripts.show_cache.time.monotonic', return_value=131.0):
+            cache.get('R1', 'show ip interface brief', fetch)
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_invalidate_is_per_device(self):
+        cache = ShowCache()
+        fetch = MagicMock(return_value=BRIEF)
+        cache.get('R1', 'show ip interface brief', fetch)
+        cache.get('R2', 'show ip interface brief', fetch)
+        cache.invalidate('R1')
+        cache.get('R1', 'show ip interface brief', fetch)
+        cache.get('R2', 'show ip interface brief', fetch)
+        self.assertEqual(fetch.call_count, 3)
+
+    def test_output_fetched_before_invalidation_is_not_stored(self):
+        cache = ShowCache()
+
+        def fetch(command):
+            cache.invalidate('R1')  # a config push lands while the show command runs
+            return BRIEF
+
+        cache.get('R1', 'show ip interface brief', fetch)
+        second = MagicMock(return_value=BRIEF)
+        cache.get('R1', 'show ip interface brief', second)
+        second.assert_called_once()
+
+    def test_unknown_command(self):
+        with self.assertRaises(KeyError):
+            ShowCache().get('R1', 'show version', MagicMock())
+
+    @patch('connectors.ssh_connector.SHOW_CACHE', new_callable=ShowCache)
+    def test_config_command_invalidates_connector_cache(self, cache):
+        device = MagicMock()
+        device.name = 'R1'
+        connector = SSHConnector(device)
+        connector.execute_show = MagicMock(return_value={'show ip interface brief': BRIEF})
+        connector._read_until_prompt = MagicMock(return_value=('R1(config)#', True))
+        connector._shell = MagicMock()
+
+        connector.show('show ip interface brief')
+        connector._send_cmd('show running-config')
+        connector.show('show ip interface brief')
+        self.assertEqual(connector.execute_show.call_count, 1)
+
+        connector._send_cmd('interface GigabitEthernet0/1', prompts=[r'\(config-if\)#'])
+        connector.show('show ip interface brief')
+        self.assertEqual(connector.execute_show.call_count, 2)
+
+        # mode changes around a check keep the cached records
+        connector._send_cmd('end', prompts=[r'#'])
+        connector._send_cmd('enable', prompts=[r'#'])
+        connector.show('show ip interface brief')
+        self.assertEqual(connector.execute_show.call_count, 2)
+
+    @patch('connectors.ssh_connector.SHOW_CACHE', new_callable=ShowCache)
+    def test_verify_interfaces(self, cache):
+        device = MagicMock()
+        device.name = 'R1'
+        device.interfaces = {
+            name: MagicMock(ipv4=ipaddress.ip_interface(address) if address else None)
+            for name, address in [('GigabitEthernet0/0', '192.168.11.1/24'), ('GigabitEthernet0/1', None),
+                                  ('GigabitEthernet0/2', '192.168.12.1/24'), ('Loopback0', '10.0.0.2/32')]
+        }
+        for name, intf in device.interfaces.items():
+            intf.name = name
+        connector = SSHConnector(device)
+        connector.execute_show = MagicMock(return_value={'show ip interface brief': BRIEF})
+
+        self.assertEqual(connector.verify_interfaces(), ['GigabitEthernet0/2', 'Loopback0'])
+        connector.verify_interfaces()
+        self.assertEqual(connector.execute_show.call_count, 1)
+
+    @patch('connectors.ssh_connector.SHOW_CACHE', new_callable=ShowCache)
+    def test_wait_for_interfaces_rereads_the_device(self, cache):
+        device = MagicMock()
+        device.name = 'R1'
+        device.interfaces = {'GigabitEthernet0/2': MagicMock(ipv4=None)}
+        device.interfaces['GigabitEthernet0/2'].name = 'GigabitEthernet0/2'
+        connector = SSHConnector(device)
+        up = BRIEF.replace('administratively down down', 'up                    up')
+        connector.execute_show = MagicMock(side_effect=[{'show ip interface brief': BRIEF}] * 2
+                                           + [{'show ip interface brief': up}])
+
+        self.assertEqual([], connector.wait_for_interfaces(timeout=5, interval=0))
+        self.assertEqual(3, connector.execute_show.call_count)
+        # the good read is cached, the ones taken while the link was down are not
+        connector.verify_interfaces()
+        self.assertEqual(3, connector.execute_show.call_count)
+
+    @patch('connectors.ssh_connector.SHOW_CACHE', new_callable=ShowCache)
+    def test_wait_for_interfaces_gives_up_at_the_deadline(self, cache):
+        device = MagicMock()
+        device.name = 'R1'
+        device.interfaces = {'GigabitEthernet0/2': MagicMock(ipv4=None)}
+        device.interfaces['GigabitEthernet0/2'].name = 'GigabitEthernet0/2'
+        connector = SSHConnector(device)
+        connector.execute_show = MagicMock(return_value={'show ip interface brief': BRIEF})
+
+        self.assertEqual(['GigabitEthernet0/2'], connector.wait_for_interfaces(timeout=0, interval=0))
+        connector.verify_interfaces()
+        self.assertEqual(2, connector.execute_show.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from benchmarks.fake_ios import FakeIOSShell
+from connectors.ssh_connector import SSHConnector
+
+
+class TestSSHSendCmd(unittest.TestCase):
+    """
+    Unit tests for the prompt-driven SSHConnector._send_cmd.
+    """
+
+    def setUp(self):
+        self.connector = SSHConnector(MagicMock())
+        self.connector._shell = FakeIOSShell(hostname='R1', latency=0.01)
+        self.connector.command_timeout = 1
+
+    def test_returns_as_soon_as_prompt_matches(self):
+        """The command returns on the prompt instead of sleeping a fixed delay."""
+        start = time.monotonic()
+        output = self.connector._send_cmd('configure terminal', prompts=[r'\(config\)#'])
+
+        self.assertLess(time.monotonic() - start, 0.3)
+        self.assertTrue(output.endswith('R1(config)#'))
+
+    def test_missing_prompt_raises_at_deadline(self):
+        """A prompt that never shows up fails once the per-command deadline passes."""
+        self.connector.command_timeout = 0.2
+        with self.assertRaises(RuntimeError):
+            self.connector._send_cmd('configure terminal', prompts=[r'\(config-if\)#'])
+
+    def test_no_prompts_waits_for_any_prompt(self):
+        """Without expected prompts the output ends at the next CLI prompt."""
+        output = self.connector._send_cmd('write', prompts=[])
+
+        self.assertIn('[OK]', output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import ipaddress
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from pyats.datastructures import AttrDict
+
+from benchmarks.fake_ios import FakeIOSShell
+from connectors.ssh_connector import SSHConnector
+from connectors.ssh_pool import SSHTransportPool
+
+
+def connection(ip='192.168.11.1'):
+    return AttrDict(ip=ipaddress.ip_address(ip), port=22,
+                    credentials=AttrDict(login=AttrDict(username='admin', password=AttrDict(plaintext='x'))))
+
+
+class FakeExecChannel:
+    def __init__(self, tracker):
+        self.tracker = tracker
+        self.data = []
+
+    def settimeout(self, timeout):
+        pass
+
+    def exec_command(self, command):
+        with self.tracker['lock']:
+            self.tracker['running'] += 1
+            self.tracker['peak'] = max(self.tracker['peak'], self.tracker['running'])
+        time.sleep(0.05)
+        with self.tracker['lock']:
+            self.tracker['running'] -= 1
+        self.data = [f'output of {command}'.encode(), b'']
+
+    def recv(self, size):
+        return self.data.pop(0)
+
+    def close(self):
+        pass
+
+
+class FakeShellChannel(FakeIOSShell):
+    def get_pty(self):
+        pass
+
+    def invoke_shell(self):
+        pass
+
+
+class TestSSHTransportPool(unittest.TestCase):
+    """
+    Unit tests for the per-device SSH transport pool.
+    """
+
+    def setUp(self):
+        self.tracker = {'lock': threading.Lock(), 'running': 0, 'peak': 0}
+        self.clients = []
+        patch('paramiko.SSHClient', side_effect=self._client).start()
+        self.pool = SSHTransportPool(idle_timeout=60)
+
+    def tearDown(self):
+        patch.stopall()
+
+    def _client(self):
+        client = MagicMock()
+        transport = client.get_transport.return_value
+        transport.open_session.side_effect = lambda **kwargs: (
+            FakeExecChannel(self.tracker) if kwargs else FakeShellChannel('R1', latency=0.001)
+        )
+        self.clients.append(client)
+        return client
+
+    def test_one_transport_per_device(self):
+        """Connectors of the same device share the transport; a released shell goes to the next one."""
+        first, second = SSHConnector(MagicMock()), SSHConnector(MagicMock())
+        with patch('connectors.ssh_connector.POOL', self.pool):
+            first.connect(connection=connection())
+            shell = first._shell
+            first.disconnect()
+            second.connect(connection=connection())
+
+        self.assertEqual(1, len(self.clients))
+        self.assertIs(shell, second._shell)
+
+    def test_concurrent_connectors_get_their_own_shell(self):
+        """Two connectors leasing the device at once never read each other's output."""
+        first, second = SSHConnector(MagicMock()), SSHConnector(MagicMock())
+        with patch('connectors.ssh_connector.POOL', self.pool):
+            first.connect(connection=connection())
+            second.connect(connection=connection())
+            self.assertIsNot(first._shell, second._shell)
+
+            first.disconnect()
+            self.assertIsNot(second._shell, self.pool.get(connection()).shell())
+            second.disconnect()
+        self.assertEqual(1, len(self.clients))
+
+    def test_closed_shell_is_not_reused(self):
+        first, second = SSHConnector(MagicMock()), SSHConnector(MagicMock())
+        with patch('connectors.ssh_connector.POOL', self.pool):
+            first.connect(connection=connection())
+            shell = first._shell
+            shell.close()
+            first.disconnect()
+            second.connect(connection=connection())
+
+        self.assertIsNot(shell, second._shell)
+
+    def test_reused_shell_leaves_config_mode(self):
+        """A connector that stopped in config mode does not hand its mode to the next one."""
+        first, second = SSHConnector(MagicMock()), SSHConnector(MagicMock())
+        with patch('connectors.ssh_connector.POOL', self.pool):
+            first.connect(connection=connection())
+            first._send_cmd('enable', prompts=[r'#'])
+            first._send_cmd('configure terminal', prompts=[r'\(config\)#'])
+            first._send_cmd('interface Ethernet0/1', prompts=[r'\(config-if\)#'])
+            first.disconnect()
+            second.connect(connection=connection())
+
+        self.assertEqual('enable', second._shell.emulator.mode)
+        second._send_cmd('configure terminal', prompts=[r'\(config\)#'])
+
+    def test_dead_transport_is_replaced(self):
+        pooled = self.pool.get(connection())
+        pooled.transport.is_active.return_value = False
+
+        self.assertIsNot(pooled, self.pool.get(connection()))
+        pooled._client.close.assert_called_once()
+
+    def test_idle_transport_is_evicted(self):
+        pooled = self.pool.get(connection())
+        self.pool.evict_idle(now=time.monotonic() + 61)
+
+        pooled._client.close.assert_called_once()
+        self.assertIsNot(pooled, self.pool.get(connection()))
+
+    def test_leased_transport_is_not_evicted(self):
+        """A connector holding the shell between commands keeps its transport past the idle timeout."""
+        connector = SSHConnector(MagicMock())
+        with patch('connectors.ssh_connector.POOL', self.pool):
+            connector.connect(connection=connection())
+            pooled = connector._pooled
+            self.pool.evict_idle(now=time.monotonic() + 61)
+            pooled._client.close.assert_not_called()
+
+            connector.disconnect()
+        self.assertEqual(0, pooled.leases)
+        self.pool.evict_idle(now=time.monotonic() + 61)
+        pooled._client.close.assert_called_once()
+
+    def test_devices_connect_in_parallel(self):
+        """A slow key exchange to one device does not hold up the others."""
+        patch('paramiko.SSHClient', side_effect=self._slow_client).start()
+        addresses = [f'192.168.11.{index}' for index in range(1, 5)] * 2
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=len(addresses)) as pool:
+            transports = list(pool.map(lambda ip: self.pool.get(connection(ip)), addresses))
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(4, len(self.clients))
+        self.assertEqual(transports[:4], transports[4:])
+        self.assertLess(elapsed, 0.3)
+
+    def _slow_client(self):
+        client = self._client()
+        client.connect.side_effect = lambda **kwargs: time.sleep(0.1)
+        return client
+
+    def test_show_commands_run_in_parallel(self):
+        commands = [f'show command {index}' for index in range(8)]
+        outputs = self.pool.get(connection()).exec_many(commands)
+
+        self.assertEqual({command: f'output of {command}' for command in commands}, outputs)
+        self.assertGreater(self.tracker['peak'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+import ipaddress
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from pyats.datastructures import AttrDict
+
+import connectors.swagger_connector as swagger_connector
+from connectors.swagger_connector import SwaggerConnector, TokenManager, SPEC_ENDPOINT, VERSION_ENDPOINT
+
+SPEC = {
+    'swagger': '2.0',
+    'info': {'title': 'Cisco Firepower Threat Defense REST API', 'version': '6.7.0'},
+    'paths': {
+        '/api/fdm/latest/devices/default/interfaces': {
+            'get': {
+                'operationId': 'getPhysicalInterfaceList',
+                'tags': ['Interface'],
+                'responses': {'200': {'description': 'OK'}},
+            },
+        },
+    },
+}
+
+
+class TestSwaggerSpecCache(unittest.TestCase):
+    """
+    Unit tests for the on-disk spec cache and the process-wide client cache.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.connection = AttrDict(
+            ip=ipaddress.ip_address('192.168.110.2'), port=443, spec_cache=self.tmp.name,
+            credentials=AttrDict(login=AttrDict(username='admin', password=AttrDict(plaintext='admin'))),
+        )
+        self.spec_downloads = 0
+        self.etag = '"v1"'
+        swagger_connector._CLIENTS.clear()
+        TokenManager._managers.clear()
+        patch.object(TokenManager, 'ensure_valid', return_value='Bearer token').start()
+        patch.object(swagger_connector.requests, 'Session', self._session).start()
+
+    def tearDown(self):
+        patch.stopall()
+        self.tmp.cleanup()
+
+    def _session(self):
+        session = MagicMock()
+        session.get.side_effect = self._get
+        return session
+
+    def _get(self, url, headers=None, **kwargs):
+        response = MagicMock(status_code=200, headers={'ETag': self.etag} if self.etag else {})
+        if url.endswith(VERSION_ENDPOINT):
+            response.json.return_value = {'softwareVersion': '6.7.0-65'}
+        elif self.etag and (headers or {}).get('If-None-Match') == self.etag:
+            response.status_code = 304
+        else:
+            self.spec_downloads += 1
+            response.json.return_value = SPEC
+        return response
+
+    def _connect(self) -> SwaggerConnector:
+        conn = SwaggerConnector(MagicMock())
+        conn.connect(connection=self.connection)
+        return conn
+
+    def test_spec_downloaded_once_and_client_shared(self):
+        """A reconnect revalidates with the ETag and reuses the already built client."""
+        first = self._connect()
+        second = self._connect()
+
+        self.assertEqual(1, self.spec_downloads)
+        self.assertIs(first.client, second.client)
+        self.assertTrue((Path(self.tmp.name) / '192.168.110.2' / '6.7.0.json').is_file())
+
+    def test_client_per_user_and_port(self):
+        """Connectors of another user or port never swap the token manager of a shared client."""
+        admin = self._connect()
+        self.connection.credentials.login.username = 'operator'
+        operator = self._connect()
+        self.connection.port = 8443
+        other_port = self._connect()
+        self.connection.credentials.login.username = 'admin'
+        self.connection.port = 443
+        again = self._connect()
+
+        self.assertIs(admin.client, again.client)
+        self.assertIsNot(admin.client, operator.client)
+        self.assertIsNot(operator.client, other_port.client)
+        for conn in (admin, operator, other_port):
+            self.assertIs(conn._auth, conn.client.swagger_spec.http_client.session.auth)
+
+    def test_new_process_builds_client_from_disk(self):
+        """With only the disk cache left, the client is rebuilt without downloading the spec."""
+        self._connect()
+        swagger_connector._CLIENTS.clear()
+        conn = self._connect()
+
+        self.assertEqual(1, self.spec_downloads)
+        self.assertTrue(hasattr(conn.client.Interface, 'getPhysicalInterfaceList'))
+
+    def test_version_probe_without_etag(self):
+        """Without an ETag the cached spec is reused while the FDM software version is unchanged."""
+        self.etag = None
+        self._connect()
+        swagger_connector._CLIENTS.clear()
+        self._connect()
+
+        self.assertEqual(1, self.spec_downloads)
+
+
+class TestTokenManager(unittest.TestCase):
+    """
+    Unit tests for the shared FDM token lifecycle.
+    """
+
+    def setUp(self):
+        TokenManager._managers.clear()
+        self.manager = TokenManager.for_device('https://192.168.110.2:443', 'admin', 'admin')
+        self.manager.session = MagicMock()
+        self.manager.session.post.side_effect = self._post
+        self.grants = []
+
+    def _post(self, url, data=None, **kwargs):
+        grant = json.loads(data)['grant_type']
+        self.grants.append(grant)
+        response = MagicMock(status_code=200)
+        response.json.return_value = {
+            'access_token': f'access-{len(self.grants)}', 'refresh_token': f'refresh-{len(self.grants)}',
+            'token_type': 'Bearer', 'expires_in': 1800, 'refresh_expires_in': 2400,
+        }
+        return response
+
+    def test_shared_per_device(self):
+        """Connectors for the same device and user get the same manager and log in once."""
+        other = TokenManager.for_device('https://192.168.110.2:443', 'admin', 'admin')
+        self.manager.ensure_valid()
+        other.ensure_valid()
+
+        self.assertIs(self.manager, other)
+        self.assertEqual(['password'], self.grants)
+
+    def test_refreshes_before_expiry(self):
+        """A token close to expiry is renewed with the refresh token, not a new login."""
+        self.manager.ensure_valid()
+        self.manager.expires_at = time.monotonic() + self.manager.refresh_margin / 2
+
+        self.assertEqual('Bearer access-2', self.manager.ensure_valid())
+        self.assertEqual(['password', 'refresh_token'], self.grants)
+
+    def test_expired_refresh_token_logs_in(self):
+        """Once the refresh token expired too, a password login is done."""
+        self.manager.ensure_valid()
+        self.manager.expires_at = self.manager.refresh_expires_at = 0.0
+        self.manager.ensure_valid()
+
+        self.assertEqual(['password', 'password'], self.grants)
+
+
+class TestDeploymentWaiter(unittest.TestCase):
+    """
+    Unit tests for SwaggerConnector.wait_for_deployment.
+    """
+
+    def setUp(self):
+        self.swagger = SwaggerConnector(MagicMock())
+        self.swagger.client = MagicMock()
+
+    def _polls(self, *message_lists, state=None):
+        results = []
+        for messages in message_lists:
+            status = AttrDict(deploymentStatusMessages=[
+                AttrDict(taskState=task_state, statusMessage=text) for task_state, text in messages
+            ])
+            if state:
+                status.state = state
+            results.append(MagicMock(**{'result.return_value': status}))
+        self.swagger.client.Deployment.getDeployment.side_effect = results
+
+    def test_progress_streamed_once_per_message(self):
+        """Each status message reaches the callback once and becomes a phase of the report."""
+        queued = [('QUEUED', 'Queued')]
+        running = queued + [('DEPLOYING', 'Applying config')]
+        self._polls(queued, queued, running, running + [('FINISHED', 'Deployed')])
+        progress = []
+
+        report = self.swagger.wait_for_deployment('d1', initial_delay=0.001,
+                                                  on_progress=lambda *args: progress.append(args))
+
+        self.assertEqual([('QUEUED', 'Queued'), ('DEPLOYING', 'Applying config'), ('FINISHED', 'Deployed')], progress)
+        self.assertEqual(['Queued', 'Applying config', 'Deployed'], [message for message, _ in report.phases])
+        self.assertEqual(4, report.polls)
+        self.assertEqual('FINISHED', report.state)
+
+    def test_failed_deployment_raises(self):
+        self._polls([('DEPLOY_FAILED', 'Invalid interface')])
+        with self.assertRaises(RuntimeError):
+            self.swagger.wait_for_deployment('d1', initial_delay=0.001)
+
+    def test_deadline(self):
+        self._polls(*[[('QUEUED', 'Queued')]] * 100)
+        with self.assertRaises(TimeoutError):
+            self.swagger.wait_for_deployment('d1', timeout=0.05, initial_delay=0.01, max_delay=0.02)
+
+
+if __name__ == '__main__':
+    unittest.main()
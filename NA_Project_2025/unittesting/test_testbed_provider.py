@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from pyats.topology import loader
+
+from scripts import testbed_provider
+from scripts.testbed_provider import LazyTestbed, get_testbed
+
+TESTBED = """
+testbed:
+  name: provider_test
+devices:
+  R1:
+    os: ios
+    type: router
+    connections:
+      cli:
+        protocol: telnet
+        ip: 192.168.0.100
+        port: 5001
+"""
+
+
+class TestTestbedProvider(unittest.TestCase):
+    """
+    Unit tests for lazy, cached testbed loading.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'testbed.yaml'
+        self.path.write_text(TESTBED)
+        patch.object(testbed_provider, 'SNAPSHOT_DIR', Path(self.tmp.name) / 'snapshots').start()
+        testbed_provider._testbeds.clear()
+
+    def tearDown(self):
+        patch.stopall()
+        self.tmp.cleanup()
+
+    def test_lazy_until_first_access(self):
+        with patch.object(loader, 'load', wraps=loader.load) as load:
+            testbed = LazyTestbed(str(self.path))
+            load.assert_not_called()
+            self.assertIn('R1', testbed.devices)
+            self.assertIn('R1', testbed.devices)
+
+        load.assert_called_once()
+
+    def test_cached_until_file_changes(self):
+        first = get_testbed(str(self.path))
+        self.assertIs(first, get_testbed(str(self.path)))
+
+        self.path.write_text(TESTBED.replace('R1', 'R2'))
+        os.utime(self.path, ns=(0, os.stat(self.path).st_mtime_ns + 1_000_000))
+        self.assertIn('R2', get_testbed(str(self.path)).devices)
+
+    def test_lazy_testbed_reloads_only_when_asked(self):
+        testbed = LazyTestbed(str(self.path))
+        self.assertIn('R1', testbed.devices)
+
+        self.path.write_text(TESTBED.replace('R1', 'R2'))
+        os.utime(self.path, ns=(0, os.stat(self.path).st_mtime_ns + 1_000_000))
+        with patch.object(testbed_provider.os, 'stat', wraps=os.stat) as stat:
+            self.assertIn('R1', testbed.devices)
+        stat.assert_not_called()
+
+        testbed.reload()
+        self.assertIn('R2', testbed.devices)
+
+    def test_snapshot_skips_yaml_in_new_process(self):
+        get_testbed(str(self.path))
+        testbed_provider._testbeds.clear()
+        with patch.object(testbed_provider.yaml, 'safe_load') as safe_load:
+            self.assertIn('R1', get_testbed(str(self.path)).devices)
+
+        safe_load.assert_not_called()
+
+    def test_snapshot_is_private(self):
+        """Snapshots carry the testbed passwords, only the owner may read them."""
+        get_testbed(str(self.path))
+        [snapshot] = testbed_provider.SNAPSHOT_DIR.iterdir()
+        self.assertEqual(0o600, snapshot.stat().st_mode & 0o777)
+        self.assertEqual(0o700, testbed_provider.SNAPSHOT_DIR.stat().st_mode & 0o777)
+
+
+if __name__ == '__main__':
+    unittest.main()
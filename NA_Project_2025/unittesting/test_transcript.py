@@ -0,0 +1,50 @@
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from benchmarks.fake_ios import FakeIOSShell
+from connectors import transcript
+from connectors.ssh_connector import SSHConnector
+from connectors.transcript import Truncated
+
+
+class TestTranscript(unittest.TestCase):
+    def test_truncated_keeps_head_and_tail(self):
+        text = 'a' * 50 + 'b' * 100 + 'c' * 20
+        self.assertEqual(str(Truncated(text, head=50, tail=20)),
+                         'a' * 50 + '\n... [100 characters omitted] ...\n' + 'c' * 20)
+        self.assertEqual(str(Truncated('short', head=50, tail=20)), 'short')
+
+    def test_output_is_not_formatted_when_logging_is_off(self):
+        output = MagicMock()
+        logger = logging.getLogger('test_transcript.quiet')
+        logger.setLevel(logging.WARNING)
+        logger.info('Output:\n%s', Truncated(output))
+        output.__len__.assert_not_called()
+
+    def test_full_output_goes_to_device_file(self):
+        device = MagicMock()
+        device.name = 'R1'
+        connector = SSHConnector(device)
+        connector._shell = FakeIOSShell(hostname='R1', latency=0.01)
+        with tempfile.TemporaryDirectory() as directory:
+            transcript.enable_transcripts(directory)
+            try:
+                connector._send_cmd('configure terminal', prompts=[r'\(config\)#'])
+                connector._send_cmd('interface Ethernet0/1', prompts=[r'\(config-if\)#'])
+            finally:
+                transcript.disable_transcripts()
+            text = (Path(directory) / 'R1.log').read_text(encoding='utf-8')
+        self.assertIn('[ssh] configure terminal\n', text)
+        self.assertIn('Enter configuration commands, one per line.', text)
+        self.assertIn('R1(config-if)#', text)
+
+    def test_record_is_a_no_op_when_disabled(self):
+        self.assertFalse(logging.getLogger('na.transcript').isEnabledFor(logging.DEBUG))
+        transcript.record('R1', 'ssh', 'show version', 'output')
+
+
+if __name__ == '__main__':
+    unittest.main()
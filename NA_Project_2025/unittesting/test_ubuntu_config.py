@@ -0,0 +1,55 @@
+import ipaddress
+import unittest
+from unittest.mock import MagicMock, patch
+
+from pyats.datastructures import AttrDict
+
+import ubuntu_config
+
+IP_OUTPUT = (
+    '[{"ifname":"ens4","flags":["BROADCAST","MULTICAST","UP"],"addr_info":'
+    '[{"family":"inet","local":"192.168.11.2","prefixlen":24}]}]\n'
+    '[{"dst":"default","gateway":"10.0.0.1","dev":"ens3"},'
+    '{"dst":"192.168.101.0/24","gateway":"192.168.11.1","dev":"ens4"}]\n'
+)
+
+
+class TestUbuntuBatchConfig(unittest.TestCase):
+    """
+    Unit tests for the diff based ip -batch configuration.
+    """
+
+    def setUp(self):
+        self.device = MagicMock()
+        self.device.interfaces = {'ens4': AttrDict(ipv4=ipaddress.ip_interface('192.168.11.2/24'))}
+        self.device.custom = {'routes': {
+            'to_csr': {'network': '192.168.101.0/24', 'via': '192.168.11.1'},
+            'to_iosv': {'network': '192.168.102.0/24', 'via': '192.168.11.1'},
+        }}
+
+    def test_read_state(self):
+        with patch.object(ubuntu_config, '_run_ip', return_value=IP_OUTPUT):
+            addresses, link_up, gateways = ubuntu_config.read_state()
+
+        self.assertEqual({'192.168.11.2/24'}, addresses)
+        self.assertTrue(link_up)
+        self.assertEqual({'192.168.101.0/24': '192.168.11.1'}, gateways)
+
+    def test_only_missing_operations_are_applied(self):
+        """Present address, link state and routes are skipped; the rest goes out in one batch."""
+        with patch.object(ubuntu_config, '_run_ip', side_effect=[IP_OUTPUT, '']) as run_ip:
+            ubuntu_config.apply_batch(self.device)
+
+        self.assertEqual(2, run_ip.call_count)
+        self.assertEqual('route replace 192.168.102.0/24 via 192.168.11.1\n', run_ip.call_args.args[1])
+
+    def test_configured_server_is_left_alone(self):
+        del self.device.custom['routes']['to_iosv']
+        with patch.object(ubuntu_config, '_run_ip', return_value=IP_OUTPUT) as run_ip:
+            ubuntu_config.apply_batch(self.device)
+
+        run_ip.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
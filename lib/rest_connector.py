@@ -1,15 +1,27 @@
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 import json
 import urllib3
+from urllib3.util.retry import Retry
 from typing import Optional
 
 from pyats.datastructures import AttrDict
 from pyats.topology import Device
 
 
+# Pool/retry defaults, overridable with a `pool` mapping in the testbed connection block:
+#   pool: {maxsize: 10, retries: 3, backoff_factor: 0.3}
+POOL_DEFAULTS = {'maxsize': 10, 'retries': 3, 'backoff_factor': 0.3}
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+CONTAINER_PATTERN = re.compile(r'container\s(\w+) \{')
+
+
 class RESTConnector:
 
     def __init__(self, device: Device, **kwargs):
@@ -17,9 +29,11 @@ class RESTConnector:
         self._auth = None
         self._headers = None
         self._url = None
+        self._pool = None
         self.device = device
         self.connection: Optional[AttrDict] = None
-        self.api_endpoints: list[str] = None
+        # Ordered set: dict keys keep discovery order and make removal O(1)
+        self.api_endpoints: dict[str, None] = None
         urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
     def connect(self, **kwargs):
@@ -30,17 +44,39 @@ class RESTConnector:
             'Accept': 'application/yang-data+json',
         }
         self._url = f'https://{self.connection.ip.compressed}:{self.connection.port}'
+        self._pool = {**POOL_DEFAULTS, **self.connection.get('pool', {})}
+        self._session = self.__create_session(self._pool)
+
+    def __create_session(self, pool: dict) -> requests.Session:
+        """Keep-alive session reused by every request, so the TLS handshake is paid once per pooled socket"""
+        # urllib3's default allowed_methods: only idempotent requests are retried, never POST or PATCH
+        retry = Retry(
+            total=pool['retries'],
+            backoff_factor=pool['backoff_factor'],
+            status_forcelist=RETRY_STATUSES,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool['maxsize'], max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.auth = self._auth
+        session.headers.update(self._headers)
+        return session
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        # verify is passed per request: a session-level verify=False loses to REQUESTS_CA_BUNDLE
+        return self._session.get(url, verify=False, **kwargs)
 
     def get_interface(self, interface_name: str) -> Optional[AttrDict]:
         endpoint = f'/restconf/data/ietf-interfaces:interfaces/interface={interface_name}'
         url = self._url + endpoint
-        response = requests.get(url, auth=self._auth, headers=self._headers, verify=False)
+        response = self._get(url)
         return response.json()
 
     def get_netconf_capabilities(self):
         netconf = f'/restconf/data/netconf-state/capabilities'
         url = self._url + netconf
-        response = requests.get(url, auth=self._auth, headers=self._headers, verify=False)
+        response = self._get(url)
         self.netconf_capabilities = response.json().get(
             'ietf-netconf-monitoring:capabilities', {}
         ).get('capability', [])
@@ -48,36 +84,86 @@ class RESTConnector:
     def get_restconf_capabilities(self):
         restconf = f'/restconf/data/ietf-yang-library:modules-state'
         url = self._url + restconf
-        response = requests.get(url, auth=self._auth, headers=self._headers, verify=False)
+        response = self._get(url)
         self.resconf_capabilities = self.__extract_endpoints(response.json())
 
-    def get_api_endpoint(self, url):
-        response = requests.get(url, auth=self._auth, headers=self._headers, verify=False)
-        with open(f"{url.split('/')[-2]}.yang", 'w') as file:
-            file.write(response.text)
-        text = response.text
-        pattern = r'container\s(\w+) \{'
-        for line in text.splitlines():
-            match = re.search(pattern, line)
-            if match:
-                name = match.group(1)
+    def get_api_endpoint(self, url, directory: str = '.'):
+        self.__add_containers(url, self.__fetch_schema(url, Path(directory), resume=False))
+
+    def crawl_api_endpoints(self, max_workers: int = None, directory: str = '.',
+                            resume: bool = True) -> dict[str, Exception]:
+        """
+        Downloads every advertised YANG schema with bounded parallelism and replaces each
+        schema url in api_endpoints by its container endpoints.
+        With resume, schemas already saved as <module>.yang are parsed from disk instead.
+        Returns the schemas that failed; they stay in api_endpoints and are fetched again next time.
+        """
+        # one worker per pooled socket: more would only wait for a free connection
+        max_workers = max_workers or self._pool['maxsize']
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        # schema urls end in /<module>/<revision>; already crawled endpoints end in /<module>:<container>
+        schemas = [url for url in self.api_endpoints if url and ':' not in url.rsplit('/', 1)[-1]]
+        failed = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(self.__fetch_schema, url, Path(directory), resume): url for url in schemas}
+            for future in as_completed(futures):
                 try:
-                    self.api_endpoints.remove(url)
-                except ValueError:
-                    pass
-                self.api_endpoints.append(f'{url.rsplit('/', 1)[0]}:{name}')
-                print(self.api_endpoints[-1])
+                    self.__add_containers(futures[future], future.result())
+                except requests.RequestException as e:
+                    print(f'Failed to fetch {futures[future]}: {e}')
+                    failed[futures[future]] = e
+        return failed
+
+    def __fetch_schema(self, url: str, directory: Path, resume: bool) -> list[str]:
+        """
+        Streams one schema to <module>.yang and extracts its container names in the same pass
+        """
+        path = directory / f"{url.split('/')[-2]}.yang"
+        if resume and path.is_file() and path.stat().st_size:
+            with open(path, encoding='utf-8') as file:
+                return [m.group(1) for line in file if (m := CONTAINER_PATTERN.search(line))]
+
+        containers = []
+        partial = path.with_suffix('.yang.part')
+        with self._get(url, stream=True) as response:
+            # an error body (401, 404, ...) must never end up as <module>.yang
+            response.raise_for_status()
+            response.encoding = response.encoding or 'utf-8'
+            try:
+                with open(partial, 'w', encoding='utf-8') as file:
+                    for line in response.iter_lines(decode_unicode=True):
+                        file.write(line + '\n')
+                        match = CONTAINER_PATTERN.search(line)
+                        if match:
+                            containers.append(match.group(1))
+            except BaseException:
+                partial.unlink(missing_ok=True)
+                raise
+        os.replace(partial, path)  # only complete schemas are picked up on resume
+        return containers
+
+    def __add_containers(self, url: str, containers: list[str]):
+        if not containers:
+            return
+        self.api_endpoints.pop(url, None)
+        for name in containers:
+            endpoint = f'{url.rsplit('/', 1)[0]}:{name}'
+            if endpoint not in self.api_endpoints:
+                self.api_endpoints[endpoint] = None
+                print(endpoint)
 
     def __extract_endpoints(self, response):
-        self.api_endpoints = []
+        self.api_endpoints = {}
         for key, value in response.get('ietf-yang-library:modules-state', []).items():
             if key != 'module':
                 continue
             for endpoint in value:
-                self.api_endpoints.append(endpoint.get('schema'))
+                self.api_endpoints[endpoint.get('schema')] = None
 
     def disconnect(self):
-        pass
+        if self._session:
+            self._session.close()
+            self._session = None
 
     def execute(self, command, **kwargs):
         pass
@@ -86,4 +172,4 @@ class RESTConnector:
         pass
 
     def is_connected(self):
-        pass
+        return self._session is not None
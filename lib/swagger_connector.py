@@ -1,5 +1,9 @@
 import json
-from typing import Optional
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
 
 import requests
 import urllib3
@@ -8,6 +12,79 @@ from bravado.requests_client import RequestsClient
 from pyats.datastructures import AttrDict
 from pyats.topology import Device
 
+logger = logging.getLogger(__name__)
+
+# Same waiter as NA_Project_2025/connectors/swagger_connector.py; each tree keeps its own copy,
+# NA_Project_2025 runs from its own directory and lib must not depend on it
+DEPLOY_TIMEOUT = 600
+DEPLOY_DONE_STATES = ('FINISHED', 'DEPLOYED')
+DEPLOY_FAILED_STATES = ('FAILED', 'DEPLOY_FAILED', 'CANCELLED')
+
+
+@dataclass
+class DeploymentReport:
+    """
+    Outcome of one FDM deployment: final state, poll count and (status message, seconds) per phase
+    """
+    deployment_id: str
+    state: Optional[str] = None
+    elapsed: float = 0.0
+    polls: int = 0
+    phases: list[tuple[str, float]] = field(default_factory=list)
+
+    def __str__(self):
+        phases = ', '.join(f'{message} {seconds:.1f}s' for message, seconds in self.phases)
+        return f"{self.state} after {self.elapsed:.1f}s and {self.polls} polls [{phases}]"
+
+
+def wait_for_deployment(client: SwaggerClient, device_name: str, deployment_id: str,
+                        timeout: float = DEPLOY_TIMEOUT, initial_delay: float = 1.0, max_delay: float = 15.0,
+                        on_progress: Optional[Callable[[str, str], None]] = None) -> DeploymentReport:
+    """
+    Polls getDeployment with exponential backoff and jitter until the deployment ends or timeout passes.
+    Every new deploymentStatusMessages entry is passed to on_progress(taskState, statusMessage) and
+    closes the previous phase in the returned report. The delay drops back to initial_delay whenever
+    the deployment makes progress, so short phases are not overslept.
+    Raises RuntimeError when the deployment fails and TimeoutError when it does not end in time.
+    """
+    report = DeploymentReport(deployment_id)
+    start = time.monotonic()
+    deadline = start + timeout
+    phase_start = start
+    delay = initial_delay
+    seen = 0
+    while True:
+        status = client.Deployment.getDeployment(objId=deployment_id).result()
+        report.polls += 1
+        now = time.monotonic()
+        messages = status['deploymentStatusMessages'] or []
+        for message in messages[seen:]:
+            task_state, text = message.taskState, message.statusMessage
+            if report.phases:
+                report.phases[-1] = (report.phases[-1][0], now - phase_start)
+            report.phases.append((text, 0.0))
+            phase_start = now
+            logger.info(f"Deployment {deployment_id} on {device_name}: {task_state} {text}")
+            if on_progress:
+                on_progress(task_state, text)
+        if len(messages) > seen:
+            seen = len(messages)
+            delay = initial_delay
+        # the deployment object has an overall state, older FDM versions only report it per message
+        last_task = messages[-1].taskState if messages else None
+        report.state = getattr(status, 'state', None) or last_task
+        states = {report.state, last_task}
+        report.elapsed = now - start
+        if states & set(DEPLOY_DONE_STATES):
+            if report.phases:
+                report.phases[-1] = (report.phases[-1][0], now - phase_start)
+            return report
+        if states & set(DEPLOY_FAILED_STATES):
+            raise RuntimeError(f"Deployment {deployment_id} on {device_name} failed: {report}")
+        if now >= deadline:
+            raise TimeoutError(f"Deployment {deployment_id} on {device_name} not done after {timeout}s: {report}")
+        time.sleep(min(random.uniform(delay / 2, delay), deadline - now))
+        delay = min(delay * 2, max_delay)
 
 
 class SwaggerConnector:
@@ -58,6 +135,22 @@ class SwaggerConnector:
         self.refresh_token = response.json()['refresh_token']
 
 
+    def deploy(self, **kwargs) -> DeploymentReport:
+        """
+        Starts a deployment of the pending changes and waits for it, see wait_for_deployment
+        """
+        deployment = self.client.Deployment.addDeployment().result()
+        return self.wait_for_deployment(deployment.id, **kwargs)
+
+    def wait_for_deployment(self, deployment_id: str, timeout: float = DEPLOY_TIMEOUT,
+                            initial_delay: float = 1.0, max_delay: float = 15.0,
+                            on_progress: Optional[Callable[[str, str], None]] = None) -> DeploymentReport:
+        """
+        Waits for a deployment of this device, see wait_for_deployment
+        """
+        return wait_for_deployment(self.client, self.device.name, deployment_id, timeout,
+                                   initial_delay, max_delay, on_progress)
+
     def disconnect(self):
         pass
 
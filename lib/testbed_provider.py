@@ -0,0 +1,100 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Optional, Union
+
+import yaml
+from pyats.topology import Testbed, loader
+
+logger = logging.getLogger(__name__)
+
+# Parsed YAML snapshots, one pickle per testbed file. They hold the testbed's plaintext passwords,
+# so the directory and the files are created readable by the current user only.
+SNAPSHOT_DIR = Path.home() / '.cache' / 'na_project' / 'testbeds'
+
+_testbeds: dict[tuple[str, int], Testbed] = {}
+_lock = threading.Lock()
+
+
+def get_testbed(path: str) -> Testbed:
+    """
+    Returns the testbed for path, loading it once per process and again only after the file changed.
+    The Testbed object itself holds weak references and cannot be pickled, so what is kept on disk
+    between runs is the parsed YAML, keyed by path and mtime.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns)
+    with _lock:
+        testbed = _testbeds.get(key)
+        if testbed is None:
+            testbed = loader.load(_parsed(path, stat))
+            _testbeds[key] = testbed
+    return testbed
+
+
+def _parsed(path: str, stat: os.stat_result) -> Union[dict, str]:
+    """
+    Returns the parsed testbed dict, or the path itself when pyATS has to read the file
+    (extends, custom tags)
+    """
+    snapshot = SNAPSHOT_DIR / f"{hashlib.sha1(path.encode()).hexdigest()}.pickle"
+    signature = (path, stat.st_mtime_ns, stat.st_size)
+    try:
+        with open(snapshot, 'rb') as file:
+            cached_signature, data = pickle.load(file)
+        if cached_signature == signature:
+            return data
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        pass
+
+    try:
+        with open(path, encoding='utf-8') as file:
+            data = yaml.safe_load(file)
+    except yaml.YAMLError:
+        return path
+    # extends is resolved relative to the file, so it can only be loaded from the path
+    if not isinstance(data, dict) or 'extends' in data:
+        return path
+    try:
+        SNAPSHOT_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # also closes a directory left readable by versions that wrote snapshots with default permissions
+        SNAPSHOT_DIR.chmod(0o700)
+        tmp = snapshot.with_suffix(f'.{os.getpid()}.tmp')
+        with os.fdopen(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as file:
+            pickle.dump((signature, data), file)
+        tmp.replace(snapshot)
+    except OSError as e:
+        logger.debug(f'Could not write testbed snapshot {snapshot}: {e}')
+    return data
+
+
+class LazyTestbed:
+    """
+    Drop-in for a module level `testbed = loader.load(path)`: nothing is parsed or imported
+    until an attribute such as .devices is first read, so importing the module stays cheap.
+    The testbed is resolved once; a file changed during the run is only picked up by reload().
+    """
+
+    def __init__(self, path: str):
+        # resolved now, like loader.load would have been, in case the working directory changes later
+        self._path = os.path.abspath(path)
+        self._testbed: Optional[Testbed] = None
+
+    def __getattr__(self, name):
+        if self._testbed is None:
+            self._testbed = get_testbed(self._path)
+        return getattr(self._testbed, name)
+
+    def reload(self) -> Testbed:
+        """
+        Switches to the current contents of the file, loading it again only if it changed
+        """
+        self._testbed = get_testbed(self._path)
+        return self._testbed
+
+    def __repr__(self):
+        return f'LazyTestbed({self._path!r})'
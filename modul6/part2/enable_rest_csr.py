@@ -1,9 +1,9 @@
 from pyats import aetest
-from pyats.topology import loader
 
 from modul6.part1.telnet_connector import TelnetConnector
+from lib.testbed_provider import LazyTestbed
 
-tb = loader.load('testbed_example.yaml')
+tb = LazyTestbed('testbed_example.yaml')
 
 
 class Example(aetest.Testcase):
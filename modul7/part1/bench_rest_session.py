@@ -0,0 +1,103 @@
+"""
+N sequential RESTConnector.get_interface calls with and without the pooled session,
+against a local HTTPS stub that counts TLS handshakes.
+
+Run from the repository root: python -m modul7.part1.bench_rest_session
+"""
+import datetime
+import ipaddress
+import json
+import ssl
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from pyats.datastructures import AttrDict
+
+from lib.rest_connector import RESTConnector
+
+CALLS = 200
+
+
+class RestconfStub(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the CSR
+    wbufsize = -1  # headers and body in one segment, no delayed-ACK stall
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = json.dumps({'ietf-interfaces:interface': {'name': self.path.rsplit('=', 1)[-1]}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/yang-data+json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class CountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    handshakes = 0
+
+    def get_request(self):
+        sock, addr = super().get_request()
+        CountingServer.handshakes += 1
+        return sock, addr
+
+
+def self_signed_cert(directory: Path) -> tuple[Path, Path]:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, '127.0.0.1')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+            .serial_number(x509.random_serial_number()).not_valid_before(now)
+            .not_valid_after(now + datetime.timedelta(days=1)).sign(key, hashes.SHA256()))
+    cert_file, key_file = directory / 'stub.crt', directory / 'stub.key'
+    cert_file.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_file.write_bytes(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                           serialization.NoEncryption()))
+    return cert_file, key_file
+
+
+def run(label: str, call) -> None:
+    CountingServer.handshakes = 0
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        call()
+    elapsed = time.perf_counter() - start
+    print(f"{label:>12}: {CALLS} calls in {elapsed:6.2f}s  ({elapsed / CALLS * 1000:5.2f} ms/call, "
+          f"{CountingServer.handshakes} TLS handshakes)")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        cert_file, key_file = self_signed_cert(Path(tmp))
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_file, key_file)
+        server = CountingServer(('127.0.0.1', 0), RestconfStub)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+
+        connection = AttrDict(ip=ipaddress.ip_address('127.0.0.1'), port=port)
+        conn = RESTConnector(device=None)
+        conn.connect(connection=connection, username='admin', password='admin')
+        url = f'https://127.0.0.1:{port}/restconf/data/ietf-interfaces:interfaces/interface=GigabitEthernet1'
+
+        run('no pooling', lambda: requests.get(url, auth=conn._auth, headers=conn._headers, verify=False).json())
+        run('pooled', lambda: conn.get_interface('GigabitEthernet1'))
+
+        conn.disconnect()
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
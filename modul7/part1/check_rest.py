@@ -1,9 +1,9 @@
 from pyats import aetest
-from pyats.topology import loader
 
 from lib.rest_connector import RESTConnector
+from lib.testbed_provider import LazyTestbed
 
-tb = loader.load('testbed_example.yaml')
+tb = LazyTestbed('testbed_example.yaml')
 
 
 class Example(aetest.Testcase):
@@ -18,8 +18,7 @@ class Example(aetest.Testcase):
         out = conn_class.get_interface('GigabitEthernet1')
         conn_class.get_restconf_capabilities()
         conn_class.get_restconf_capabilities()
-        for api in conn_class.api_endpoints.copy():
-            conn_class.get_api_endpoint(api)
+        conn_class.crawl_api_endpoints(directory='yang')
 
 
 if __name__ == '__main__':
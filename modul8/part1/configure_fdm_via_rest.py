@@ -4,18 +4,18 @@ import ssl
 
 from pyats import aetest
 from pyats.aetest.steps import Steps
-from pyats.topology import loader
 
 ssl._create_default_https_context = ssl._create_unverified_context
 from lib.swagger_connector import SwaggerConnector
+from lib.testbed_provider import LazyTestbed
 
-tb = loader.load('testbed_example.yaml')
-device_fdm = tb.devices['FTD']
+tb = LazyTestbed('testbed_example.yaml')
 
 
 class Example3(aetest.Testcase):
     @aetest.test
     def configure_fdm_interface(self, steps: Steps):
+        device_fdm = tb.devices['FTD']
         with steps.start('Connect to FDM'):
             swagger: SwaggerConnector = device_fdm.connections.rest['class'](device_fdm)
             swagger.connect(connection=device_fdm.connections.rest)
@@ -124,14 +124,8 @@ class Example3(aetest.Testcase):
 
 
         with steps.start('Deploy configuration'):
-            response = swagger.client.Deployment.addDeployment().result()
-            for _ in range(10):
-                tasks = swagger.client.Deployment.getDeployment(objId=response.id).result()
-                status = tasks['deploymentStatusMessages'][-1]
-                if status.taskState == "FINISHED":
-                    break
-            else:
-                print("Deployment failed")
+            report = swagger.deploy(on_progress=lambda state, message: print(f"{state}: {message}"))
+            print(report)
 
 
 if __name__ == '__main__':
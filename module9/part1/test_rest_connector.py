@@ -0,0 +1,150 @@
+import io
+import ipaddress
+import json
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import requests
+from pyats.datastructures import AttrDict
+
+from lib.rest_connector import RESTConnector, POOL_DEFAULTS, RETRY_STATUSES
+
+BASE = 'https://192.168.11.10:443'
+SCHEMA = 'module ietf-interfaces {\n  container interfaces {\n  }\n  container statistics {\n  }\n}\n'
+
+
+def response(url, status=200, body=''):
+    result = requests.Response()
+    result.status_code = status
+    result.reason = 'OK' if status == 200 else 'Error'
+    result.url = url
+    result.encoding = 'utf-8'
+    result.raw = io.BytesIO(body.encode())
+    return result
+
+
+class StubSession:
+    """Answers GETs from a url -> (status, body) map and counts them"""
+
+    def __init__(self, pages: dict):
+        self.pages = pages
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append(url)
+        status, body = self.pages[url]
+        return response(url, status, body)
+
+    def close(self):
+        pass
+
+
+def schema_url(module):
+    return f'{BASE}/restconf/tailf/modules/{module}/2014-05-08'
+
+
+def connector(pages: dict, **connection) -> RESTConnector:
+    rest = RESTConnector(MagicMock())
+    rest.connect(connection=AttrDict(ip=ipaddress.ip_address('192.168.11.10'), port=443, **connection),
+                 username='admin', password='x')
+    if pages is None:
+        return rest
+    rest._session = StubSession(pages)
+    rest.api_endpoints = {url: None for url in pages}
+    return rest
+
+
+class TestRESTCrawl(unittest.TestCase):
+    def test_crawl_replaces_schemas_by_containers(self):
+        rest = connector({schema_url('ietf-interfaces'): (200, SCHEMA)})
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertEqual({}, rest.crawl_api_endpoints(directory=directory))
+            self.assertEqual(SCHEMA, (Path(directory) / 'ietf-interfaces.yang').read_text())
+        self.assertEqual([f'{BASE}/restconf/tailf/modules/ietf-interfaces:interfaces',
+                          f'{BASE}/restconf/tailf/modules/ietf-interfaces:statistics'],
+                         list(rest.api_endpoints))
+
+    def test_error_response_is_not_saved(self):
+        url = schema_url('ietf-interfaces')
+        rest = connector({url: (401, '{"errors": "access denied"}')})
+        with tempfile.TemporaryDirectory() as directory:
+            failed = rest.crawl_api_endpoints(directory=directory)
+            self.assertEqual([], list(Path(directory).iterdir()))
+        self.assertIsInstance(failed[url], requests.HTTPError)
+        self.assertIn(url, rest.api_endpoints)
+
+    def test_resume_fetches_only_missing_schemas(self):
+        done, failing = schema_url('ietf-interfaces'), schema_url('ietf-ip')
+        pages = {done: (200, SCHEMA), failing: (404, 'not found')}
+        with tempfile.TemporaryDirectory() as directory:
+            connector(pages).crawl_api_endpoints(directory=directory)
+
+            pages[failing] = (200, 'module ietf-ip {\n  container ipv4 {\n  }\n}\n')
+            rest = connector(pages)
+            self.assertEqual({}, rest.crawl_api_endpoints(directory=directory))
+            self.assertEqual([failing], rest._session.calls)
+            self.assertTrue((Path(directory) / 'ietf-ip.yang').is_file())
+        self.assertIn(f'{BASE}/restconf/tailf/modules/ietf-interfaces:interfaces', rest.api_endpoints)
+        self.assertIn(f'{BASE}/restconf/tailf/modules/ietf-ip:ipv4', rest.api_endpoints)
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.clients.add(self.client_address)
+        body = json.dumps({'ietf-interfaces:interface': {'name': self.path.rsplit('=', 1)[-1]}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/yang-data+json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestRESTSession(unittest.TestCase):
+    def test_adapter_uses_pool_defaults(self):
+        adapter = connector(None)._session.get_adapter(BASE)
+        self.assertEqual(POOL_DEFAULTS['maxsize'], adapter._pool_maxsize)
+        self.assertEqual(POOL_DEFAULTS['retries'], adapter.max_retries.total)
+        self.assertEqual(POOL_DEFAULTS['backoff_factor'], adapter.max_retries.backoff_factor)
+        self.assertEqual(set(RETRY_STATUSES), set(adapter.max_retries.status_forcelist))
+        self.assertIn('PUT', adapter.max_retries.allowed_methods)
+        self.assertFalse({'POST', 'PATCH'} & adapter.max_retries.allowed_methods)
+
+    def test_pool_overrides_from_connection(self):
+        rest = connector(None, pool={'maxsize': 4, 'retries': 5})
+        adapter = rest._session.get_adapter(BASE)
+        self.assertEqual(4, adapter._pool_maxsize)
+        self.assertEqual(5, adapter.max_retries.total)
+        self.assertEqual(POOL_DEFAULTS['backoff_factor'], adapter.max_retries.backoff_factor)
+
+    def test_repeated_calls_reuse_session_and_connection(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        server.clients = set()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            rest = connector(None)
+            session = rest._session
+            rest._url = f'http://127.0.0.1:{server.server_address[1]}'
+            for index in range(5):
+                self.assertEqual(f'GigabitEthernet{index}',
+                                 rest.get_interface(f'GigabitEthernet{index}')['ietf-interfaces:interface']['name'])
+            self.assertIs(session, rest._session)
+            rest.disconnect()
+        finally:
+            server.shutdown()
+            server.server_close()
+        # one keep-alive socket served every call
+        self.assertEqual(1, len(server.clients))
+        self.assertFalse(rest.is_connected())
+
+
+if __name__ == '__main__':
+    unittest.main()
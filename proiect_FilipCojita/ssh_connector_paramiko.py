@@ -113,7 +113,7 @@ class SSHConnectorParamiko:
             prompt_patterns = [prompt_patterns]
 
         prompt_regexes = [re.compile(p.encode()) for p in prompt_patterns]
-        buffer = b''
+        buffer = bytearray()  # grows in place, decoded once when the prompt is found
         timeout = timeout or self.timeout
         end_time = time.time() + timeout
 